@@ -0,0 +1,319 @@
+"""오래된 주차의 계획을 연도별 압축 파일(콜드)로 옮기고, 시트에는 최근 주차(핫)만 남기는 보관소입니다.
+
+    python archive.py --dry-run                      # 옮길 주차만 보여 줍니다.
+    python archive.py                                # 지난 분기보다 이전 주차를 보관소로 옮기고 시트에서 지웁니다.
+    python archive.py --keep-quarters 4              # 최근 네 분기(이번 분기 포함)는 시트에 남깁니다.
+    python archive.py --backend sqlite --sqlite-path weekly_auto.db
+
+보관소 디렉터리(기본값 archive/)에는 두 종류의 파일이 있습니다.
+
+- plans_<연도>_<순번>.jsonl.gz: 한 번 쓰면 고치지 않는 세그먼트 파일입니다. 주차마다 gzip 멤버 하나로
+  따로 압축해 이어 붙이므로 파일 전체도 보통의 gzip JSONL로 읽힙니다. 한 줄은 {"week_id", "member_name", "plan"}입니다.
+- index.json: weeks는 week_id → [파일 이름, 바이트 위치, 길이, 계획 수, 보관할 때의 members 길이]입니다. 주차
+  하나를 읽을 때 그 멤버만 풀어 읽습니다. members는 보관한 뒤에 있었던 팀원 이름 변경·영구 삭제 기록
+  [[옛 이름, 새 이름 또는 null], ...]이고, 읽을 때 그 주차를 보관한 뒤의 기록만 차례로 적용합니다.
+
+새 세그먼트를 다 쓰고 다시 읽어 검증한 뒤에 색인을 임시 파일과 os.replace로 바꿔 넣고, 그다음에 시트에서
+지웁니다. 색인을 읽고 고쳐 쓰는 동안에는 잠금 파일(index.json.lock)을 잡아, 보관 명령과 앱이 동시에 써도
+서로의 기록을 지우지 않습니다. 어느 단계에서 멈춰도 다시 실행하면 이어서 진행됩니다. 앱은 보관된 주차를 시트 대신 보관소에서
+읽고, 읽기 전용으로 보여 줍니다. 팀원 이름 변경·영구 삭제는 세그먼트를 고치지 않고 색인의 members에 남깁니다.
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from storage import StorageBackend
+
+DEFAULT_ARCHIVE_DIR = "archive"
+DEFAULT_SECRETS_FILE = ".streamlit/secrets.toml"
+DEFAULT_SHEET_NAME = "주간업무보고_DB"
+DEFAULT_SQLITE_PATH = "weekly_auto.db"
+INDEX_FILE = "index.json"
+INDEX_LOCK_FILE = "index.json.lock"
+INDEX_LOCK_TIMEOUT = 30           # 색인 잠금을 기다리는 최대 시간(초). 이보다 오래된 잠금 파일은 멈춘 프로세스가 남긴 것으로 봅니다.
+SEGMENT_PATTERN = re.compile(r"plans_(\d{4})_(\d+)\.jsonl\.gz$")
+DELETE_BATCH_OPS = 500            # 시트에서 지울 때 한 번에 반영하는 변경 수
+DEFAULT_KEEP_QUARTERS = 2        # 분기가 바뀐 직후에도 지난 분기 보고서를 고칠 수 있게 지난 분기까지 남깁니다.
+MIN_HOT_WEEKS = 4                # keep_quarters와 관계없이 최근 이만큼의 주차는 시트에 남깁니다.
+
+
+class ArchivedWeekError(ValueError):
+    """보관된(읽기 전용) 주차의 계획을 고치려 할 때 냅니다."""
+
+
+def _year_of(week_id):
+    return str(week_id).split('-W')[0]
+
+
+def _member_after(name, changes):
+    """이름 변경·삭제 기록을 차례로 적용한 이름입니다. 삭제됐으면 None입니다."""
+    for old_name, new_name in changes:
+        if name == old_name:
+            if new_name is None: return None
+            name = new_name
+    return name
+
+
+def write_atomic(path, data):
+    """임시 파일에 쓰고 디스크에 내린 뒤 이름을 바꿔, 읽는 쪽이 반쯤 쓴 파일을 보지 않게 합니다."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# --- 1. 보관소 파일 ---
+
+class PlanArchive:
+    """보관소 디렉터리 하나를 읽고 씁니다. 다른 프로세스가 보관하면 색인 파일이 바뀐 것을 보고 다시 읽습니다."""
+
+    def __init__(self, path=DEFAULT_ARCHIVE_DIR):
+        self.path = path
+        self._lock = threading.Lock()
+        self._index = {"weeks": {}, "members": []}
+        self._index_mtime = None
+
+    def _index_path(self):
+        return os.path.join(self.path, INDEX_FILE)
+
+    def _read_index_file(self):
+        try:
+            with open(self._index_path(), encoding='utf-8') as f: index = json.load(f)
+        except FileNotFoundError:
+            return {"weeks": {}, "members": []}
+        return {"weeks": index['weeks'], "members": index.get('members', [])}
+
+    def _current_index(self):
+        """색인 {"weeks", "members"}를 반환합니다. 파일이 바뀌었을 때만 다시 읽습니다."""
+        try: mtime = os.stat(self._index_path()).st_mtime_ns
+        except FileNotFoundError: mtime = None
+        with self._lock:
+            if mtime != self._index_mtime:
+                self._index = self._read_index_file() if mtime is not None else {"weeks": {}, "members": []}
+                self._index_mtime = mtime
+            return self._index
+
+    @contextmanager
+    def _locked_index(self):
+        """잠금 파일을 잡고 파일에서 새로 읽은 색인을 넘겨줍니다. 다른 프로세스와 색인 쓰기가 겹치지 않습니다."""
+        os.makedirs(self.path, exist_ok=True)
+        lock_path = os.path.join(self.path, INDEX_LOCK_FILE)
+        deadline = time.monotonic() + INDEX_LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.stat(lock_path).st_mtime > INDEX_LOCK_TIMEOUT: os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+                if time.monotonic() > deadline: raise TimeoutError(f"보관소 색인 잠금({lock_path})을 얻지 못했습니다.")
+                time.sleep(0.05)
+        try:
+            yield self._read_index_file()
+        finally:
+            os.close(fd)
+            os.remove(lock_path)
+
+    def _write_index(self, weeks, members):
+        index = {"weeks": dict(sorted(weeks.items())), "members": members}
+        write_atomic(self._index_path(), json.dumps(index, ensure_ascii=False).encode('utf-8'))
+        with self._lock: self._index, self._index_mtime = index, os.stat(self._index_path()).st_mtime_ns
+
+    # 읽기
+    def __contains__(self, week_id):
+        return str(week_id) in self._current_index()['weeks']
+
+    def week_ids(self):
+        """보관된 주차 ID 목록입니다. 계획을 가진 팀원이 모두 삭제된 주차도 보관된(읽기 전용) 주차로 남습니다."""
+        return sorted(self._current_index()['weeks'])
+
+    def load_weeks(self, week_ids):
+        """보관된 주차들의 계획을 {week_id: {member_name: plan}}으로 읽습니다. 보관되지 않은 주차는 건너뜁니다."""
+        return self._read(self._current_index(), week_ids)
+
+    def _read(self, index, week_ids):
+        plans = {}
+        for week_id in dict.fromkeys(map(str, week_ids)):
+            entry = index['weeks'].get(week_id)
+            if entry is None: continue
+            file_name, offset, length, _, *rest = entry
+            changes = index['members'][rest[0] if rest else 0:]   # 이 주차를 보관한 뒤의 이름 변경·삭제
+            with open(os.path.join(self.path, file_name), 'rb') as f:
+                f.seek(offset)
+                block = f.read(length)
+            for line in gzip.decompress(block).decode('utf-8').splitlines():
+                row = json.loads(line)
+                member_name = _member_after(row['member_name'], changes)
+                if member_name is not None: plans.setdefault(week_id, {})[member_name] = row['plan']
+        return plans
+
+    # 쓰기
+    def _next_segment(self, year):
+        numbers = [int(m.group(2)) for m in map(SEGMENT_PATTERN.match, os.listdir(self.path)) if m and m.group(1) == year]
+        return f"plans_{year}_{max(numbers, default=0) + 1:03d}.jsonl.gz"
+
+    def add_weeks(self, plans):
+        """{week_id: {member_name: plan}}을 연도별 새 세그먼트로 쓰고 색인에 올립니다. 이미 보관된 주차는 받지 않습니다."""
+        os.makedirs(self.path, exist_ok=True)
+        index = self._current_index()
+        weeks, members = index['weeks'], index['members']
+        already = sorted(week_id for week_id in plans if week_id in weeks)
+        if already: raise ArchivedWeekError(f"이미 보관된 주차입니다: {', '.join(already)}")
+        by_year = {}
+        for week_id in sorted(plans):
+            if plans[week_id]: by_year.setdefault(_year_of(week_id), []).append(week_id)
+        new_entries = {}
+        for year, week_ids in by_year.items():
+            file_name, blocks, offset = self._next_segment(year), [], 0
+            for week_id in week_ids:
+                lines = [json.dumps({"week_id": week_id, "member_name": name, "plan": plan}, ensure_ascii=False)
+                         for name, plan in sorted(plans[week_id].items())]
+                block = gzip.compress(("\n".join(lines) + "\n").encode('utf-8'), mtime=0)
+                new_entries[week_id] = [file_name, offset, len(block), len(lines), len(members)]
+                blocks.append(block)
+                offset += len(block)
+            write_atomic(os.path.join(self.path, file_name), b"".join(blocks))
+        # 색인에 올리기 전에 새로 쓴 주차를 다시 읽어 원래 계획과 같은지 확인합니다.
+        restored = self._read({"weeks": new_entries, "members": members}, new_entries)
+        if any(restored.get(week_id) != plans[week_id] for week_id in new_entries):
+            raise IOError("보관 파일을 다시 읽은 내용이 원래 계획과 다릅니다. 색인은 바꾸지 않았습니다.")
+        # 세그먼트를 쓰는 동안 다른 프로세스가 색인을 바꿨을 수 있으므로 잠금 안에서 다시 읽어 합칩니다.
+        # 새 주차의 members 위치는 처음 읽은 길이 그대로라, 그 뒤에 생긴 이름 변경·삭제도 새 주차에 적용됩니다.
+        with self._locked_index() as index:
+            already = sorted(week_id for week_id in new_entries if week_id in index['weeks'])
+            if already: raise ArchivedWeekError(f"이미 보관된 주차입니다: {', '.join(already)}")
+            self._write_index({**index['weeks'], **new_entries}, index['members'])
+        return sorted(new_entries)
+
+    def rename_member(self, old_name, new_name):
+        """보관된 계획의 팀원 이름을 바꿉니다. 세그먼트는 그대로 두고 색인에 기록만 남겨 읽을 때 반영합니다."""
+        self._record_member(str(old_name), str(new_name))
+
+    def delete_member(self, name):
+        """보관된 계획에서 팀원을 지웁니다. 이후 같은 이름으로 보관한 주차에는 영향이 없습니다."""
+        self._record_member(str(name), None)
+
+    def _record_member(self, old_name, new_name):
+        if not self._current_index()['weeks']: return
+        with self._locked_index() as index:
+            self._write_index(index['weeks'], index['members'] + [[old_name, new_name]])
+
+
+# --- 2. 보관소를 거치는 저장소 ---
+
+class ArchivedStorage(StorageBackend):
+    """보관된 주차는 보관소에서, 나머지는 live 저장소에서 읽는 저장소입니다.
+
+    보관된 주차는 시트를 건드리지 않고 읽으며, 그 주차의 계획을 고치는 변경은 ArchivedWeekError로 거절합니다.
+    팀원 이름 변경·영구 삭제는 live 저장소에 반영한 뒤 보관소에도 기록합니다. 두 기록 모두 여러 번
+    적용해도 결과가 같아서, 보관소 쓰기가 실패해 저장 큐가 다시 시도해도 괜찮습니다.
+    """
+
+    def __init__(self, live, archive):
+        self.live = live
+        self.archive = archive
+
+    def connect(self):
+        self.live.connect()
+        return self
+
+    def is_archived(self, week_id):
+        return week_id in self.archive
+
+    def load_members(self):
+        return self.live.load_members()
+
+    def list_week_ids(self):
+        return sorted(set(self.live.list_week_ids()) | set(self.archive.week_ids()))
+
+    def load_weeks(self, week_ids):
+        week_ids = list(dict.fromkeys(map(str, week_ids)))
+        archived = [week_id for week_id in week_ids if week_id in self.archive]
+        live = [week_id for week_id in week_ids if week_id not in self.archive]
+        plans = self.live.load_weeks(live) if live else {}
+        if archived: plans.update(self.archive.load_weeks(archived))
+        return plans
+
+    def load_all(self):
+        data = self.live.load_all()
+        data['plans'] = {week_id: week_plans for week_id, week_plans in data['plans'].items() if week_id not in self.archive}
+        data['plans'].update(self.archive.load_weeks(self.archive.week_ids()))
+        return data
+
+    def save_all(self, data):
+        plans = {week_id: week_plans for week_id, week_plans in data.get('plans', {}).items() if week_id not in self.archive}
+        self.live.save_all({**data, 'plans': plans})
+
+    def apply_ops(self, ops):
+        archived = sorted({op[1] for op in ops if op[0] == 'plan' and op[1] in self.archive})
+        if archived: raise ArchivedWeekError(f"보관된 주차는 고칠 수 없습니다: {', '.join(archived)}")
+        self.live.apply_ops(ops)
+        for op in ops:
+            if op[0] == 'rename_plans': self.archive.rename_member(op[1], op[2])
+            elif op[0] == 'delete_plans': self.archive.delete_member(op[1])
+
+
+# --- 3. 보관 실행 ---
+
+def hot_window_start(today=None, keep_quarters=DEFAULT_KEEP_QUARTERS):
+    """시트에 남길 첫 주차 ID입니다. keep_quarters=2이면 지난 분기 첫날이 든 주부터 남깁니다.
+
+    분기 경계와 관계없이 최근 MIN_HOT_WEEKS주는 언제나 남깁니다.
+    """
+    today = today or date.today()
+    quarter_index = today.year * 4 + (today.month - 1) // 3 - (keep_quarters - 1)
+    first_day = min(date(quarter_index // 4, quarter_index % 4 * 3 + 1, 1), today - timedelta(weeks=MIN_HOT_WEEKS))
+    iso_year, iso_week, _ = (first_day - timedelta(days=first_day.weekday())).isocalendar()
+    return f"{iso_year}-W{iso_week:02d}"
+
+
+def archive_cold_weeks(live, archive, cutoff, dry_run=False, log=print):
+    """live 저장소에서 cutoff보다 이전 주차를 보관소로 옮기고 live에서 지웁니다. 옮긴 주차 ID 목록을 반환합니다."""
+    cold = [week_id for week_id in live.list_week_ids() if week_id < cutoff]
+    to_write = [week_id for week_id in cold if week_id not in archive]
+    log(f"시트에 남길 첫 주차 {cutoff}: 옮길 주차 {len(cold)}개 (새로 보관 {len(to_write)}개)")
+    if dry_run or not cold: return cold
+    plans = live.load_weeks(cold)
+    if to_write:
+        written = archive.add_weeks({week_id: plans[week_id] for week_id in to_write if week_id in plans})
+        log(f"{len(written)}개 주차를 보관소({archive.path})에 쓰고 검증했습니다.")
+    ops = [('plan', week_id, name, None) for week_id in cold for name in plans.get(week_id, {})]
+    for start in range(0, len(ops), DELETE_BATCH_OPS): live.apply_ops(ops[start:start + DELETE_BATCH_OPS])
+    log(f"시트에서 계획 {len(ops)}건을 지웠습니다.")
+    return cold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR, help="보관소 디렉터리")
+    parser.add_argument("--keep-quarters", type=int, default=DEFAULT_KEEP_QUARTERS, help="시트에 남길 분기 수(이번 분기 포함)")
+    parser.add_argument("--backend", choices=("sheets", "sqlite"), default="sheets", help="옮길 원본 저장소")
+    parser.add_argument("--secrets", default=DEFAULT_SECRETS_FILE, help="gcp_service_account가 들어 있는 secrets.toml 경로")
+    parser.add_argument("--sheet", default=DEFAULT_SHEET_NAME, help="스프레드시트 이름")
+    parser.add_argument("--sqlite-path", default=DEFAULT_SQLITE_PATH, help="SQLite 파일 경로")
+    parser.add_argument("--dry-run", action="store_true", help="옮길 주차만 보여 주고 아무것도 바꾸지 않습니다")
+    args = parser.parse_args()
+    if args.keep_quarters < 1: parser.error("--keep-quarters는 1 이상이어야 합니다.")
+    if args.backend == "sqlite":
+        from sqlite_backend import SqliteBackend
+        live = SqliteBackend(args.sqlite_path)
+    else:
+        import toml
+        from storage import SheetsBackend, SheetsConnection
+        live = SheetsBackend(SheetsConnection(toml.load(args.secrets)["gcp_service_account"], args.sheet))
+    archive_cold_weeks(live.connect(), PlanArchive(args.archive_dir), hot_window_start(keep_quarters=args.keep_quarters),
+                       dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
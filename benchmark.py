@@ -0,0 +1,267 @@
+"""팀원과 기록이 늘어날 때 주요 경로가 얼마나 느려지는지 재는 벤치마크입니다.
+
+    python benchmark.py                                       # 팀원 30명, 3년치 계획
+    python benchmark.py --members 100 --years 5 --text-length 80
+    python benchmark.py --only load,save_plan --json result.json
+    python benchmark.py --baseline result.json                # 기준보다 느려지면 종료 코드 1
+
+합성 데이터(팀원 N명을 TEAM_ORDER·RANK_ORDER에 고르게 나누고, M년치 주간 계획을 한국어 문장으로
+채움)를 가짜 Google Sheets(fake_sheets.py)에 넣고 다음을 잽니다.
+
+- save_all: 전체 다시 쓰기 (시트에 합성 데이터를 채우는 단계이기도 합니다)
+- load: 공유 캐시의 첫 적재(앱의 load_data)와 전체 적재(load_all)
+- save_plan: 계획 한 건 저장(save_member_plan이 저장 큐를 거쳐 부르는 SharedDataCache.save)
+- render: streamlit AppTest로 앱을 fake_sheets 저장소로 띄워 메인 계획표(9번 구역)를 그리는 첫 실행과 다시 실행
+- pdf: 한 주 PDF(generate_pdf)의 첫 생성, 다시 그리기, 캐시 적중
+
+항목마다 벽시계 시간, 가짜 시트 API 요청 수, 주고받은 본문 바이트, 최대 메모리(tracemalloc)를
+출력합니다. 메모리를 추적하는 동안은 파이썬 코드가 느려지므로 시간만 비교하려면 --no-memory를 쓰세요.
+"""
+import argparse
+import ast
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from fake_sheets import FakeSheetsConnection, get_server
+from pdf_export import build_pdf, generate_pdf, week_report
+from shared_cache import SharedDataCache
+from storage import SheetsBackend
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weekly_auto.py")
+APP_CONSTANTS = ("TEAM_ORDER", "RANK_ORDER", "FONT_FILE", "GOOGLE_SHEET_NAME")
+SCENARIOS = ("save_all", "load", "save_plan", "render", "pdf")
+SAVE_PLAN_REPEAT = 20
+DEFAULT_TOLERANCE = 1.5   # 기준 결과보다 이 배수 넘게 느려지거나 요청이 늘면 회귀로 봅니다.
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN_SYLLABLES = "민서준지현우영수진하은도윤채성예주원태희연호재경"
+WORDS = ["고객사", "미팅", "제안서", "작성", "검토", "계약", "갱신", "견적", "발송", "내부", "회의", "보고",
+         "자료", "정리", "신규", "리드", "발굴", "후속", "연락", "파트너", "온보딩", "교육", "데이터", "분석",
+         "대시보드", "업데이트", "캠페인", "기획", "일정", "조율", "출장", "준비", "샘플", "요청", "대응", "완료",
+         "진행", "중", "예정", "공유", "피드백", "반영", "수출", "바이어", "가격", "협상", "물류", "확인"]
+
+
+# --- 1. 합성 데이터 ---
+
+def app_constants(path=APP_FILE):
+    """weekly_auto.py를 실행하지 않고 TEAM_ORDER 같은 상수 값만 읽어 옵니다."""
+    with open(path, encoding="utf-8") as f: tree = ast.parse(f.read())
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and getattr(node.targets[0], 'id', None) in APP_CONSTANTS:
+            constants[node.targets[0].id] = ast.literal_eval(node.value)
+    return constants
+
+
+def week_id_of(date_obj):
+    """앱의 week_id_of와 같은 규칙의 주차 ID입니다."""
+    return f"{date_obj.year}-W{str(date_obj.isocalendar()[1]).zfill(2)}"
+
+
+def korean_text(rng, length):
+    """업무 보고에 나올 법한 낱말을 이어 약 length 글자의 문장을 만듭니다."""
+    words, size = [], 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def make_members(rng, count, team_order, rank_order):
+    names, members = set(), []
+    for i in range(count):
+        name = rng.choice(SURNAMES) + "".join(rng.choice(GIVEN_SYLLABLES) for _ in range(2))
+        while name in names: name += str(rng.randrange(10))
+        names.add(name)
+        members.append({"name": name, "rank": rng.choice(rank_order), "team": team_order[i % len(team_order)]})
+    return members
+
+
+def make_plan(rng, text_length, prev_plan):
+    """한 주 계획입니다. 화면과 같이 지난주 칸·리뷰는 지난주 계획에서 이어받습니다."""
+    grid = {f"{day}_{half}": korean_text(rng, rng.randint(text_length // 2, text_length))
+            for day in ('mon', 'tue', 'wed', 'thu', 'fri') for half in ('am', 'pm') if rng.random() < 0.8}
+    return {"grid": grid, "lastWeekGrid": dict(prev_plan.get('grid', {})),
+            "lastWeekReview": prev_plan.get('nextWeekPlan', ""), "nextWeekPlan": korean_text(rng, text_length * 2),
+            "selfReview": korean_text(rng, text_length), "managerReview": korean_text(rng, text_length) if rng.random() < 0.5 else ""}
+
+
+def make_dataset(members=30, years=3, text_length=40, seed=0, end_date=None, team_order=(), rank_order=()):
+    """팀원 members명, end_date 주까지 years년치 주간 계획을 담은 all_data를 만듭니다. 주마다 약 90%가 작성합니다."""
+    rng = random.Random(seed)
+    end_date = end_date or datetime.now() + timedelta(weeks=1)
+    team_members = make_members(rng, members, team_order, rank_order)
+    plans, prev_plans = {}, {}
+    for weeks_ago in range(years * 52 - 1, -1, -1):
+        week_plans = {m['name']: make_plan(rng, text_length, prev_plans.get(m['name'], {}))
+                      for m in team_members if rng.random() < 0.9}
+        if week_plans: plans[week_id_of(end_date - timedelta(weeks=weeks_ago))] = week_plans
+        prev_plans = week_plans
+    return {"team_members": team_members, "plans": plans}
+
+
+# --- 2. 측정 ---
+
+def measure(name, fn, server, repeat=1, track_memory=True):
+    """fn을 repeat번 불러 한 번당 시간·요청 수·바이트와 전체 최대 메모리를 잽니다."""
+    gc.collect()
+    server.reset_stats()
+    if track_memory: tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        for _ in range(repeat): fn()
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if track_memory else None
+        if track_memory: tracemalloc.stop()
+    stats = server.stats()
+    return {"name": name, "seconds": elapsed / repeat, "requests": (stats['read'] + stats['write']) / repeat,
+            "sent": stats['sent'] / repeat, "received": stats['received'] / repeat,
+            "peak_mb": None if peak is None else peak / 2 ** 20}
+
+
+def fresh_backend(server):
+    """프로세스를 새로 띄운 것처럼 연결·행 인덱스가 비어 있는 저장소입니다."""
+    return SheetsBackend(FakeSheetsConnection(server))
+
+
+def bench_save_all(server, data, track_memory):
+    return [measure("save_all", lambda: fresh_backend(server).save_all(data), server, track_memory=track_memory)]
+
+
+def bench_load(server, week_ids, track_memory):
+    return [measure("load_data (캐시 첫 적재)", lambda: SharedDataCache(fresh_backend(server)).snapshot(week_ids),
+                    server, track_memory=track_memory),
+            measure("load_all (전체)", lambda: fresh_backend(server).load_all(), server, track_memory=track_memory)]
+
+
+def bench_save_plan(server, data, week_ids, rng, text_length, track_memory):
+    cache = SharedDataCache(fresh_backend(server))
+    cache.snapshot(week_ids)
+    targets = [(week_id, name) for week_id in week_ids for name in data['plans'].get(week_id, {})]
+
+    def save_one():
+        week_id, name = rng.choice(targets)
+        plan = make_plan(rng, text_length, data['plans'][week_id][name])
+        cache.save([('plan', week_id, name, plan)])
+    return [measure("save_member_plan", save_one, server, repeat=SAVE_PLAN_REPEAT, track_memory=track_memory)]
+
+
+def bench_render(server, track_memory):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        os.environ["STORAGE_BACKEND"] = "fake_sheets"
+        os.environ["SNAPSHOT_PATH"] = os.path.join(snapshot_dir, "snapshot.json.gz")
+        app = AppTest.from_file(APP_FILE, default_timeout=600)
+        results = [measure("render (첫 실행)", app.run, server, track_memory=track_memory),
+                   measure("render (다시 실행)", app.run, server, track_memory=track_memory)]
+        if app.exception: raise RuntimeError(f"앱 실행 중 오류: {app.exception[0].message}")
+        # 서버를 다시 띄운 것처럼 공유 캐시를 비우고, 첫 실행이 남긴 스냅샷으로 시작합니다.
+        st.cache_resource.clear()
+        restarted = AppTest.from_file(APP_FILE, default_timeout=600)
+        results.append(measure("render (스냅샷으로 재시작)", restarted.run, server, track_memory=track_memory))
+        if restarted.exception: raise RuntimeError(f"앱 실행 중 오류: {restarted.exception[0].message}")
+    return results
+
+
+def bench_pdf(server, data, end_date, font_file, constants, track_memory):
+    if not os.path.exists(font_file):
+        print(f"폰트 파일({font_file})이 없어 pdf 항목을 건너뜁니다.", file=sys.stderr)
+        return []
+    prev_date = end_date - timedelta(weeks=1)
+    dates = [[(d - timedelta(days=d.weekday() - i)).strftime("%m/%d") for i in range(5)] for d in (end_date, prev_date)]
+    report = week_report(end_date.isocalendar()[0], end_date.isocalendar()[1], dates[0], dates[1],
+                         data['plans'].get(week_id_of(end_date), {}), data['plans'].get(week_id_of(prev_date), {}))
+    args = ([report], data['team_members'], font_file, constants['TEAM_ORDER'], constants['RANK_ORDER'])
+    results = [measure("generate_pdf (첫 생성)", lambda: build_pdf(*args), server, track_memory=track_memory),
+               measure("generate_pdf (다시 그리기)", lambda: build_pdf(*args), server, track_memory=track_memory)]
+    generate_pdf(report, *args[1:])
+    results.append(measure("generate_pdf (캐시)", lambda: generate_pdf(report, *args[1:]), server, track_memory=track_memory))
+    return results
+
+
+# --- 3. 보고 ---
+
+def print_table(results):
+    header = f"{'항목':<28}{'시간(ms)':>12}{'요청':>8}{'보냄(KB)':>12}{'받음(KB)':>12}{'최대 메모리(MB)':>16}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        peak = "-" if r['peak_mb'] is None else f"{r['peak_mb']:.1f}"
+        print(f"{r['name']:<28}{r['seconds'] * 1000:>12.1f}{r['requests']:>8.1f}{r['sent'] / 1024:>12.1f}"
+              f"{r['received'] / 1024:>12.1f}{peak:>16}")
+
+
+def regressions(results, baseline, tolerance):
+    """기준 결과와 같은 이름의 항목 중 시간이나 요청 수가 tolerance배를 넘은 것을 찾습니다."""
+    base = {r['name']: r for r in baseline['results']}
+    found = []
+    for r in results:
+        b = base.get(r['name'])
+        if b is None: continue
+        for key in ('seconds', 'requests'):
+            if r[key] > b[key] * tolerance and r[key] - b[key] > (0.005 if key == 'seconds' else 0):
+                found.append(f"{r['name']}: {key} {b[key]:.3f} → {r[key]:.3f}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=30, help="팀원 수")
+    parser.add_argument("--years", type=int, default=3, help="계획이 쌓인 햇수")
+    parser.add_argument("--text-length", type=int, default=40, help="칸 하나에 들어가는 글자 수(최대)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 데이터 난수 시드")
+    parser.add_argument("--latency", type=float, default=0.0, help="가짜 시트 요청마다 기다릴 시간(초)")
+    parser.add_argument("--only", default=",".join(SCENARIOS), help=f"쉼표로 구분한 측정 항목 ({', '.join(SCENARIOS)})")
+    parser.add_argument("--font", help="PDF 폰트 파일 (기본값은 앱의 FONT_FILE)")
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc으로 메모리를 재지 않습니다")
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--baseline", help="비교할 이전 --json 결과")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="회귀로 볼 배수")
+    args = parser.parse_args()
+    scenarios = [s.strip() for s in args.only.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown: parser.error(f"알 수 없는 항목: {', '.join(sorted(unknown))}")
+
+    constants = app_constants()
+    end_date = datetime.now() + timedelta(weeks=1)   # 앱이 처음 여는 주
+    data = make_dataset(args.members, args.years, args.text_length, args.seed, end_date,
+                        constants['TEAM_ORDER'], constants['RANK_ORDER'])
+    plan_count = sum(len(week_plans) for week_plans in data['plans'].values())
+    print(f"팀원 {len(data['team_members'])}명, {len(data['plans'])}주, 계획 {plan_count}건 (칸당 최대 {args.text_length}자)")
+    # 앱의 fake_sheets 저장소가 같은 서버를 쓰도록 앱과 같은 이름으로 만듭니다. 한도는 두지 않습니다.
+    server = get_server(constants['GOOGLE_SHEET_NAME'], latency=args.latency, read_quota=None, write_quota=None)
+    track_memory = not args.no_memory
+    window = [week_id_of(end_date + timedelta(weeks=offset)) for offset in (0, -1, 1, -2)]   # 앱의 week_window
+    rng = random.Random(args.seed + 1)
+
+    seeded = bench_save_all(server, data, track_memory)   # 시트를 채우는 단계라 항상 돌립니다.
+    results = seeded if "save_all" in scenarios else []
+    if "load" in scenarios: results += bench_load(server, window, track_memory)
+    if "save_plan" in scenarios: results += bench_save_plan(server, data, window[:2], rng, args.text_length, track_memory)
+    if "render" in scenarios: results += bench_render(server, track_memory)
+    if "pdf" in scenarios: results += bench_pdf(server, data, end_date, args.font or constants['FONT_FILE'], constants, track_memory)
+    print_table(results)
+
+    if args.json:
+        params = {k: getattr(args, k) for k in ('members', 'years', 'text_length', 'seed', 'latency')}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": params, "results": results}, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f: found = regressions(results, json.load(f), args.tolerance)
+        for line in found: print(f"회귀: {line}")
+        if found: sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
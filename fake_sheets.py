@@ -0,0 +1,302 @@
+"""Google Sheets API를 흉내 내는 메모리 안의 가짜 스프레드시트.
+
+gspread의 Spreadsheet·Worksheet 중 storage.py와 migrate_plans.py가 쓰는 메서드만 같은
+모양으로 구현합니다. 요청마다 지연 시간을 주고, 분당 읽기·쓰기 한도를 넘으면 실제처럼
+429 APIError를 냅니다. 요청 수와 주고받은 바이트를 세어 두므로 인증 없이 앱을 띄우거나 부하를 재 볼 수 있습니다.
+"""
+import json
+import threading
+import time
+from collections import Counter, deque
+
+import gspread
+from gspread.utils import a1_range_to_grid_range
+
+from storage import MEMBERS_SHEET, PLANS_SHEET, SheetsConnection
+
+DEFAULT_ROWS, DEFAULT_COLS = 1000, 26
+READ_REQUESTS_PER_MINUTE = 60    # Sheets API 사용자당 기본 한도
+WRITE_REQUESTS_PER_MINUTE = 60
+
+
+class _FakeResponse:
+    """gspread.exceptions.APIError가 읽는 만큼만 requests.Response를 흉내 냅니다."""
+
+    def __init__(self, code, message, status):
+        self.status_code = code
+        self.headers = {}
+        self.text = message
+        self._error = {"code": code, "message": message, "status": status}
+
+    def json(self):
+        return {"error": self._error}
+
+
+def _api_error(code, message, status):
+    return gspread.exceptions.APIError(_FakeResponse(code, message, status))
+
+
+def quota_error(kind='write'):
+    """분당 kind('read'·'write') 요청 한도를 넘었을 때 Sheets API가 내는 429 APIError를 만듭니다."""
+    return _api_error(429, f"Quota exceeded for {kind} requests per minute per user.", "RESOURCE_EXHAUSTED")
+
+
+def _split_range(range_name):
+    """"'시트'!A1:B2" 형식을 (시트 제목, A1 범위 또는 None)으로 나눕니다."""
+    title, sep, a1 = range_name.rpartition('!')
+    if not sep: title, a1 = a1, None
+    if title.startswith("'") and title.endswith("'"): title = title[1:-1].replace("''", "'")
+    return title, a1
+
+
+def _payload_size(payload):
+    """요청·응답 본문을 JSON(UTF-8)으로 보냈을 때의 바이트 수입니다. 워크시트 객체는 제목으로 셉니다."""
+    if payload is None: return 0
+    return len(json.dumps(payload, ensure_ascii=False, default=lambda o: getattr(o, 'title', None)).encode())
+
+
+def _cell_value(cell):
+    value = next(iter(cell.get('userEnteredValue', {}).values()), '')
+    if isinstance(value, bool): return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer(): value = int(value)
+    return str(value)
+
+
+class FakeWorksheet:
+    """워크시트 하나입니다. 값은 모두 문자열로 저장해 FORMATTED_VALUE로 읽은 것처럼 돌려줍니다."""
+
+    def __init__(self, server, sheet_id, title, rows=DEFAULT_ROWS, cols=DEFAULT_COLS):
+        self.spreadsheet = server
+        self.id = sheet_id
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self._rows = []
+
+    # 내부 셀 조작 (서버 잠금 안에서 호출)
+    def _set(self, row, col, value):
+        """0부터 세는 (행, 열)에 값을 씁니다. 격자보다 크면 늘립니다."""
+        while len(self._rows) <= row: self._rows.append([])
+        cells = self._rows[row]
+        while len(cells) <= col: cells.append('')
+        cells[col] = '' if value is None else str(value)
+        self.row_count, self.col_count = max(self.row_count, row + 1), max(self.col_count, col + 1)
+
+    def _last_data_row(self):
+        rows = len(self._rows)
+        while rows and not any(self._rows[rows - 1]): rows -= 1
+        return rows
+
+    def _append(self, values_rows):
+        start = self._last_data_row()
+        for offset, values in enumerate(values_rows):
+            for col, value in enumerate(values): self._set(start + offset, col, value)
+        return start
+
+    def _read(self, a1=None):
+        """범위의 값을 실제 API처럼 뒤쪽 빈 셀과 빈 행을 잘라 돌려줍니다."""
+        grid = a1_range_to_grid_range(a1) if a1 else {}
+        r0, r1 = grid.get('startRowIndex', 0), grid.get('endRowIndex', self.row_count)
+        c0, c1 = grid.get('startColumnIndex', 0), grid.get('endColumnIndex', self.col_count)
+        values = []
+        for cells in self._rows[r0:r1]:
+            cells = list(cells[c0:c1])
+            while cells and cells[-1] == '': cells.pop()
+            values.append(cells)
+        while values and not values[-1]: values.pop()
+        return values
+
+    # gspread.Worksheet 메서드
+    def get(self, range_name=None, **kwargs):
+        return self.spreadsheet._request('read', 'get', lambda: self._read(range_name))
+
+    def get_values(self, range_name=None, **kwargs):
+        return self.spreadsheet._request('read', 'get_values', lambda: self._read(range_name))
+
+    def update(self, values=None, range_name=None, **kwargs):
+        def write():
+            grid = a1_range_to_grid_range(range_name or "A1")
+            r0, c0 = grid.get('startRowIndex', 0), grid.get('startColumnIndex', 0)
+            for i, row_values in enumerate(values):
+                for j, value in enumerate(row_values): self._set(r0 + i, c0 + j, value)
+            return {"updatedRange": range_name}
+        return self.spreadsheet._request('write', 'update', write, values)
+
+    def append_row(self, values, **kwargs):
+        return self.append_rows([values], **kwargs)
+
+    def append_rows(self, values, **kwargs):
+        return self.spreadsheet._request('write', 'append_rows', lambda: self._append(values), values)
+
+    def update_cells(self, cell_list, **kwargs):
+        def write():
+            for cell in cell_list: self._set(cell.row - 1, cell.col - 1, cell.value)
+        return self.spreadsheet._request('write', 'update_cells', write, [[c.row, c.col, c.value] for c in cell_list])
+
+    def resize(self, rows=None, cols=None):
+        def write():
+            if rows is not None:
+                self.row_count = rows
+                del self._rows[rows:]
+            if cols is not None:
+                self.col_count = cols
+                for cells in self._rows: del cells[cols:]
+        return self.spreadsheet._request('write', 'resize', write)
+
+    def clear(self):
+        return self.spreadsheet._request('write', 'clear', self._rows.clear)
+
+
+class FakeSheetsServer:
+    """gspread.Spreadsheet 자리에 넣어 쓰는 가짜 스프레드시트입니다.
+
+    latency초만큼 요청마다 기다리고, 최근 1분 동안의 읽기·쓰기 요청 수가 한도에 닿으면
+    429 오류를 냅니다(None이면 한도 없음). calls에는 메서드별, requests에는 읽기·쓰기별
+    요청 수가, traffic에는 보낸(sent)·받은(received) 본문 바이트가 쌓입니다. on_request가 있으면
+    SheetsConnection과 같이 요청마다 on_request(kind, method, sent, received, seconds)를 부릅니다.
+    여러 스레드에서 동시에 불러도 됩니다.
+    """
+
+    def __init__(self, title="fake", sheets=(MEMBERS_SHEET, PLANS_SHEET), latency=0.0,
+                 read_quota=READ_REQUESTS_PER_MINUTE, write_quota=WRITE_REQUESTS_PER_MINUTE):
+        self.title = self.id = title
+        self.latency = latency
+        self.quotas = {'read': read_quota, 'write': write_quota}
+        self.calls = Counter()
+        self.requests = Counter()
+        self.traffic = Counter()
+        self.on_request = None
+        self._recent = {'read': deque(), 'write': deque()}
+        self._lock = threading.RLock()
+        self._sheets = {}
+        for title in sheets: self._add_sheet(title)
+
+    def _add_sheet(self, title, rows=DEFAULT_ROWS, cols=DEFAULT_COLS):
+        ws = FakeWorksheet(self, len(self._sheets), title, rows, cols)
+        self._sheets[title] = ws
+        return ws
+
+    def _request(self, kind, method, fn, payload=None):
+        """요청 하나를 흉내 냅니다. 지연 → 한도 확인 → 실행 순서입니다. payload는 요청 본문입니다."""
+        start = time.perf_counter()
+        if self.latency: time.sleep(self.latency)
+        with self._lock:
+            now, recent, quota = time.monotonic(), self._recent[kind], self.quotas[kind]
+            while recent and now - recent[0] >= 60: recent.popleft()
+            if quota is not None and len(recent) >= quota:
+                self.calls['quota_exceeded'] += 1
+                raise quota_error(kind)
+            recent.append(now)
+            self.calls[method] += 1
+            self.requests[kind] += 1
+            result = fn()
+            sent, received = _payload_size(payload), _payload_size(result)
+            self.traffic['sent'] += sent
+            self.traffic['received'] += received
+        if self.on_request is not None: self.on_request(kind, method, sent, received, time.perf_counter() - start)
+        return result
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls.clear()
+            self.requests.clear()
+            self.traffic.clear()
+
+    def stats(self):
+        """지금까지의 요청 수와 바이트를 {"read", "write", "sent", "received", "calls": {메서드: 횟수}}로 반환합니다."""
+        with self._lock:
+            return {"read": self.requests['read'], "write": self.requests['write'], "sent": self.traffic['sent'],
+                    "received": self.traffic['received'], "calls": dict(self.calls)}
+
+    def values(self, title):
+        """시트 전체 값을 그대로 돌려줍니다. 요청 수에 세지 않는 확인용 메서드입니다."""
+        with self._lock: return [list(cells) for cells in self._sheets[title]._read()]
+
+    # gspread.Spreadsheet 메서드
+    def worksheets(self):
+        return self._request('read', 'worksheets', lambda: list(self._sheets.values()))
+
+    def worksheet(self, title):
+        def find():
+            if title not in self._sheets: raise gspread.exceptions.WorksheetNotFound(title)
+            return self._sheets[title]
+        return self._request('read', 'worksheet', find)
+
+    def add_worksheet(self, title, rows, cols, **kwargs):
+        return self._request('write', 'add_worksheet', lambda: self._add_sheet(title, rows, cols),
+                             {"title": title, "rows": rows, "cols": cols})
+
+    def fetch_sheet_metadata(self, params=None):
+        return self._request('read', 'fetch_sheet_metadata', lambda: {"spreadsheetId": self.id})
+
+    def values_batch_get(self, ranges, params=None):
+        def read():
+            value_ranges = []
+            for range_name in ranges:
+                title, a1 = _split_range(range_name)
+                if title not in self._sheets: raise _api_error(400, f"Unable to parse range: {range_name}", "INVALID_ARGUMENT")
+                values = self._sheets[title]._read(a1)
+                value_ranges.append({"range": range_name, "majorDimension": "ROWS", **({"values": values} if values else {})})
+            return {"spreadsheetId": self.id, "valueRanges": value_ranges}
+        return self._request('read', 'values_batch_get', read, list(ranges))
+
+    def batch_update(self, body):
+        """updateCells·deleteDimension·appendCells·updateSheetProperties 요청을 차례대로 적용합니다."""
+        def write():
+            by_id = {ws.id: ws for ws in self._sheets.values()}
+            for request in body["requests"]:
+                (kind, spec), = request.items()
+                if kind == 'updateCells':
+                    grid, ws = spec['range'], by_id[spec['range']['sheetId']]
+                    for i, row in enumerate(spec['rows']):
+                        for j, cell in enumerate(row.get('values', [])):
+                            ws._set(grid['startRowIndex'] + i, grid['startColumnIndex'] + j, _cell_value(cell))
+                elif kind == 'deleteDimension':
+                    grid, ws = spec['range'], by_id[spec['range']['sheetId']]
+                    del ws._rows[grid['startIndex']:grid['endIndex']]
+                    ws.row_count -= grid['endIndex'] - grid['startIndex']
+                elif kind == 'appendCells':
+                    by_id[spec['sheetId']]._append([[_cell_value(c) for c in row.get('values', [])] for row in spec['rows']])
+                elif kind == 'updateSheetProperties':
+                    props = spec['properties']
+                    ws = by_id[props['sheetId']]
+                    if 'title' in props:
+                        del self._sheets[ws.title]
+                        ws.title = props['title']
+                        self._sheets[ws.title] = ws
+                else:
+                    raise _api_error(400, f"Unsupported request: {kind}", "INVALID_ARGUMENT")
+            return {"spreadsheetId": self.id, "replies": [{} for _ in body["requests"]]}
+        return self._request('write', 'batch_update', write, body)
+
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def get_server(title, **kwargs):
+    """title 이름의 가짜 스프레드시트를 프로세스 안에서 하나만 만들어 돌려줍니다.
+
+    앱의 fake_sheets 저장소와 같은 프로세스의 벤치마크·부하 도구가 같은 데이터를 보도록 할 때
+    씁니다. kwargs(latency, 한도)는 처음 만들 때만 쓰입니다.
+    """
+    with _servers_lock:
+        if title not in _servers: _servers[title] = FakeSheetsServer(title, **kwargs)
+        return _servers[title]
+
+
+class FakeSheetsConnection(SheetsConnection):
+    """SheetsConnection과 같은 재사용·재연결 흐름을 인증 없이 FakeSheetsServer에 붙여 돌립니다."""
+
+    def __init__(self, server, **kwargs):
+        super().__init__({}, server.title, **kwargs)
+        self.server = server
+
+    def _connect(self):
+        if self.on_request is not None: self.server.on_request = self.on_request
+        self._spreadsheet = self.server
+        self._worksheets = {ws.title: ws for ws in self.server.worksheets()}
+        self._last_success = time.monotonic()
+
+    def _refresh_token_if_needed(self):
+        pass
@@ -0,0 +1,154 @@
+"""앱의 주요 경로 소요 시간, 시트 API 요청 수·바이트, 분당 할당량 사용량을 모으는 모듈.
+
+서버 프로세스에 Metrics 하나를 두고 여러 세션과 저장 큐 스레드가 함께 기록합니다. 모은 값은
+관리자 사이드바에 보여 주거나 Prometheus 텍스트·JSON으로 내보냅니다. logger를 주면 기록할
+때마다 한 줄짜리 JSON 로그도 남깁니다.
+"""
+import json
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+
+QUOTA_WINDOW_SECONDS = 60       # Sheets API 할당량은 사용자당 분 단위로 셉니다.
+HISTORY_MINUTES = 30            # 분당 요청 수를 남겨 두는 기간
+SAMPLE_SIZE = 500               # 시간 분포(p50·p95)를 계산할 때 쓰는 최근 측정값 수
+METRIC_PREFIX = "weekly_auto"
+
+
+class Timing:
+    """이름 하나의 소요 시간 요약입니다. 분위수는 최근 SAMPLE_SIZE개로 계산합니다."""
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self, sample_size=SAMPLE_SIZE):
+        self.count, self.total, self.max = 0, 0.0, 0.0
+        self.samples = deque(maxlen=sample_size)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def quantile(self, q):
+        if not self.samples: return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self):
+        return {"count": self.count, "total": self.total, "mean": self.total / self.count if self.count else 0.0,
+                "p50": self.quantile(0.5), "p95": self.quantile(0.95), "max": self.max}
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    """소요 시간·횟수·시트 요청을 모읍니다. 여러 스레드에서 동시에 불러도 됩니다."""
+
+    def __init__(self, logger=None, history_minutes=HISTORY_MINUTES, sample_size=SAMPLE_SIZE):
+        self.logger = logger
+        self.history_minutes = history_minutes
+        self.sample_size = sample_size
+        self.started_at = time.time()
+        self._timings = {}
+        self._counters = Counter()
+        self._requests = Counter()          # (읽기/쓰기, 메서드) → 요청 수
+        self._bytes = Counter()             # sent/received → 바이트
+        self._recent = {'read': deque(), 'write': deque()}   # 최근 1분 요청 시각 (할당량 계산용)
+        self._minutes = OrderedDict()       # 분 시작 시각 → Counter(read, write)
+        self._lock = threading.Lock()
+
+    def _log(self, event, **fields):
+        if self.logger is None: return
+        self.logger.info(json.dumps({"event": event, "ts": round(time.time(), 3), **fields}, ensure_ascii=False))
+
+    # 기록
+    def observe(self, name, seconds, **fields):
+        """name 작업이 seconds초 걸렸음을 기록합니다. fields는 로그에만 함께 남깁니다."""
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None: timing = self._timings[name] = Timing(self.sample_size)
+            timing.add(seconds)
+        self._log("timing", name=name, seconds=round(seconds, 6), **fields)
+
+    @contextmanager
+    def timed(self, name, **fields):
+        """with 블록의 소요 시간을 name으로 기록합니다. 예외가 나도 기록합니다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **fields)
+
+    def count(self, name, value=1):
+        with self._lock: self._counters[name] += value
+
+    def sheets_request(self, kind, method, sent=0, received=0, seconds=None):
+        """시트 API 요청 하나를 기록합니다. kind는 'read' 또는 'write'입니다."""
+        now = time.time()
+        with self._lock:
+            self._requests[kind, method] += 1
+            self._bytes['sent'] += sent
+            self._bytes['received'] += received
+            self._recent[kind].append(now)
+            minute = int(now // 60 * 60)
+            self._minutes.setdefault(minute, Counter())[kind] += 1
+            while self._minutes and next(iter(self._minutes)) <= minute - self.history_minutes * 60:
+                self._minutes.popitem(last=False)
+        if seconds is not None: self.observe("sheets_request", seconds, method=method, sent=sent, received=received)
+        else: self._log("sheets_request", kind=kind, method=method, sent=sent, received=received)
+
+    # 조회
+    def quota_usage(self):
+        """최근 1분 동안의 읽기·쓰기 요청 수입니다. Sheets 할당량(분당 60회)과 비교해 봅니다."""
+        now = time.time()
+        with self._lock:
+            for recent in self._recent.values():
+                while recent and now - recent[0] >= QUOTA_WINDOW_SECONDS: recent.popleft()
+            return {kind: len(recent) for kind, recent in self._recent.items()}
+
+    def requests_per_minute(self):
+        """최근 HISTORY_MINUTES분의 [(분 시작 시각, 읽기 수, 쓰기 수)]입니다. 요청이 없던 분은 0으로 채웁니다."""
+        now_minute = int(time.time() // 60 * 60)
+        with self._lock: minutes = {minute: dict(counts) for minute, counts in self._minutes.items()}
+        return [(minute, minutes.get(minute, {}).get('read', 0), minutes.get(minute, {}).get('write', 0))
+                for minute in range(now_minute - (self.history_minutes - 1) * 60, now_minute + 1, 60)]
+
+    def snapshot(self):
+        """지금까지 모은 값을 JSON으로 바꿀 수 있는 dict로 반환합니다."""
+        quota = self.quota_usage()
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "timings": {name: timing.summary() for name, timing in sorted(self._timings.items())},
+                "counters": dict(self._counters),
+                "sheets_requests": [{"kind": kind, "method": method, "count": count}
+                                    for (kind, method), count in sorted(self._requests.items())],
+                "sheets_bytes": dict(self._bytes),
+                "quota_last_minute": quota,
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 형식으로 내보냅니다."""
+        snap, p = self.snapshot(), METRIC_PREFIX
+        lines = [f"# HELP {p}_duration_seconds 작업별 소요 시간", f"# TYPE {p}_duration_seconds summary"]
+        for name, t in snap['timings'].items():
+            for q in ("0.5", "0.95"):
+                lines.append(f'{p}_duration_seconds{{name="{_label(name)}",quantile="{q}"}} {t["p50" if q == "0.5" else "p95"]:.6f}')
+            lines.append(f'{p}_duration_seconds_sum{{name="{_label(name)}"}} {t["total"]:.6f}')
+            lines.append(f'{p}_duration_seconds_count{{name="{_label(name)}"}} {t["count"]}')
+        lines += [f"# HELP {p}_events_total 이벤트별 횟수", f"# TYPE {p}_events_total counter"]
+        lines += [f'{p}_events_total{{name="{_label(name)}"}} {value}' for name, value in sorted(snap['counters'].items())]
+        lines += [f"# HELP {p}_sheets_requests_total 시트 API 요청 수", f"# TYPE {p}_sheets_requests_total counter"]
+        lines += [f'{p}_sheets_requests_total{{kind="{r["kind"]}",method="{_label(r["method"])}"}} {r["count"]}'
+                  for r in snap['sheets_requests']]
+        lines += [f"# HELP {p}_sheets_bytes_total 시트 API 요청·응답 본문 바이트", f"# TYPE {p}_sheets_bytes_total counter"]
+        lines += [f'{p}_sheets_bytes_total{{direction="{direction}"}} {value}' for direction, value in sorted(snap['sheets_bytes'].items())]
+        lines += [f"# HELP {p}_sheets_quota_used 최근 1분 동안의 시트 API 요청 수", f"# TYPE {p}_sheets_quota_used gauge"]
+        lines += [f'{p}_sheets_quota_used{{kind="{kind}"}} {value}' for kind, value in sorted(snap['quota_last_minute'].items())]
+        return "\n".join(lines) + "\n"
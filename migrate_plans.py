@@ -0,0 +1,89 @@
+"""plans 시트를 plan_data JSON 형식에서 열 단위 형식으로 한 번에 옮기는 도구입니다.
+
+    python migrate_plans.py --dry-run     # 변환·검증만 하고 시트는 건드리지 않습니다.
+    python migrate_plans.py               # 실제로 옮깁니다.
+
+1. 기존 plans 시트를 모두 읽어 각 계획을 열 단위로 바꾸고, 다시 되돌려 원래 계획과 같은지 확인합니다.
+2. 새 워크시트에 전부 쓴 뒤 다시 읽어 한 번 더 확인합니다.
+3. 기존 시트는 plans_legacy_<날짜>로, 새 시트는 plans로 이름을 한 번의 요청으로 바꿉니다.
+   기존 시트는 지우지 않으므로 문제가 생기면 이름만 되돌리면 됩니다.
+
+옮긴 뒤에는 실행 중인 앱을 재시작하세요. 서버 프로세스가 예전 시트 핸들과 인덱스를 기억하고 있습니다.
+"""
+import argparse
+import sys
+from datetime import datetime
+
+import toml
+
+from storage import (COLUMNAR_PLAN_SCHEMA, LEGACY_PLAN_SCHEMA, PLANS_SHEET, SheetsConnection,
+                     plan_schema_for)
+
+DEFAULT_SECRETS_FILE = ".streamlit/secrets.toml"
+DEFAULT_SHEET_NAME = "주간업무보고_DB"
+STAGING_SHEET = "plans_columnar_migration"
+
+
+def convert_rows(rows):
+    """헤더를 포함한 예전 plans 값 목록을 열 단위 값 목록으로 바꿉니다. 되돌린 결과가 다르면 중단합니다."""
+    header = [str(h) for h in rows[0]] if rows else []
+    if plan_schema_for(header) is not LEGACY_PLAN_SCHEMA:
+        sys.exit("plans 시트가 이미 열 단위 형식입니다.")
+    week_col, member_col, data_col = header.index('week_id'), header.index('member_name'), header.index('plan_data')
+    converted, plans, skipped = [COLUMNAR_PLAN_SCHEMA.header], [], 0
+    for row in rows[1:]:
+        row = list(row) + [''] * (len(header) - len(row))
+        week_id, member_name = str(row[week_col]), str(row[member_col])
+        if not week_id or not member_name:
+            skipped += 1
+            continue
+        plan = LEGACY_PLAN_SCHEMA.decode_rows([[row[data_col]]])[0]
+        converted.append([week_id, member_name, *COLUMNAR_PLAN_SCHEMA.encode(plan)])
+        plans.append(plan)
+    verify_rows(converted, plans)
+    return converted, plans, skipped
+
+
+def verify_rows(rows, plans):
+    """열 단위 값 목록(헤더 포함)을 다시 계획으로 읽었을 때 plans와 같은지 확인합니다."""
+    decoded = COLUMNAR_PLAN_SCHEMA.decode_rows([list(r[2:]) for r in rows[1:]])
+    if len(decoded) != len(plans):
+        sys.exit(f"행 수가 다릅니다: 원본 {len(plans)}행, 변환 {len(decoded)}행")
+    for i, (original, restored) in enumerate(zip(plans, decoded)):
+        if original != restored:
+            sys.exit(f"{i + 2}행({rows[i + 1][0]}, {rows[i + 1][1]})을 손실 없이 변환하지 못했습니다.")
+
+
+def migrate(conn, dry_run=False):
+    spreadsheet = conn.spreadsheet
+    rows = conn.worksheet(PLANS_SHEET).get_values()
+    converted, plans, skipped = convert_rows(rows)
+    print(f"{len(plans)}개 계획을 변환했습니다(키가 비어 건너뛴 행 {skipped}개). 되돌림 검증 통과.")
+    if dry_run: return
+
+    staging = spreadsheet.add_worksheet(STAGING_SHEET, rows=len(converted) + 1, cols=len(COLUMNAR_PLAN_SCHEMA.header))
+    staging.update(values=converted, range_name="A1", raw=True)
+    verify_rows(staging.get_values(), plans)
+    print("새 워크시트에 쓰고 다시 읽어 검증했습니다.")
+
+    legacy_title = f"{PLANS_SHEET}_legacy_{datetime.now():%Y%m%d_%H%M%S}"
+    old_sheet = conn.worksheet(PLANS_SHEET)
+    spreadsheet.batch_update({"requests": [
+        {"updateSheetProperties": {"properties": {"sheetId": old_sheet.id, "title": legacy_title}, "fields": "title"}},
+        {"updateSheetProperties": {"properties": {"sheetId": staging.id, "title": PLANS_SHEET}, "fields": "title"}},
+    ]})
+    print(f"기존 시트는 '{legacy_title}'로 남겨 두었습니다. 실행 중인 앱을 재시작하세요.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--secrets", default=DEFAULT_SECRETS_FILE, help="gcp_service_account가 들어 있는 secrets.toml 경로")
+    parser.add_argument("--sheet", default=DEFAULT_SHEET_NAME, help="스프레드시트 이름")
+    parser.add_argument("--dry-run", action="store_true", help="변환과 검증만 하고 시트는 바꾸지 않습니다")
+    args = parser.parse_args()
+    secrets = toml.load(args.secrets)
+    migrate(SheetsConnection(secrets["gcp_service_account"], args.sheet), dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""세션 데이터(all_data)의 팀원·계획을 빠르게 찾기 위한 색인."""
+import bisect
+from collections import Counter
+
+
+class Member:
+    """팀원 한 명입니다. order는 팀원 목록에 들어온 순서로, 같은 팀·직급 안의 정렬에 씁니다."""
+    __slots__ = ('name', 'rank', 'team', 'order')
+
+    def __init__(self, name, rank, team, order):
+        self.name, self.rank, self.team, self.order = name, rank, team, order
+
+    @classmethod
+    def from_dict(cls, member, order):
+        return cls(member.get('name'), member.get('rank', ''), member.get('team', ''), order)
+
+    def to_dict(self):
+        return {'name': self.name, 'rank': self.rank, 'team': self.team}
+
+    def __repr__(self):
+        return f"Member({self.name!r}, {self.rank!r}, {self.team!r})"
+
+
+class Plan:
+    """한 주차 한 팀원의 계획입니다. data는 세션의 계획 dict 그 자체라 고치면 세션에 바로 반영됩니다."""
+    __slots__ = ('week_id', 'member_name', 'data')
+
+    def __init__(self, week_id, member_name, data):
+        self.week_id, self.member_name, self.data = week_id, member_name, data
+
+    @property
+    def grid(self):
+        return self.data.get('grid', {})
+
+    @property
+    def next_week_plan(self):
+        return self.data.get('nextWeekPlan', "")
+
+
+class ReportIndex:
+    """all_data 위에 팀·직급 순서, 주차 목록, 팀원 → 주차 색인을 유지합니다.
+
+    데이터 자체는 계속 all_data의 dict에 있고, 색인은 변경 기록(ChangeSet.ops 형식)을 하나씩 받아
+    해당 팀원·주차만 고칩니다. ChangeSet과 replay_ops에 index로 넘기면 이름 변경·삭제가 모든 주차를
+    훑지 않고 그 팀원이 있는 주차만 건드립니다.
+    """
+
+    def __init__(self, data, team_order, rank_order):
+        self.team_order = {team: i for i, team in enumerate(team_order)}
+        self.rank_order = {rank: i for i, rank in enumerate(rank_order)}
+        self.rebuild(data)
+
+    def rebuild(self, data):
+        """all_data 전체로 색인을 새로 만듭니다. 세션 데이터를 통째로 바꿨을 때 부릅니다."""
+        self.data = data
+        self._rebuild_members()
+        self._weeks = []              # 계획이 하나라도 있는 주차 (정렬)
+        self._years = Counter()       # 연도 → 그 연도의 주차 수
+        self._member_weeks = {}       # 팀원 이름 → 계획이 있는 주차 집합
+        self.add_weeks(data['plans'])
+
+    def _rebuild_members(self):
+        self._members, self._ordered, self._next_order = {}, [], 0
+        for member in self.data['team_members']:
+            if isinstance(member, dict) and member.get('name') is not None: self._add_member(member)
+
+    # 팀원 색인
+    def _sort_key(self, member):
+        return (self.team_order.get(member.team, len(self.team_order)),
+                self.rank_order.get(member.rank, len(self.rank_order)), member.order)
+
+    def _add_member(self, member_dict, order=None):
+        if order is None:
+            order, self._next_order = self._next_order, self._next_order + 1
+        member = Member.from_dict(member_dict, order)
+        self._members[member.name] = member
+        bisect.insort(self._ordered, (self._sort_key(member), member.name))
+
+    def _remove_member(self, name):
+        member = self._members.pop(name, None)
+        if member is None: return None
+        entry = (self._sort_key(member), name)
+        i = bisect.bisect_left(self._ordered, entry)
+        if i < len(self._ordered) and self._ordered[i] == entry: del self._ordered[i]
+        return member.order
+
+    def member(self, name):
+        return self._members.get(name)
+
+    def ordered_groups(self, week_id):
+        """week_id 주차에 보고서가 있는 팀원을 팀 순서, 팀 안에서는 직급 순서로 (팀, [Member]) 목록으로 묶습니다."""
+        week_plans, groups = self.data['plans'].get(week_id, {}), []
+        for (team_index, _, _), name in self._ordered:
+            if team_index == len(self.team_order): break   # 팀 순서에 없는 팀은 맨 뒤에 모여 있고 화면에 나오지 않습니다.
+            if name not in week_plans: continue
+            member = self._members[name]
+            if groups and groups[-1][0] == member.team: groups[-1][1].append(member)
+            else: groups.append((member.team, [member]))
+        return groups
+
+    # 주차 색인
+    def _week_gained(self, week_id):
+        i = bisect.bisect_left(self._weeks, week_id)
+        if i < len(self._weeks) and self._weeks[i] == week_id: return
+        self._weeks.insert(i, week_id)
+        self._years[week_id.split('-W')[0]] += 1
+
+    def _week_lost(self, week_id):
+        i = bisect.bisect_left(self._weeks, week_id)
+        if i == len(self._weeks) or self._weeks[i] != week_id: return
+        del self._weeks[i]
+        year = week_id.split('-W')[0]
+        self._years[year] -= 1
+        if not self._years[year]: del self._years[year]
+
+    def _sync_plan(self, week_id, member_name):
+        """all_data에서 (week_id, member_name) 계획이 있는지 보고 색인을 맞춥니다."""
+        week_plans = self.data['plans'].get(week_id) or {}
+        if member_name in week_plans: self._member_weeks.setdefault(member_name, set()).add(week_id)
+        else:
+            weeks = self._member_weeks.get(member_name)
+            if weeks is not None:
+                weeks.discard(week_id)
+                if not weeks: del self._member_weeks[member_name]
+        if week_plans: self._week_gained(week_id)
+        else: self._week_lost(week_id)
+
+    def add_weeks(self, plans):
+        """새로 불러온 주차들({week_id: {member_name: plan}})을 색인에 넣습니다. all_data에는 이미 들어 있어야 합니다."""
+        for week_id, week_plans in plans.items():
+            for member_name in week_plans: self._member_weeks.setdefault(member_name, set()).add(week_id)
+            if week_plans: self._week_gained(week_id)
+
+    def week_ids(self):
+        return list(self._weeks)
+
+    def years(self):
+        return sorted(int(year) for year in self._years)
+
+    def weeks_of(self, member_name):
+        """member_name의 계획이 있는(불러온) 주차 목록입니다."""
+        return sorted(self._member_weeks.get(member_name, ()))
+
+    def plan(self, week_id, member_name):
+        data = self.data['plans'].get(week_id, {}).get(member_name)
+        return None if data is None else Plan(week_id, member_name, data)
+
+    # 변경 반영
+    def apply_ops(self, ops):
+        """all_data에 이미 적용된 변경 기록을 받아 해당 팀원·주차의 색인만 고칩니다."""
+        for op in ops:
+            kind = op[0]
+            if kind == 'members':
+                self._rebuild_members()
+            elif kind == 'member':
+                _, name, member = op
+                order = self._remove_member(name)
+                if member is None: continue
+                replaced = self._remove_member(member['name'])
+                self._add_member(member, order if order is not None else replaced)
+            elif kind == 'rename_plans':
+                _, old_name, new_name = op
+                for week_id in self.weeks_of(old_name) + self.weeks_of(new_name):
+                    self._sync_plan(week_id, old_name)
+                    self._sync_plan(week_id, new_name)
+            elif kind == 'delete_plans':
+                for week_id in self.weeks_of(op[1]): self._sync_plan(week_id, op[1])
+            elif kind == 'plan':
+                self._sync_plan(op[1], op[2])
@@ -0,0 +1,222 @@
+"""주간 계획을 PDF로 만드는 모듈. 한 주 보고서와 여러 주를 한꺼번에 내보내는 기능을 담습니다."""
+import copy
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from fontTools import ttLib
+from fpdf import FPDF
+from fpdf.fonts import FontFace, SubsetMap
+
+FONT_FAMILY = "NanumGothic"
+DAYS = ['mon', 'tue', 'wed', 'thu', 'fri']
+DAY_NAMES = ['월', '화', '수', '목', '금']
+HALVES = [('am', '오전'), ('pm', '오후')]
+SUMMARY_ROWS = [  # (라벨, 키, 자동 연동 여부)
+    ("지난주 리뷰", "lastWeekReview", True), ("차주 계획", "nextWeekPlan", False),
+    ("본인 리뷰", "selfReview", False), ("부서장 리뷰", "managerReview", False),
+]
+DEFAULT_HEADER = FontFace(color=(255, 255, 255), fill_color=(28, 69, 135))     # 화면의 header-default
+AUTOMATED_HEADER = FontFace(color=(255, 255, 255), fill_color=(116, 27, 71))   # 화면의 header-automated
+PDF_CACHE_SIZE = 64
+MAX_EXPORT_WORKERS = 4
+
+
+# --- 1. 폰트 캐시 ---
+
+@lru_cache(maxsize=None)
+def _font_template(font_file):
+    """폰트 파일을 프로세스마다 한 번만 읽고 파싱해 (TTFFont 원본, 파일 내용)을 반환합니다."""
+    with open(font_file, 'rb') as f: font_bytes = f.read()
+    pdf = FPDF()
+    pdf.add_font(FONT_FAMILY, '', font_file)
+    return pdf.fonts[FONT_FAMILY.lower()], font_bytes
+
+
+def _add_font(pdf, font_file):
+    """파싱해 둔 폰트를 문서에 붙입니다. add_font와 달리 글리프 표를 다시 만들지 않습니다.
+
+    글자 폭·글리프 번호 표는 모든 문서가 함께 쓰고, 문서마다 달라지는 서브셋 목록과
+    출력 때 서브셋으로 잘려 나가는 TTFont만 새로 만듭니다.
+    """
+    template, font_bytes = _font_template(os.path.abspath(font_file))
+    shared = (template.cw, template.glyph_ids, template.cmap)
+    memo = {id(template.ttfont): None, id(template.subset): None, **{id(table): table for table in shared}}
+    font = copy.deepcopy(template, memo)
+    font.ttfont = ttLib.TTFont(io.BytesIO(font_bytes), recalcTimestamp=False, lazy=True)
+    font.subset = SubsetMap(font)
+    font.i = len(pdf.fonts) + 1
+    pdf.fonts[font.fontkey] = font
+
+
+# --- 2. 보고서 그리기 ---
+
+def week_report(year, week, week_dates, prev_week_dates, plans, prev_plans=None):
+    """PDF 한 주 분량의 입력입니다. plans·prev_plans는 {member_name: plan} 형태입니다."""
+    return {"year": year, "week": week, "week_dates": list(week_dates), "prev_week_dates": list(prev_week_dates),
+            "plans": plans, "prev_plans": prev_plans or {}}
+
+
+def ordered_members(members, plans, team_order, rank_order):
+    """보고서가 있는 팀원을 화면과 같이 팀 순서, 팀 안에서는 직급 순서로 정렬해 (팀, 팀원 목록)으로 묶습니다."""
+    groups = []
+    for team_name in team_order:
+        in_team = [m for m in members if isinstance(m, dict) and m.get('team') == team_name and m.get('name') in plans]
+        in_team.sort(key=lambda m: rank_order.index(m.get('rank')) if m.get('rank') in rank_order else len(rank_order))
+        if in_team: groups.append((team_name, in_team))
+    return groups
+
+
+def _filled_plan(plan, prev_plan):
+    """화면과 같이 지난주 칸·리뷰가 비어 있으면 지난주 계획에서 가져옵니다."""
+    plan = dict(plan)
+    if 'lastWeekGrid' not in plan or 'lastWeekReview' not in plan:
+        plan['lastWeekGrid'] = prev_plan.get('grid', {})
+        plan['lastWeekReview'] = prev_plan.get('nextWeekPlan', "")
+    return plan
+
+
+def _render_grid(pdf, title, grid, dates, header, day_names):
+    pdf.set_font(FONT_FAMILY, '', 10)
+    pdf.cell(0, 7, title, new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font(FONT_FAMILY, '', 8)
+    grid = grid if isinstance(grid, dict) else {}
+    with pdf.table(col_widths=(10, 30, 30, 30, 30, 30), line_height=pdf.font_size * 1.6, text_align="LEFT",
+                   headings_style=header) as table:
+        table.row(["", *[f"{name}({date})" for name, date in zip(day_names, dates)]])
+        for half, label in HALVES:
+            table.row([label, *[str(grid.get(f"{day}_{half}", '') or '') for day in DAYS]])
+    pdf.ln(2)
+
+
+def _render_summary(pdf, plan):
+    pdf.set_font(FONT_FAMILY, '', 8)
+    with pdf.table(col_widths=(1, 4), line_height=pdf.font_size * 1.6, text_align="LEFT",
+                   first_row_as_headings=False) as table:
+        for label, key, is_auto in SUMMARY_ROWS:
+            row = table.row()
+            row.cell(label, style=AUTOMATED_HEADER if is_auto else DEFAULT_HEADER)
+            row.cell(str(plan.get(key, '') or ''))
+
+
+def render_week(pdf, report, members, team_order, rank_order, day_names=DAY_NAMES):
+    """한 주 보고서를 새 페이지부터 그립니다."""
+    pdf.add_page()
+    pdf.set_font(FONT_FAMILY, '', 18)
+    pdf.cell(0, 12, f"주간 계획서 - {report['year']}년 {report['week']}주차", align='C', new_x="LMARGIN", new_y="NEXT")
+    groups = ordered_members(members, report['plans'], team_order, rank_order)
+    if not groups:
+        pdf.set_font(FONT_FAMILY, '', 11)
+        pdf.cell(0, 10, "작성된 보고서가 없습니다.", align='C', new_x="LMARGIN", new_y="NEXT")
+    for team_name, team_members in groups:
+        pdf.set_font(FONT_FAMILY, '', 14)
+        pdf.cell(0, 10, f"<{team_name}>", new_x="LMARGIN", new_y="NEXT")
+        for member in team_members:
+            name = member['name']
+            plan = _filled_plan(report['plans'][name], report['prev_plans'].get(name, {}))
+            pdf.set_font(FONT_FAMILY, '', 12)
+            pdf.cell(0, 9, f"[{member.get('team', '')}] {name} {member.get('rank', '')}", new_x="LMARGIN", new_y="NEXT")
+            _render_grid(pdf, "이번주 계획", plan.get('grid', {}), report['week_dates'], DEFAULT_HEADER, day_names)
+            _render_grid(pdf, "지난주 업무 내역", plan.get('lastWeekGrid', {}), report['prev_week_dates'], AUTOMATED_HEADER, day_names)
+            _render_summary(pdf, plan)
+            pdf.ln(6)
+
+
+def build_pdf(reports, members, font_file, team_order, rank_order, day_names=DAY_NAMES):
+    """여러 주 보고서를 한 문서로 그려 PDF 바이트를 반환합니다."""
+    pdf = FPDF(orientation='L', format='A4')
+    pdf.set_auto_page_break(True, margin=12)
+    _add_font(pdf, font_file)
+    for report in reports: render_week(pdf, report, members, team_order, rank_order, day_names)
+    return bytes(pdf.output())
+
+
+# --- 3. 완성된 PDF 캐시 ---
+_pdf_cache = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+
+
+def pdf_cache_key(reports, members, font_file, team_order, rank_order, day_names=DAY_NAMES):
+    """PDF 내용을 결정하는 입력(계획, 보고서가 있는 팀원, 날짜, 정렬 순서, 폰트)의 해시입니다."""
+    names = {name for report in reports for name in report['plans']}
+    font_stat = os.stat(font_file)
+    content = {
+        "reports": reports, "members": [m for m in members if isinstance(m, dict) and m.get('name') in names],
+        "font": [os.path.abspath(font_file), font_stat.st_size, font_stat.st_mtime_ns],
+        "team_order": list(team_order), "rank_order": list(rank_order), "day_names": list(day_names),
+    }
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _cached(key):
+    with _pdf_cache_lock:
+        if key in _pdf_cache: _pdf_cache.move_to_end(key)
+        return _pdf_cache.get(key)
+
+
+def _remember(key, pdf_bytes):
+    with _pdf_cache_lock:
+        _pdf_cache[key] = pdf_bytes
+        _pdf_cache.move_to_end(key)
+        while len(_pdf_cache) > PDF_CACHE_SIZE: _pdf_cache.popitem(last=False)
+
+
+def generate_pdf(report, members, font_file, team_order, rank_order, day_names=DAY_NAMES):
+    """한 주 보고서 PDF를 반환합니다. 같은 내용이면 다시 그리지 않고 캐시된 바이트를 돌려줍니다."""
+    key = pdf_cache_key([report], members, font_file, team_order, rank_order, day_names)
+    pdf_bytes = _cached(key)
+    if pdf_bytes is None:
+        pdf_bytes = build_pdf([report], members, font_file, team_order, rank_order, day_names)
+        _remember(key, pdf_bytes)
+    return pdf_bytes
+
+
+# --- 4. 여러 주 내보내기 ---
+
+def _generate_pdf_job(args):
+    return generate_pdf(*args)
+
+
+def export_weeks(reports, members, font_file, team_order, rank_order, day_names=DAY_NAMES, as_zip=False,
+                 max_workers=MAX_EXPORT_WORKERS):
+    """여러 주 보고서를 PDF 하나(as_zip=False) 또는 주차별 PDF를 담은 ZIP(as_zip=True)으로 반환합니다.
+
+    ZIP은 캐시에 없는 주차만 프로세스 풀에서 CPU 수만큼 나눠 그립니다(CPU가 하나면 이 프로세스에서
+    차례로). 각 작업 프로세스는 폰트를 한 번만 파싱합니다. 합친 PDF는 폰트 서브셋을 한 벌로 두도록
+    한 문서로 그립니다.
+    """
+    if not as_zip:
+        key = pdf_cache_key(reports, members, font_file, team_order, rank_order, day_names)
+        pdf_bytes = _cached(key)
+        if pdf_bytes is None:
+            pdf_bytes = build_pdf(reports, members, font_file, team_order, rank_order, day_names)
+            _remember(key, pdf_bytes)
+        return pdf_bytes
+
+    keys = [pdf_cache_key([r], members, font_file, team_order, rank_order, day_names) for r in reports]
+    results = {i: _cached(key) for i, key in enumerate(keys)}
+    missing = [i for i, pdf_bytes in results.items() if pdf_bytes is None]
+    jobs = [(reports[i], members, font_file, team_order, rank_order, day_names) for i in missing]
+    workers = min(max_workers, os.cpu_count() or 1, len(jobs))
+    if workers > 1:
+        # 서버 프로세스에는 저장 큐 같은 스레드가 돌고 있으므로 fork 대신 spawn으로 작업 프로세스를 띄웁니다.
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            rendered = list(pool.map(_generate_pdf_job, jobs))
+    else:
+        rendered = [_generate_pdf_job(job) for job in jobs]
+    for i, pdf_bytes in zip(missing, rendered):
+        results[i] = pdf_bytes
+        _remember(keys[i], pdf_bytes)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for i, report in enumerate(reports):
+            archive.writestr(f"weekly_plan_{report['year']}-W{int(report['week']):02d}.pdf", results[i])
+    return buffer.getvalue()
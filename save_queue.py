@@ -0,0 +1,230 @@
+"""저장 요청을 모아 백그라운드에서 시트에 쓰는 write-behind 큐."""
+import copy
+import random
+import threading
+import time
+
+import gspread
+from google.auth.exceptions import TransportError
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+WRITE_REQUESTS_PER_MINUTE = 50   # Sheets 쓰기 한도(분당 60회)보다 조금 낮게 잡은 예산
+REQUESTS_PER_FLUSH = 2           # 반영 한 번 = 키 확인 읽기 1회 + batchUpdate 1회
+MAX_BATCH_OPS = 200
+BASE_RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+MAX_ATTEMPTS = 8
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+PENDING, SAVING, RETRYING, SAVED, FAILED = 'pending', 'saving', 'retrying', 'saved', 'failed'
+
+
+def _is_retryable(error):
+    """할당량 초과(429)·서버 오류·네트워크 오류처럼 기다렸다 다시 하면 되는 오류인지 판별합니다."""
+    if isinstance(error, (TransportError, RequestsConnectionError, Timeout)): return True
+    return isinstance(error, gspread.exceptions.APIError) and getattr(error, 'code', None) in RETRY_STATUS_CODES
+
+
+def _retry_after(error):
+    """응답의 Retry-After 헤더(초)가 있으면 반환합니다."""
+    response = getattr(error, 'response', None)
+    try: return float(response.headers.get('Retry-After'))
+    except (AttributeError, TypeError, ValueError): return None
+
+
+class QuotaBudget:
+    """분당 요청 수 한도를 넘지 않도록 요청 전에 토큰을 받아 가게 하는 토큰 버킷입니다."""
+
+    def __init__(self, requests_per_minute):
+        self.capacity = float(requests_per_minute)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, count=1):
+        """count개의 토큰을 받을 때까지 기다립니다."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.capacity / 60)
+                self._updated_at = now
+                if self._tokens >= count:
+                    self._tokens -= count
+                    return
+                wait = (count - self._tokens) * 60 / self.capacity
+            time.sleep(wait)
+
+
+class SaveTicket:
+    """저장 요청 하나의 진행 상태입니다. 같은 계획을 다시 저장하면 대기 중인 티켓의 내용만 바뀝니다.
+
+    다시 시도하려고 되돌린 티켓보다 같은 계획의 새 티켓이 이미 대기 중이면, 새 티켓이 대신 쓰고 옛 티켓은
+    새 티켓과 같은 결과로 끝납니다(_merged).
+    """
+
+    def __init__(self, ops, key=None):
+        self.ops = ops
+        self.key = key
+        self._merged = []
+        self.state = PENDING
+        self.attempts = 0
+        self.error = None
+        self.version = None
+        self.updated_at = time.time()
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """저장이 끝날 때까지 기다립니다. 끝났으면 True를 반환합니다."""
+        return self._done.wait(timeout)
+
+    def _set(self, state, error=None, version=None):
+        self.state, self.error, self.updated_at = state, error, time.time()
+        if version is not None: self.version = version
+        if state in (SAVED, FAILED): self._done.set()
+        for ticket in self._merged: ticket._set(state, error, version)
+
+
+class WriteBehindQueue:
+    """계획 저장을 받아 두었다가 백그라운드 스레드가 모아서 한 번에 씁니다.
+
+    같은 (week_id, member_name)을 여러 번 저장하면 대기 중인 요청 하나로 합치고, 여러 사용자의
+    요청을 한 번의 batchUpdate로 묶어 분당 할당량 예산 안에서 씁니다. 429·일시 오류는 지수 백오프와
+    지터로 다시 시도하고, 팀원 추가·삭제 같은 변경은 앞뒤 순서를 지키도록 합치지 않고 차례대로 씁니다.
+    on_flush를 주면 배치를 쓸 때마다 on_flush(소요 시간, 변경 수, 오류 또는 None)로 알립니다.
+    """
+
+    def __init__(self, cache, requests_per_minute=WRITE_REQUESTS_PER_MINUTE, max_batch_ops=MAX_BATCH_OPS,
+                 max_attempts=MAX_ATTEMPTS, base_delay=BASE_RETRY_DELAY, max_delay=MAX_RETRY_DELAY, on_flush=None):
+        self.cache = cache
+        self.on_flush = on_flush
+        self.budget = QuotaBudget(requests_per_minute)
+        self.max_batch_ops = max_batch_ops
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._pending = []
+        self._mergeable = {}      # 마지막 순서 경계 뒤에 있는 계획 저장 티켓
+        self._latest = {}         # (week_id, member_name) → 가장 최근 티켓
+        self._retry_at = 0.0
+        self._isolate = 0         # 배치가 실패했을 때 하나씩 따로 써 볼 남은 티켓 수
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="weekly-save-queue", daemon=True)
+        self._thread.start()
+
+    # 요청 받기
+    def submit_plan(self, week_id, member_name, plan):
+        """계획 저장을 예약합니다. 아직 쓰지 않은 같은 계획의 요청이 있으면 그 내용을 바꿉니다."""
+        key = (str(week_id), str(member_name))
+        op = ('plan', week_id, member_name, copy.deepcopy(plan))
+        with self._cond:
+            ticket = self._mergeable.get(key)
+            if ticket is not None:
+                ticket.ops = [op]
+                ticket.updated_at = time.time()
+            else:
+                ticket = SaveTicket([op], key)
+                self._pending.append(ticket)
+                self._mergeable[key] = ticket
+            self._latest[key] = ticket
+            self._cond.notify()
+        return ticket
+
+    def submit_ops(self, ops):
+        """팀원 추가·이름 변경·삭제처럼 순서가 중요한 변경을 예약합니다. 앞선 요청과 합치지 않습니다."""
+        ticket = SaveTicket(copy.deepcopy(list(ops)))
+        with self._cond:
+            self._pending.append(ticket)
+            self._mergeable = {}
+            self._cond.notify()
+        return ticket
+
+    def status(self, week_id, member_name):
+        """해당 계획의 가장 최근 저장 티켓을 반환합니다. 저장한 적이 없으면 None."""
+        with self._cond: return self._latest.get((str(week_id), str(member_name)))
+
+    @property
+    def backlog(self):
+        with self._cond: return len(self._pending)
+
+    # 백그라운드 쓰기
+    def _take_batch(self):
+        """대기열 앞에서 이번에 쓸 티켓들을 꺼냅니다. 호출자가 _cond를 잡고 있어야 합니다."""
+        batch, op_count, keys = [], 0, set()
+        limit = 1 if self._isolate else len(self._pending)
+        while self._pending and len(batch) < limit:
+            ticket = self._pending[0]
+            if batch and op_count + len(ticket.ops) > self.max_batch_ops: break
+            if ticket.key is not None:
+                if ticket.key in keys: break   # 한 배치에 같은 계획을 두 번 넣지 않습니다.
+                keys.add(ticket.key)
+            batch.append(self._pending.pop(0))
+            op_count += len(ticket.ops)
+            if self._mergeable.get(ticket.key) is ticket: del self._mergeable[ticket.key]
+        if self._isolate: self._isolate -= 1
+        for ticket in batch:
+            ticket.attempts += 1
+            ticket._set(SAVING)
+        return batch
+
+    def _requeue(self, tickets):
+        """실패한 티켓을 대기열 앞에 되돌립니다. 호출자가 _cond를 잡고 있어야 합니다.
+
+        계획 티켓 뒤에 순서 경계 없이 같은 계획의 새 티켓이 있으면 새 티켓이 대신 쓰고, 뒤에 순서 경계가
+        없으면 다시 합칠 수 있게 _mergeable에 넣습니다. 되돌린 티켓 수를 반환합니다.
+        """
+        queue, kept = tickets + self._pending, []
+        for i, ticket in enumerate(tickets):
+            if ticket.key is not None:
+                later = next((t for t in queue[i + 1:] if t.key is None or t.key == ticket.key), None)
+                if later is not None and later.key == ticket.key:
+                    later._merged.append(ticket)
+                    ticket._set(later.state)
+                    continue
+                if later is None: self._mergeable[ticket.key] = ticket
+            kept.append(ticket)
+        self._pending[:0] = kept
+        return len(kept)
+
+    def _backoff(self, attempts, error):
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1)) * random.uniform(0.5, 1.5)
+        return max(delay, _retry_after(error) or 0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending or time.monotonic() < self._retry_at:
+                    self._cond.wait(max(0.0, self._retry_at - time.monotonic()) if self._pending else None)
+                batch = self._take_batch()
+            self.budget.acquire(REQUESTS_PER_FLUSH)
+            ops = [op for ticket in batch for op in ticket.ops]
+            start, error = time.perf_counter(), None
+            try:
+                version = self.cache.save(ops)
+            except Exception as e:
+                error = e
+                self._handle_failure(batch, e)
+            else:
+                for ticket in batch: ticket._set(SAVED, version=version)
+            if self.on_flush is not None:
+                try: self.on_flush(time.perf_counter() - start, len(ops), error)
+                except Exception: pass
+
+    def _handle_failure(self, batch, error):
+        with self._cond:
+            if _is_retryable(error):
+                retry = [t for t in batch if t.attempts < self.max_attempts]
+                for ticket in batch:
+                    if ticket not in retry: ticket._set(FAILED, error=error)
+                for ticket in retry: ticket._set(RETRYING, error=error)
+                self._requeue(retry)
+                self._retry_at = time.monotonic() + self._backoff(max(t.attempts for t in batch), error)
+            elif len(batch) > 1:
+                # 어느 요청이 문제인지 모르므로 하나씩 따로 써 봅니다.
+                for ticket in batch: ticket._set(PENDING)
+                self._isolate = self._requeue(batch)
+            else:
+                batch[0]._set(FAILED, error=error)
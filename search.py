@@ -0,0 +1,258 @@
+"""모든 주간 보고서를 대상으로 하는 전문 검색 색인.
+
+계획 하나(week_id, member_name)를 문서 하나로 보고, grid·lastWeekGrid의 칸과 nextWeekPlan·selfReview·
+managerReview를 글자 2개씩 끊은 토큰(바이그램)으로 색인합니다. 한국어는 띄어쓰기와 조사 때문에 낱말
+단위로 자르면 "고객사와"에서 "고객사"를 찾지 못하므로, 낱말 안의 바이그램이 모두 든 문서를 후보로 고른 뒤
+원문에 검색어가 실제로 있는지 확인하고 BM25 방식으로 점수를 매깁니다.
+
+색인은 ChangeSet.ops 형식의 변경 기록을 받아 바뀐 계획만 다시 색인하며, sync()로 SharedDataCache의
+변경 기록을 따라잡습니다.
+"""
+import math
+import re
+import threading
+import time
+from array import array
+
+from storage import DAYS, GRID_SLOTS
+
+SEARCH_FIELDS = ['grid', 'lastWeekGrid', 'nextWeekPlan', 'selfReview', 'managerReview']
+FIELD_LABELS = {'grid': "이번주 계획", 'lastWeekGrid': "지난주 업무 내역", 'nextWeekPlan': "차주 계획",
+                'selfReview': "본인 리뷰", 'managerReview': "부서장 리뷰"}
+DAY_LABELS = dict(zip(DAYS, ['월', '화', '수', '목', '금']))
+HALF_LABELS = {'am': '오전', 'pm': '오후'}
+REBUILD_INTERVAL = 3600      # 다른 경로(시트 직접 수정 등)로 바뀐 내용을 반영하려고 전체를 다시 색인하는 주기(초)
+SNIPPET_RADIUS = 30          # 미리보기에서 검색어 앞뒤로 보여 줄 글자 수
+BM25_K1, BM25_B = 1.2, 0.75
+_WORD = re.compile(r"[^\W_]+")
+
+
+def query_words(text):
+    """검색어·본문에서 낱말(글자·숫자가 이어진 부분)을 소문자로 뽑습니다."""
+    return _WORD.findall(str(text).lower())
+
+
+def terms_of(word):
+    """낱말 하나의 색인 토큰입니다. 두 글자 이상이면 바이그램, 한 글자면 그 글자입니다."""
+    return [word] if len(word) == 1 else [word[i:i + 2] for i in range(len(word) - 1)]
+
+
+def plan_fields(plan):
+    """계획에서 검색할 (필드 이름, 글) 목록입니다. 칸은 'grid.mon_am'처럼 이름을 붙입니다."""
+    fields = []
+    for key in SEARCH_FIELDS:
+        value = plan.get(key)
+        if isinstance(value, dict): fields += [(f"{key}.{slot}", str(value[slot])) for slot in GRID_SLOTS if value.get(slot)]
+        elif value: fields.append((key, str(value)))
+    return fields
+
+
+def field_label(field):
+    """'grid.mon_am' → '이번주 계획 · 월 오전'"""
+    group, _, slot = field.partition('.')
+    if not slot: return FIELD_LABELS.get(group, group)
+    day, _, half = slot.partition('_')
+    return f"{FIELD_LABELS.get(group, group)} · {DAY_LABELS.get(day, day)} {HALF_LABELS.get(half, half)}"
+
+
+class SearchHit:
+    """검색 결과 하나입니다. snippet은 (앞부분, 일치한 부분, 뒷부분)입니다."""
+    __slots__ = ('week_id', 'member_name', 'field', 'score', 'snippet', 'matched_fields')
+
+    def __init__(self, week_id, member_name, field, score, snippet, matched_fields):
+        self.week_id, self.member_name, self.field = week_id, member_name, field
+        self.score, self.snippet, self.matched_fields = score, snippet, matched_fields
+
+    def __repr__(self):
+        return f"SearchHit({self.week_id!r}, {self.member_name!r}, {self.field!r}, {self.score:.2f})"
+
+
+def _snippet(text, word):
+    lowered = text.lower()
+    start = lowered.find(word)
+    end = start + len(word)
+    prefix = text[max(0, start - SNIPPET_RADIUS):start]
+    suffix = text[end:end + SNIPPET_RADIUS]
+    return (("…" if start > SNIPPET_RADIUS else "") + prefix, text[start:end],
+            suffix + ("…" if end + SNIPPET_RADIUS < len(text) else ""))
+
+
+class SearchIndex:
+    """계획 단위 역색인입니다. 여러 스레드에서 동시에 불러도 됩니다.
+
+    토큰마다 문서 번호를 오름차순 array로 들고 있고, 고치거나 지운 문서는 번호를 버린 뒤(묘비) 새 번호로
+    다시 넣습니다. 버린 번호가 살아 있는 문서보다 많아지면 색인을 새로 압축합니다.
+    """
+
+    def __init__(self):
+        self.version = None          # 따라잡은 SharedDataCache 버전 (None이면 아직 만들지 않음)
+        self.built_at = 0.0
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self._docs = []              # 문서 번호 → (week_id, member_name, [(필드, 글)], 소문자로 이은 글) 또는 None
+        self._postings = {}          # 토큰 → array('I', 문서 번호)
+        self._plan_docs = {}         # (week_id, member_name) → 문서 번호
+        self._member_weeks = {}      # member_name → 문서가 있는 week_id 집합
+        self._lengths = []           # 문서 번호 → 글자 수
+        self._total_length = 0
+        self._deleted = 0
+
+    def __len__(self):
+        return len(self._plan_docs)
+
+    # 색인 만들기
+    def rebuild(self, plans, version=None):
+        """{week_id: {member_name: plan}} 전체로 색인을 새로 만듭니다."""
+        with self._lock:
+            self._clear()
+            for week_id in sorted(plans):
+                for member_name, plan in plans[week_id].items(): self._add(week_id, member_name, plan)
+            self.version, self.built_at = version, time.monotonic()
+
+    def _add(self, week_id, member_name, plan):
+        self._add_fields(week_id, member_name, plan_fields(plan) if isinstance(plan, dict) else [])
+
+    def _add_fields(self, week_id, member_name, fields):
+        if not fields: return
+        doc_id = len(self._docs)
+        lowered = "\n".join(text for _, text in fields).lower()   # 낱말은 줄바꿈을 넘지 않아 필드끼리 이어 맞지 않습니다.
+        self._docs.append((week_id, member_name, fields, lowered))
+        self._lengths.append(len(lowered))
+        self._total_length += len(lowered)
+        for term in {term for word in query_words(lowered) for term in terms_of(word)}:
+            self._postings.setdefault(term, array('I')).append(doc_id)
+        self._plan_docs[week_id, member_name] = doc_id
+        self._member_weeks.setdefault(member_name, set()).add(week_id)
+
+    def _remove(self, week_id, member_name):
+        doc_id = self._plan_docs.pop((week_id, member_name), None)
+        if doc_id is None: return None
+        fields = self._docs[doc_id][2]
+        self._docs[doc_id] = None
+        self._total_length -= self._lengths[doc_id]
+        self._deleted += 1
+        weeks = self._member_weeks.get(member_name)
+        if weeks is not None:
+            weeks.discard(week_id)
+            if not weeks: del self._member_weeks[member_name]
+        return fields
+
+    def _compact_if_needed(self):
+        if self._deleted <= max(len(self._plan_docs), 1000): return
+        live = [doc for doc in self._docs if doc is not None]
+        version, built_at = self.version, self.built_at
+        self._clear()
+        for week_id, member_name, fields, _ in live: self._add_fields(week_id, member_name, fields)
+        self.version, self.built_at = version, built_at
+
+    def set_plan(self, week_id, member_name, plan):
+        """계획 하나를 다시 색인합니다. plan이 None이면 지웁니다."""
+        with self._lock:
+            self._remove(week_id, member_name)
+            if plan is not None: self._add(week_id, member_name, plan)
+            self._compact_if_needed()
+
+    def apply_ops(self, ops, version=None):
+        """변경 기록(ChangeSet.ops 형식)을 반영합니다. 팀원 정보 변경은 색인과 관계없어 건너뜁니다."""
+        with self._lock:
+            for op in ops:
+                kind = op[0]
+                if kind == 'plan':
+                    self._remove(op[1], op[2])
+                    if op[3] is not None: self._add(op[1], op[2], op[3])
+                elif kind == 'rename_plans':
+                    _, old_name, new_name = op
+                    for week_id in sorted(self._member_weeks.get(old_name, ())):
+                        fields = self._remove(week_id, old_name)
+                        self._remove(week_id, new_name)
+                        self._add_fields(week_id, new_name, fields or [])
+                elif kind == 'delete_plans':
+                    for week_id in sorted(self._member_weeks.get(op[1], ())): self._remove(week_id, op[1])
+            self._compact_if_needed()
+            if version is not None: self.version = version
+
+    def sync(self, cache, rebuild_interval=REBUILD_INTERVAL):
+        """SharedDataCache의 변경 기록을 따라잡습니다.
+
+        처음이거나, 기록이 잘려 따라잡을 수 없거나, 마지막으로 만든 지 rebuild_interval초가 지났으면
+        cache.load_all_plans()로 전체 계획을 읽어 다시 만듭니다.
+        """
+        with self._lock:
+            ops = None
+            if self.version is not None and time.monotonic() - self.built_at < rebuild_interval:
+                version, ops = cache.changes_since(self.version)
+            if ops is None:
+                version, plans = cache.load_all_plans()
+                self.rebuild(plans, version)
+            else:
+                self.apply_ops(ops, version)
+
+    # 검색
+    def _postings_for(self, word):
+        if len(word) > 1: return [self._postings.get(term, array('I')) for term in terms_of(word)]
+        # 한 글자 검색어는 그 글자가 든 모든 토큰의 문서를 모읍니다.
+        doc_ids = set()
+        for term, posting in self._postings.items():
+            if word in term: doc_ids.update(posting)
+        return [doc_ids]
+
+    def search(self, query, member_names=None, start_week=None, end_week=None, limit=50):
+        """query의 낱말이 모두 든 계획을 점수 순으로 최대 limit개 반환합니다.
+
+        member_names(팀원 이름 모음)와 start_week~end_week(week_id, 양 끝 포함)로 거를 수 있습니다.
+        반환값은 (전체 일치 수, [SearchHit])입니다.
+        """
+        words = list(dict.fromkeys(query_words(query)))
+        if not words: return 0, []
+        member_names = None if member_names is None else set(member_names)
+        with self._lock:
+            doc_count = max(len(self._plan_docs), 1)
+            average_length = self._total_length / doc_count or 1
+            candidates, frequencies = None, {}
+            for word in words:
+                postings = sorted(self._postings_for(word), key=len)
+                # 목록에는 고치거나 지운 문서의 번호(묘비)도 남아 있으므로 살아 있는 문서만 셉니다.
+                frequencies[word] = sum(1 for doc_id in postings[0] if self._docs[doc_id] is not None)
+                for posting in postings:
+                    candidates = set(posting) if candidates is None else candidates.intersection(posting)
+                    if not candidates: return 0, []
+            idfs = {word: math.log(1 + (doc_count - df + 0.5) / (df + 0.5)) for word, df in frequencies.items()}
+            scored = []
+            for doc_id in candidates:
+                doc = self._docs[doc_id]
+                if doc is None: continue
+                week_id, member_name, _, lowered = doc
+                if member_names is not None and member_name not in member_names: continue
+                if (start_week and week_id < start_week) or (end_week and week_id > end_week): continue
+                score = self._score(lowered, words, idfs, self._lengths[doc_id] / average_length)
+                if score is not None: scored.append((score, week_id, doc))
+        scored.sort(key=lambda item: item[1], reverse=True)   # 점수가 같으면 최근 주차부터
+        scored.sort(key=lambda item: item[0], reverse=True)
+        # 미리보기는 보여 줄 결과만 만듭니다.
+        return len(scored), [self._hit(doc, score, words) for score, _, doc in scored[:limit]]
+
+    @staticmethod
+    def _score(lowered, words, idfs, relative_length):
+        score = 0.0
+        for word in words:
+            tf = lowered.count(word)
+            if not tf: return None   # 바이그램은 모두 있지만 이어진 낱말은 없습니다.
+            score += idfs[word] * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * relative_length))
+        return score
+
+    @staticmethod
+    def _hit(doc, score, words):
+        """검색어가 가장 많이 나온 필드로 미리보기를 만듭니다."""
+        week_id, member_name, fields, _ = doc
+        best, matched_fields = None, 0
+        for field, text in fields:
+            low = text.lower()
+            count = sum(low.count(word) for word in words)
+            if not count: continue
+            matched_fields += 1
+            if best is None or count > best[0]: best = (count, field, text, low)
+        _, field, text, low = best
+        word = next(word for word in words if word in low)
+        return SearchHit(week_id, member_name, field, score, _snippet(text, word), matched_fields)
@@ -0,0 +1,221 @@
+"""여러 브라우저 세션이 함께 쓰는 서버 프로세스 단위 데이터 캐시."""
+import copy
+import threading
+import time
+from collections import deque
+
+HISTORY_LIMIT = 1000          # 세션이 따라잡을 수 있도록 남겨 두는 변경 기록 수
+REVALIDATE_INTERVAL = 60      # 캐시한 데이터를 시트와 다시 맞춰 보는 주기(초)
+RETRY_INTERVAL = 10           # 뒤에서 맞추다 실패했을 때 다시 시도하기까지 기다리는 시간(초)
+_MEMBERS = object()
+
+
+def replay_ops(data, ops, loaded_weeks=None, index=None):
+    """변경 기록을 data({"team_members", "plans"})에 다시 적용합니다. 여러 번 적용해도 결과가 같습니다.
+
+    loaded_weeks를 주면 그 주차의 계획 변경만 반영합니다. 나머지 주차는 나중에 불러올 때 최신 상태로 받습니다.
+    index(model.ReportIndex)를 주면 이름 변경·삭제 때 그 팀원이 있는 주차만 보고, 색인도 함께 고칩니다.
+    """
+    for op in ops:
+        _replay_op(data, op, loaded_weeks, index)
+        if index is not None: index.apply_ops([op])
+
+
+def _weeks_with(data, index, member_name):
+    return index.weeks_of(member_name) if index is not None else list(data['plans'])
+
+
+def _replay_op(data, op, loaded_weeks, index):
+    kind = op[0]
+    if kind == 'members':
+        data['team_members'] = copy.deepcopy(op[1])
+    elif kind == 'member':
+        _, name, member = op
+        members = data['team_members']
+        if member is None:
+            data['team_members'] = [m for m in members if m.get('name') != name]
+            return
+        positions = [i for i, m in enumerate(members) if m.get('name') in (name, member['name'])]
+        if positions: members[positions[0]] = dict(member)
+        else: members.append(dict(member))
+    elif kind == 'rename_plans':
+        _, old_name, new_name = op
+        for week_id in _weeks_with(data, index, old_name):
+            week_data = data['plans'].get(week_id, {})
+            if old_name in week_data: week_data[new_name] = week_data.pop(old_name)
+    elif kind == 'delete_plans':
+        for week_id in _weeks_with(data, index, op[1]):
+            data['plans'].get(week_id, {}).pop(op[1], None)
+    elif kind == 'plan':
+        _, week_id, member_name, plan = op
+        if loaded_weeks is not None and week_id not in loaded_weeks: return
+        if plan is None: data['plans'].get(week_id, {}).pop(member_name, None)
+        else: data['plans'].setdefault(week_id, {})[member_name] = copy.deepcopy(plan)
+
+
+class SharedDataCache:
+    """팀원 목록과 불러온 주차의 계획을 서버 프로세스 안에서 한 벌만 들고 있는 캐시입니다.
+
+    바뀔 때마다 버전을 하나씩 올리고 변경 기록을 남기므로, 각 세션은 마지막으로 본 버전
+    이후의 변경만 받아 자기 복사본에 적용합니다. 같은 주차를 여러 세션이 동시에 요청해도
+    시트는 한 번만 읽고, REVALIDATE_INTERVAL마다 시트와 비교해 바깥에서 바뀐 내용도 반영합니다.
+
+    on_sync()를 주면 시트와 맞춰 내용이 바뀔 때마다 인자 없이 부릅니다(snapshot.SnapshotWriter.notify).
+    바로 돌아와야 하며, 내용은 나중에 export()로 가져갑니다. 그 스냅샷을 warm_start()로 넣으면 다시 띄운
+    직후에도 시트를 기다리지 않고 그리고, 시트와는 뒤에서 맞춥니다.
+    """
+
+    def __init__(self, backend, history_limit=HISTORY_LIMIT, revalidate_interval=REVALIDATE_INTERVAL, on_sync=None):
+        self.backend = backend
+        self.revalidate_interval = revalidate_interval
+        self.on_sync = on_sync
+        self.version = 0
+        self.last_error = None             # 뒤에서 맞추다 난 마지막 오류 (성공하면 None)
+        self.synced = False                # 한 번이라도 시트에서 읽었는지 (스냅샷만 들고 있으면 False)
+        self._data = {"team_members": None, "plans": {}}
+        self._fetched_at = {}
+        self._history = deque(maxlen=history_limit)
+        self._revalidating = False
+        self._retry_at = 0.0
+        self._lock = threading.RLock()     # 캐시 내용과 버전
+        self._io_lock = threading.Lock()   # 시트 읽기·쓰기 순서
+
+    def _is_stale(self, key, now):
+        fetched_at = self._fetched_at.get(key)
+        return fetched_at is None or now - fetched_at > self.revalidate_interval
+
+    @property
+    def loaded_weeks(self):
+        with self._lock: return {key for key in self._fetched_at if key is not _MEMBERS}
+
+    @property
+    def revalidating(self):
+        return self._revalidating
+
+    def warm_start(self, team_members, plans, week_ids):
+        """저장해 둔 스냅샷으로 빈 캐시를 채웁니다. 채운 값은 오래된 것으로 보고 처음 요청될 때 뒤에서 시트와 맞춥니다."""
+        with self._lock:
+            if self._fetched_at: return False
+            self._data = {"team_members": copy.deepcopy(team_members),
+                          "plans": {w: copy.deepcopy(plans[w]) for w in week_ids if plans.get(w)}}
+            self._fetched_at = dict.fromkeys([_MEMBERS, *week_ids], float('-inf'))
+            return True
+
+    def export(self):
+        """스냅샷에 쓸 (캐시 내용, 불러온 주차 목록)입니다.
+
+        캐시 안의 계획 dict는 고치지 않고 통째로 바꾸기만 하므로, 주차별 dict와 팀원 목록만 얕게 복사해도
+        이 순간의 내용이 그대로 남습니다.
+        """
+        with self._lock:
+            data = {"team_members": list(self._data['team_members'] or []),
+                    "plans": {week_id: dict(plans) for week_id, plans in self._data['plans'].items()}}
+            return data, [key for key in self._fetched_at if key is not _MEMBERS]
+
+    def _sync_done(self):
+        if self.on_sync is not None: self.on_sync()
+
+    def _record(self, ops):
+        """변경을 캐시에 적용하고 버전과 기록을 남깁니다. 호출자가 _lock을 잡고 있어야 합니다."""
+        loaded_weeks = {key for key in self._fetched_at if key is not _MEMBERS}
+        for op in ops:
+            self.version += 1
+            self._history.append((self.version, op))
+            if self._data['team_members'] is not None or op[0] not in ('member', 'members'):
+                replay_ops(self._data, [op], loaded_weeks)
+
+    def refresh(self, week_ids=(), background=False):
+        """팀원 목록과 week_ids 중 캐시에 없거나 오래된 것만 시트에서 읽어 반영합니다.
+
+        background가 참이면 캐시에 아예 없는 것만 지금 읽고, 이미 있는 것은 오래됐더라도 기다리지 않고 뒤에서
+        한 스레드가 시트와 맞춥니다.
+        """
+        if not background: return self._refresh(week_ids)
+        week_ids = list(dict.fromkeys(week_ids))
+        with self._lock:
+            missing = [w for w in week_ids if w not in self._fetched_at]
+            missing_members = _MEMBERS not in self._fetched_at
+        if missing or missing_members: self._refresh(missing, members=missing_members)
+        now = time.monotonic()
+        with self._lock:
+            stale = any(self._is_stale(key, now) for key in [_MEMBERS, *week_ids])
+            if stale and not self._revalidating and now >= self._retry_at:
+                self._revalidating = True
+                threading.Thread(target=self._revalidate, args=(week_ids,), daemon=True).start()
+
+    def _revalidate(self, week_ids):
+        try:
+            self._refresh(week_ids)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = e
+            self._retry_at = time.monotonic() + RETRY_INTERVAL
+        finally:
+            self._revalidating = False
+
+    def _refresh(self, week_ids, members=True):
+        with self._io_lock:
+            now = time.monotonic()
+            with self._lock:
+                need_members = members and self._is_stale(_MEMBERS, now)
+                weeks = [w for w in dict.fromkeys(week_ids) if self._is_stale(w, now)]
+            if not need_members and not weeks: return
+            members = self.backend.load_members() if need_members else None
+            plans = self.backend.load_weeks(weeks) if weeks else {}
+            with self._lock:
+                ops, first_loads = [], [key for key in [_MEMBERS, *weeks] if key not in self._fetched_at]
+                if members is not None:
+                    if self._data['team_members'] is None: self._data['team_members'] = members
+                    elif members != self._data['team_members']: ops.append(('members', members))
+                    self._fetched_at[_MEMBERS] = now
+                for week_id in weeks:
+                    fresh = plans.get(week_id, {})
+                    if week_id not in self._fetched_at:
+                        if fresh: self._data['plans'][week_id] = fresh
+                    else:
+                        cached = self._data['plans'].get(week_id, {})
+                        ops += [('plan', week_id, name, fresh.get(name))
+                                for name in set(cached) | set(fresh) if cached.get(name) != fresh.get(name)]
+                    self._fetched_at[week_id] = now
+                self._record(ops)
+                self.synced = True
+        if ops or first_loads: self._sync_done()
+
+    def snapshot(self, week_ids, background=False):
+        """(버전, 세션용 복사본)을 반환합니다. 팀원 목록과 week_ids 주차의 계획만 담습니다."""
+        self.refresh(week_ids, background)
+        return self.cached(week_ids)
+
+    def cached(self, week_ids):
+        """시트를 읽지 않고 지금 캐시에 있는 것만으로 snapshot()과 같은 값을 반환합니다."""
+        with self._lock:
+            plans = {w: copy.deepcopy(self._data['plans'][w]) for w in week_ids if self._data['plans'].get(w)}
+            return self.version, {"team_members": copy.deepcopy(self._data['team_members'] or []), "plans": plans}
+
+    def load_all_plans(self):
+        """모든 주차의 계획을 시트에서 읽어 (읽은 시점의 버전, {week_id: {member_name: plan}})을 반환합니다.
+
+        저장과 같은 _io_lock 안에서 읽으므로 읽는 도중에 저장이 끼어들지 않고, 버전이 읽은 내용과 맞습니다.
+        캐시 내용은 바꾸지 않습니다.
+        """
+        with self._io_lock:
+            plans = self.backend.load_all()['plans']
+            with self._lock: return self.version, plans
+
+    def changes_since(self, version):
+        """version 이후의 변경 기록 (현재 버전, 변경 목록)을 반환합니다. 기록이 잘려 따라잡을 수 없으면 변경 목록이 None입니다."""
+        with self._lock:
+            if version == self.version: return self.version, []
+            if not self._history or self._history[0][0] > version + 1: return self.version, None
+            return self.version, [op for v, op in self._history if v > version]
+
+    def save(self, ops):
+        """변경을 시트에 쓰고, 성공하면 캐시에 반영해 다른 세션들도 받아 가게 합니다. 새 버전을 반환합니다."""
+        ops = copy.deepcopy(list(ops))  # 세션이 계속 고치는 dict와 기록이 엮이지 않게 합니다.
+        with self._io_lock:
+            self.backend.apply_ops(ops)
+            with self._lock:
+                self._record(ops)
+                version = self.version
+        self._sync_done()
+        return version
@@ -0,0 +1,106 @@
+"""서버를 다시 띄운 직후에도 화면을 바로 그릴 수 있게 공유 캐시 내용을 로컬 파일로 남겨 두는 스냅샷.
+
+SharedDataCache가 저장소와 맞춰 내용이 바뀌면 SnapshotWriter가 잠시(WRITE_DELAY) 모았다가 별도 스레드에서
+팀원 목록과 불러온 주차의 계획을 gzip JSON 한 파일에 통째로 씁니다. 저장·읽기 경로는 파일 쓰기를 기다리지 않습니다. 임시 파일에 쓰고 이름을 바꾸므로 쓰는 도중에 프로세스가 죽어도 이전 스냅샷이 그대로 남습니다.
+파일에는 형식 버전과 어느 저장소의 내용인지(source)를 적어 두고, 둘 중 하나라도 다르면 읽지 않습니다.
+"""
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+
+from archive import write_atomic
+
+SNAPSHOT_FORMAT = 1
+DEFAULT_SNAPSHOT_PATH = os.path.join("cache", "snapshot.json.gz")
+WRITE_DELAY = 5.0     # 변경 알림을 받은 뒤 이만큼(초) 더 모았다가 한 번에 씁니다.
+
+
+class SnapshotStore:
+    """스냅샷 파일 하나를 읽고 씁니다. 여러 스레드에서 동시에 불러도 됩니다."""
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH, source=None):
+        self.path = path
+        self.source = source      # 저장소 구분값 (예: "sheets:주간업무보고_DB"). 다른 저장소의 스냅샷은 읽지 않습니다.
+        self.saved_at = None      # 마지막으로 읽거나 쓴 스냅샷의 저장 시각 (epoch 초)
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """저장해 둔 {"team_members", "plans", "weeks", "saved_at"}을 반환합니다. 없거나 읽을 수 없으면 None입니다."""
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f: snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError) as e:
+            self.last_error = e   # 깨진 스냅샷은 무시하고 저장소에서 새로 읽습니다.
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get('format') != SNAPSHOT_FORMAT or snapshot.get('source') != self.source:
+            return None
+        self.saved_at = snapshot.get('saved_at')
+        return snapshot
+
+    def save(self, data, week_ids):
+        """팀원 목록과 week_ids 주차의 계획을 새 스냅샷으로 씁니다. 실패해도 예외를 내지 않고 last_error에 남깁니다.
+
+        week_ids에는 계획이 없는 주차도 넣습니다. 다시 띄웠을 때 빈 주차도 저장소에 묻지 않고 바로 그리기 위해서입니다.
+        """
+        saved_at = time.time()
+        snapshot = {"format": SNAPSHOT_FORMAT, "source": self.source, "saved_at": saved_at,
+                    "team_members": data.get('team_members') or [], "weeks": sorted(week_ids),
+                    "plans": {week_id: data['plans'][week_id] for week_id in sorted(week_ids) if data['plans'].get(week_id)}}
+        try:
+            payload = gzip.compress(json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                                    compresslevel=1, mtime=0)   # 크기보다 쓰는 시간이 중요합니다.
+            with self._lock:
+                directory = os.path.dirname(self.path)
+                if directory: os.makedirs(directory, exist_ok=True)
+                write_atomic(self.path, payload)
+                self.saved_at, self.last_error = saved_at, None
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            self.last_error = e
+            return False
+
+
+class SnapshotWriter:
+    """변경 알림(notify)을 모아 백그라운드 스레드에서 스냅샷을 씁니다.
+
+    export()는 (캐시 내용, 주차 목록)을 돌려주는 함수입니다(SharedDataCache.export). 알림이 아무리 많아도
+    delay초마다 많아야 한 번 씁니다. 프로세스가 정상 종료할 때 모아 둔 변경이 있으면 마저 씁니다.
+    """
+
+    def __init__(self, store, export, delay=WRITE_DELAY):
+        self.store = store
+        self.export = export
+        self.delay = delay
+        self._dirty = False
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="weekly-snapshot-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def notify(self):
+        """캐시 내용이 바뀌었음을 알립니다. 바로 돌아옵니다."""
+        with self._cond:
+            self._dirty = True
+            self._cond.notify()
+
+    def flush(self):
+        """모아 둔 변경이 있으면 지금 씁니다. 썼으면 True입니다."""
+        with self._write_lock:
+            with self._cond:
+                if not self._dirty: return False
+                self._dirty = False
+            data, week_ids = self.export()
+            return self.store.save(data, week_ids)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._dirty: self._cond.wait()
+            time.sleep(self.delay)
+            self.flush()
@@ -0,0 +1,142 @@
+"""팀원 목록과 주간 계획을 로컬 SQLite 파일에 읽고 쓰는 저장소."""
+import json
+import sqlite3
+import threading
+
+from storage import MEMBER_HEADER, StorageBackend
+
+DEFAULT_DB_PATH = "weekly_auto.db"
+BUSY_TIMEOUT = 5.0   # 다른 연결이 쓰는 중일 때 기다리는 최대 시간(초)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS team_members (
+    name TEXT PRIMARY KEY,
+    "rank" TEXT NOT NULL DEFAULT '',
+    team TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS plans (
+    week_id TEXT NOT NULL,
+    member_name TEXT NOT NULL,
+    plan_data TEXT NOT NULL,
+    PRIMARY KEY (week_id, member_name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS plans_member_name ON plans (member_name);
+"""
+
+
+def _text(value):
+    return '' if value is None else str(value)
+
+
+def _member_values(member):
+    return [_text(member.get(col, '')) for col in MEMBER_HEADER]
+
+
+class SqliteBackend(StorageBackend):
+    """SQLite 파일 하나에 팀원과 계획을 저장합니다. 오프라인 배포와 부하 테스트용입니다.
+
+    plans는 (week_id, member_name)이 기본 키라 주차·계획 단위 조회와 저장이 인덱스로 끝나고,
+    member_name 인덱스로 이름 변경·삭제도 해당 행만 건드립니다. 계획은 plan_data 열에 JSON으로
+    담습니다. WAL 모드라 한 세션이 쓰는 동안에도 다른 세션은 기다리지 않고 읽을 수 있으며,
+    스레드마다 연결을 따로 엽니다. 파일 경로가 필요하므로 ':memory:'는 쓸 수 없습니다.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, busy_timeout=BUSY_TIMEOUT):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self):
+        """이 스레드의 연결을 반환합니다. 처음이면 연결을 열고 스키마를 만듭니다."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def connect(self):
+        self._connection()
+        return self
+
+    # 읽기
+    def load_members(self):
+        rows = self._connection().execute('SELECT name, "rank", team FROM team_members ORDER BY rowid')
+        return [dict(zip(MEMBER_HEADER, row)) for row in rows]
+
+    def list_week_ids(self):
+        return [row[0] for row in self._connection().execute("SELECT DISTINCT week_id FROM plans ORDER BY week_id")]
+
+    def _plans_from_rows(self, rows):
+        plans_data = {}
+        for week_id, member_name, plan_data in rows:
+            plans_data.setdefault(week_id, {})[member_name] = json.loads(plan_data)
+        return plans_data
+
+    def load_weeks(self, week_ids):
+        week_ids = list(dict.fromkeys(map(str, week_ids)))
+        if not week_ids: return {}
+        placeholders = ", ".join("?" * len(week_ids))
+        rows = self._connection().execute(
+            f"SELECT week_id, member_name, plan_data FROM plans WHERE week_id IN ({placeholders})", week_ids)
+        return self._plans_from_rows(rows)
+
+    def load_all(self):
+        conn = self._connection()
+        with conn:  # 두 조회가 같은 시점의 데이터를 보도록 한 트랜잭션에서 읽습니다.
+            conn.execute("BEGIN")
+            team_members = self.load_members()
+            plans_data = self._plans_from_rows(conn.execute("SELECT week_id, member_name, plan_data FROM plans"))
+        return {"team_members": team_members, "plans": plans_data}
+
+    # 쓰기
+    def save_all(self, data):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM team_members")
+            conn.execute("DELETE FROM plans")
+            conn.executemany('INSERT OR REPLACE INTO team_members (name, "rank", team) VALUES (?, ?, ?)',
+                             [_member_values(m) for m in data['team_members']])
+            conn.executemany("INSERT OR REPLACE INTO plans (week_id, member_name, plan_data) VALUES (?, ?, ?)",
+                             [(str(week_id), str(member_name), json.dumps(plan, ensure_ascii=False))
+                              for week_id, members_plans in data.get('plans', {}).items()
+                              for member_name, plan in members_plans.items()])
+
+    def _apply_op(self, conn, op):
+        kind = op[0]
+        if kind == 'member':
+            _, name, member = op
+            if member is None:
+                conn.execute("DELETE FROM team_members WHERE name = ?", (str(name),))
+                return
+            values = _member_values(member)
+            updated = conn.execute('UPDATE OR REPLACE team_members SET name = ?, "rank" = ?, team = ? WHERE name = ?',
+                                   (*values, str(name))).rowcount
+            if not updated:
+                conn.execute('INSERT OR REPLACE INTO team_members (name, "rank", team) VALUES (?, ?, ?)', values)
+        elif kind == 'rename_plans':
+            _, old_name, new_name = op
+            conn.execute("UPDATE OR REPLACE plans SET member_name = ? WHERE member_name = ?", (str(new_name), str(old_name)))
+        elif kind == 'delete_plans':
+            conn.execute("DELETE FROM plans WHERE member_name = ?", (str(op[1]),))
+        elif kind == 'plan':
+            _, week_id, member_name, plan = op
+            if plan is None:
+                conn.execute("DELETE FROM plans WHERE week_id = ? AND member_name = ?", (str(week_id), str(member_name)))
+            else:
+                conn.execute("INSERT OR REPLACE INTO plans (week_id, member_name, plan_data) VALUES (?, ?, ?)",
+                             (str(week_id), str(member_name), json.dumps(plan, ensure_ascii=False)))
+
+    def apply_ops(self, ops):
+        """변경 기록을 한 트랜잭션으로 반영합니다. 중간에 실패하면 아무것도 바뀌지 않습니다."""
+        if not ops: return
+        conn = self._connection()
+        with conn:
+            for op in ops: self._apply_op(conn, op)
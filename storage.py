@@ -0,0 +1,830 @@
+"""주간업무보고 데이터 저장소 접근 계층. 공통 인터페이스와 Google Sheets 구현을 담습니다."""
+import bisect
+import json
+from abc import ABC, abstractmethod
+import threading
+import time
+
+import gspread
+import pandas as pd
+from google.auth.exceptions import RefreshError, TransportError
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+from gspread_dataframe import set_with_dataframe
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+# --- 1. 상수 정의 ---
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+MEMBERS_SHEET = "team_members"
+PLANS_SHEET = "plans"
+HEALTH_CHECK_INTERVAL = 300   # 마지막 성공 호출 후 이 시간(초)이 지나면 연결 상태를 확인합니다.
+RECONNECT_STATUS_CODES = {401, 500, 502, 503, 504}
+MEMBER_HEADER = ['name', 'rank', 'team']
+FIRST_DATA_ROW = 2            # 1행은 헤더입니다.
+INDEX_REBUILD_RETRIES = 2     # 읽은 행이 인덱스와 어긋날 때 인덱스를 다시 만들고 다시 읽는 횟수입니다.
+
+
+# --- 2. 연결 풀 ---
+
+def _is_connection_error(error):
+    """재연결 후 재시도하면 회복될 수 있는 오류인지 판별합니다."""
+    if isinstance(error, (RefreshError, TransportError, RequestsConnectionError, Timeout)):
+        return True
+    if isinstance(error, gspread.exceptions.APIError):
+        return getattr(error, "code", None) in RECONNECT_STATUS_CODES
+    return False
+
+
+class SheetsConnection:
+    """서비스 계정 인증, 스프레드시트와 워크시트 핸들을 프로세스 단위로 재사용합니다.
+
+    OAuth 토큰은 만료 직전까지 재사용하고, 오랫동안 호출이 없었으면 가벼운 메타데이터
+    조회로 연결 상태를 확인합니다. 인증·네트워크 오류가 나면 한 번 재연결 후 재시도합니다.
+    on_request를 주면 API 요청이 끝날 때마다 on_request(kind, method, sent, received, seconds)로
+    알립니다. kind는 'read'(GET) 또는 'write'이고 sent·received는 본문 바이트 수입니다.
+    """
+
+    def __init__(self, service_account_info, spreadsheet_name, scopes=SCOPES,
+                 health_check_interval=HEALTH_CHECK_INTERVAL, on_request=None):
+        self._service_account_info = dict(service_account_info)
+        self._spreadsheet_name = spreadsheet_name
+        self._scopes = list(scopes)
+        self._health_check_interval = health_check_interval
+        self.on_request = on_request
+        self._lock = threading.RLock()
+        self._creds = None
+        self._client = None
+        self._spreadsheet = None
+        self._worksheets = {}
+        self._last_success = 0.0
+
+    def _connect(self):
+        """인증부터 워크시트 목록 조회까지 새로 연결합니다. 호출자가 잠금을 잡고 있어야 합니다."""
+        self._creds = Credentials.from_service_account_info(self._service_account_info, scopes=self._scopes)
+        self._client = gspread.authorize(self._creds)
+        if self.on_request is not None:
+            session = getattr(self._client, 'http_client', self._client).session
+            session.hooks['response'].append(self._report_response)
+        self._spreadsheet = self._client.open(self._spreadsheet_name)
+        self._worksheets = {ws.title: ws for ws in self._spreadsheet.worksheets()}
+        self._last_success = time.monotonic()
+
+    def _report_response(self, response, *args, **kwargs):
+        """requests 응답 훅입니다. 요청 하나의 종류·메서드·바이트·소요 시간을 on_request로 넘깁니다."""
+        request = response.request
+        last = request.path_url.split('?')[0].rsplit('/', 1)[-1]
+        method = last.rsplit(':', 1)[1] if ':' in last else request.method   # values:batchGet → batchGet
+        try:
+            self.on_request('read' if request.method == 'GET' else 'write', method, len(request.body or b''),
+                            len(response.content), response.elapsed.total_seconds())
+        except Exception: pass   # 측정 실패가 요청을 망치지 않게 합니다.
+
+    def _refresh_token_if_needed(self):
+        """토큰이 없거나 곧 만료되면 갱신합니다. 호출자가 잠금을 잡고 있어야 합니다."""
+        # google-auth의 valid는 만료 몇 분 전부터 False가 되므로 요청 도중 만료되지 않습니다.
+        if not self._creds.valid: self._creds.refresh(Request())
+
+    def _ensure_connected(self):
+        """연결이 없으면 만들고, 있으면 토큰과 연결 상태를 필요한 만큼만 확인합니다."""
+        with self._lock:
+            if self._spreadsheet is None:
+                self._connect()
+                return
+            self._refresh_token_if_needed()
+            if time.monotonic() - self._last_success > self._health_check_interval:
+                try:
+                    self._spreadsheet.fetch_sheet_metadata(params={"fields": "spreadsheetId"})
+                    self._last_success = time.monotonic()
+                except Exception as e:
+                    if not _is_connection_error(e): raise
+                    self._connect()
+
+    def reset(self):
+        """캐시된 인증 정보와 핸들을 모두 버립니다. 다음 호출 때 다시 연결합니다."""
+        with self._lock:
+            self._creds = self._client = self._spreadsheet = None
+            self._worksheets = {}
+
+    @property
+    def spreadsheet(self):
+        self._ensure_connected()
+        return self._spreadsheet
+
+    def worksheet(self, title):
+        """캐시된 워크시트 핸들을 반환합니다. 목록에 없을 때만 다시 조회합니다."""
+        self._ensure_connected()
+        with self._lock:
+            ws = self._worksheets.get(title)
+            if ws is None:
+                ws = self._spreadsheet.worksheet(title)
+                self._worksheets[title] = ws
+            return ws
+
+    def call(self, fn, *args, **kwargs):
+        """fn(connection, ...)을 실행합니다. 연결 오류면 재연결 후 한 번 더 시도합니다."""
+        try:
+            result = fn(self, *args, **kwargs)
+        except Exception as e:
+            if not _is_connection_error(e): raise
+            with self._lock: self.reset(); self._connect()
+            result = fn(self, *args, **kwargs)
+        self._last_success = time.monotonic()
+        return result
+
+
+# --- 3. 행 번호 인덱스 ---
+
+class RowIndex:
+    """시트의 키(예: (week_id, member_name))와 행 번호의 대응표입니다.
+
+    한 번 만들어 두고 추가·삭제·전체 재작성 때마다 함께 갱신합니다. 시트가 바깥에서
+    바뀌었을 수 있으므로 쓰기 직전에 해당 행의 키 셀만 읽어 맞는지 확인합니다.
+    group_by({그룹 이름: 키 → 그룹 값})를 주면 그룹(예: 팀원, 주차)별 키 목록도 함께 유지합니다.
+    """
+
+    def __init__(self, group_by=None):
+        self._rows = {}
+        self._keys = {}
+        self._group_by = dict(group_by or {})
+        self._groups = {name: {} for name in self._group_by}
+        self.next_row = FIRST_DATA_ROW
+        self.built = False
+
+    def rebuild(self, keys):
+        """FIRST_DATA_ROW부터 순서대로 놓인 키 목록으로 인덱스를 다시 만듭니다."""
+        self._rows, self._keys = {}, {}
+        self._groups = {name: {} for name in self._group_by}
+        for offset, key in enumerate(keys):
+            if all(key) and key not in self._rows: self._set(key, FIRST_DATA_ROW + offset)
+        self.next_row = FIRST_DATA_ROW + len(keys)
+        self.built = True
+
+    def _set(self, key, row):
+        self._rows[key] = row
+        self._keys[row] = key
+        for name, group_of in self._group_by.items():
+            self._groups[name].setdefault(group_of(key), set()).add(key)
+
+    def _discard(self, key):
+        row = self._rows.pop(key, None)
+        if row is None: return
+        self._keys.pop(row, None)
+        for name, group_of in self._group_by.items():
+            value = group_of(key)
+            group = self._groups[name].get(value)
+            if group is not None:
+                group.discard(key)
+                if not group: del self._groups[name][value]
+
+    def get(self, key):
+        return self._rows.get(key)
+
+    def key_at(self, row):
+        return self._keys.get(row)
+
+    def keys_in_group(self, name, value):
+        return set(self._groups[name].get(value, ()))
+
+    def group_values(self, name):
+        return list(self._groups[name])
+
+    def group_of(self, name, key):
+        return self._group_by[name](key)
+
+    def add(self, key, row):
+        self._discard(key)
+        self._set(key, row)
+        self.next_row = max(self.next_row, row + 1)
+
+    def move(self, key, new_key):
+        """행은 그대로 두고 키만 바꿉니다(예: 팀원 이름 변경)."""
+        row = self._rows.get(key)
+        if row is None: return
+        self._discard(key)
+        self._set(new_key, row)
+
+    def remove_rows(self, rows):
+        """행들이 삭제된 것으로 보고, 그 아래 행 번호를 당겨 맞춥니다."""
+        removed = sorted(set(rows))
+        if not removed: return
+        for row in removed:
+            key = self._keys.get(row)
+            if key is not None: self._discard(key)
+        survivors = sorted(self._rows.items(), key=lambda item: item[1])
+        self._rows, self._keys = {}, {}
+        self._groups = {name: {} for name in self._group_by}
+        for key, row in survivors:
+            self._set(key, row - bisect.bisect_left(removed, row))
+        self.next_row -= len(removed)
+
+    def invalidate(self):
+        self.built = False
+
+    def __len__(self):
+        return len(self._rows)
+
+
+# --- 4. 변경 기록 ---
+
+class ChangeSet:
+    """세션 데이터(all_data)를 고치면서 무엇이 바뀌었는지 함께 기록합니다.
+
+    기록된 변경은 SheetsBackend.apply_changes로 바뀐 행만 한 번에 반영합니다. index(model.ReportIndex)를
+    주면 이름 변경·삭제 때 그 팀원의 계획이 있는 주차만 건드리고, 색인도 변경마다 함께 고칩니다.
+    """
+
+    def __init__(self, data, index=None):
+        self.data = data
+        self.index = index
+        self.ops = []
+
+    def __bool__(self):
+        return bool(self.ops)
+
+    def _record(self, op):
+        self.ops.append(op)
+        if self.index is not None: self.index.apply_ops([op])
+
+    def _weeks_with(self, member_name):
+        return self.index.weeks_of(member_name) if self.index is not None else list(self.data['plans'])
+
+    def add_member(self, member):
+        self.data['team_members'].append(member)
+        self._record(('member', member['name'], dict(member)))
+
+    def update_member(self, old_name, member):
+        """팀원 정보를 고칩니다. 이름이 바뀌면 모든 주차의 계획도 새 이름으로 옮깁니다."""
+        members = self.data['team_members']
+        for i, m in enumerate(members):
+            if m.get('name') == old_name: members[i] = member
+        if member['name'] != old_name:
+            for week_id in self._weeks_with(old_name):
+                week_data = self.data['plans'].get(week_id, {})
+                if old_name in week_data: week_data[member['name']] = week_data.pop(old_name)
+            self._record(('rename_plans', old_name, member['name']))
+        self._record(('member', old_name, dict(member)))
+
+    def delete_member(self, name):
+        """팀원과 그 팀원의 모든 주차 계획을 지웁니다."""
+        self.data['team_members'] = [m for m in self.data.get('team_members', []) if m.get('name') != name]
+        for week_id in self._weeks_with(name):
+            self.data['plans'].get(week_id, {}).pop(name, None)
+        self._record(('delete_plans', name))
+        self._record(('member', name, None))
+
+    def set_plan(self, week_id, member_name, plan):
+        self.data['plans'].setdefault(week_id, {})[member_name] = plan
+        self._record(('plan', week_id, member_name, plan))
+
+    def delete_plan(self, week_id, member_name):
+        week_data = self.data['plans'].get(week_id, {})
+        week_data.pop(member_name, None)
+        self._record(('plan', week_id, member_name, None))
+
+
+class _SheetEdit:
+    """한 워크시트에 대해 이번 반영에서 할 셀 쓰기·행 삭제·행 추가를 모읍니다.
+
+    인덱스 자체는 반영이 성공한 뒤에만(commit) 바꿉니다.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.moved = {}      # 이번 반영 중 위치가 바뀐 키 → 행 번호(삭제면 None)
+        self.updates = {}    # 행 번호 → {열 번호(0부터): 값}
+        self.deletes = set()
+        self.appends = {}    # 새 키 → 행 값 목록
+
+    def row(self, key):
+        return self.moved[key] if key in self.moved else self.index.get(key)
+
+    def keys_in_group(self, name, value):
+        keys = {k for k in self.index.keys_in_group(name, value) if k not in self.moved}
+        keys |= {k for k, r in self.moved.items() if r is not None and self.index.group_of(name, k) == value}
+        keys |= {k for k in self.appends if self.index.group_of(name, k) == value}
+        return keys
+
+    def write(self, key, values, new_row=None, new_key=None):
+        """key 행의 열들을 씁니다({열: 값}). 행이 없으면 new_row를 새 행으로 추가합니다."""
+        new_key = new_key or key
+        if key in self.appends:
+            row_values = self.appends.pop(key)
+            for col, value in values.items(): row_values[col] = value
+            self.appends[new_key] = row_values
+            return
+        row = self.row(key)
+        if row is None:
+            if new_row is not None: self.appends[new_key] = list(new_row)
+            return
+        self.updates.setdefault(row, {}).update(values)
+        if new_key != key: self.moved[key], self.moved[new_key] = None, row
+
+    def delete(self, key):
+        if self.appends.pop(key, None) is not None: return
+        row = self.row(key)
+        if row is None: return
+        self.deletes.add(row)
+        self.updates.pop(row, None)
+        self.moved[key] = None
+
+    def touched_rows(self):
+        return sorted(set(self.updates) | self.deletes)
+
+    def requests(self, sheet_id):
+        """batchUpdate 요청 목록. 셀 쓰기 → 행 삭제(아래부터) → 행 추가 순서로 적용됩니다."""
+        requests = []
+        for row in sorted(self.updates):
+            for first, last in _contiguous_runs(sorted(self.updates[row])):
+                requests.append({"updateCells": {
+                    "range": {"sheetId": sheet_id, "startRowIndex": row - 1, "endRowIndex": row,
+                              "startColumnIndex": first, "endColumnIndex": last + 1},
+                    "rows": [{"values": [_cell(self.updates[row][c]) for c in range(first, last + 1)]}],
+                    "fields": "userEnteredValue"}})
+        for first, last in reversed(_contiguous_runs(sorted(self.deletes))):
+            requests.append({"deleteDimension": {"range": {
+                "sheetId": sheet_id, "dimension": "ROWS", "startIndex": first - 1, "endIndex": last}}})
+        if self.appends:
+            requests.append({"appendCells": {
+                "sheetId": sheet_id, "fields": "userEnteredValue",
+                "rows": [{"values": [_cell(v) for v in values]} for values in self.appends.values()]}})
+        return requests
+
+    def commit(self):
+        """반영이 끝난 뒤 인덱스를 실제 시트 상태에 맞춥니다."""
+        for key, row in self.moved.items():
+            if row is None: self.index._discard(key)
+        for key, row in self.moved.items():
+            if row is not None: self.index.add(key, row)
+        self.index.remove_rows(self.deletes)
+        for key in self.appends: self.index.add(key, self.index.next_row)
+
+
+def _contiguous_runs(rows):
+    """정렬된 번호 목록을 연속 구간 (처음, 끝) 목록으로 묶습니다."""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1: runs[-1][1] = row
+        else: runs.append([row, row])
+    return [tuple(run) for run in runs]
+
+
+def _cell(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return {"userEnteredValue": {"stringValue": '' if value is None else str(value)}}
+    return {"userEnteredValue": {"numberValue": value}}
+
+
+# --- 5. plans 시트 스키마 ---
+DAYS = ['mon', 'tue', 'wed', 'thu', 'fri']
+GRID_SLOTS = [f"{day}_{half}" for day in DAYS for half in ('am', 'pm')]
+LAST_GRID_COLUMNS = [f"last_{slot}" for slot in GRID_SLOTS]
+SUMMARY_FIELDS = ['lastWeekReview', 'nextWeekPlan', 'selfReview', 'managerReview']
+GRID_FIELDS = ['grid', 'lastWeekGrid']
+PLAN_KEY_COLUMNS = ['week_id', 'member_name']
+_MISSING = object()
+
+
+def _parse_plan_json(plan_json_str):
+    return json.loads(plan_json_str if isinstance(plan_json_str, str) and plan_json_str.strip() else '{}')
+
+
+class LegacyPlanSchema:
+    """계획 전체를 plan_data 열 하나에 JSON 문자열로 담는 예전 형식입니다."""
+    name = 'legacy'
+    value_columns = ['plan_data']
+    header = PLAN_KEY_COLUMNS + value_columns
+
+    def encode(self, plan):
+        return [json.dumps(plan, ensure_ascii=False)]
+
+    def decode_rows(self, rows):
+        return [_parse_plan_json(row[0] if row else '') for row in rows]
+
+
+class ColumnarPlanSchema:
+    """반나절 칸과 요약 항목을 각각 열 하나씩 두는 형식입니다.
+
+    grid·lastWeekGrid 칸과 요약 항목 중 문자열이 아닌 값, 스키마에 없는 키, 원래 없던 키 목록은
+    extra_data 열에 JSON으로 남겨 예전 JSON 형식과 서로 손실 없이 변환됩니다. 화면에서 저장한
+    계획은 모든 값이 문자열이라 extra_data가 비어 있습니다.
+    """
+    name = 'columnar'
+    value_columns = GRID_SLOTS + LAST_GRID_COLUMNS + SUMMARY_FIELDS + ['extra_data']
+    header = PLAN_KEY_COLUMNS + value_columns
+
+    def encode(self, plan):
+        cells, extra, missing = [], {}, []
+        for field in GRID_FIELDS:
+            grid = plan.get(field, _MISSING)
+            if not isinstance(grid, dict):
+                if grid is _MISSING: missing.append(field)
+                else: extra[field] = grid
+                cells += [''] * len(GRID_SLOTS)
+                continue
+            for slot in GRID_SLOTS:
+                value = grid.get(slot, _MISSING)
+                cells.append(value if isinstance(value, str) else '')
+                if value is _MISSING: missing.append(f"{field}.{slot}")
+                elif not isinstance(value, str): extra.setdefault(field, {})[slot] = value
+            for slot, value in grid.items():
+                if slot not in GRID_SLOTS: extra.setdefault(field, {})[slot] = value
+        for field in SUMMARY_FIELDS:
+            value = plan.get(field, _MISSING)
+            cells.append(value if isinstance(value, str) else '')
+            if value is _MISSING: missing.append(field)
+            elif not isinstance(value, str): extra[field] = value
+        for field, value in plan.items():
+            if field not in GRID_FIELDS and field not in SUMMARY_FIELDS: extra[field] = value
+        if missing: extra['_missing'] = missing
+        cells.append(json.dumps(extra, ensure_ascii=False) if extra else '')
+        return cells
+
+    def decode_rows(self, rows):
+        """행 목록을 DataFrame 열 단위 연산으로 한꺼번에 계획 dict로 바꿉니다."""
+        if not rows: return []
+        frame = pd.DataFrame(rows).reindex(columns=range(len(self.value_columns))).fillna('').astype(str)
+        frame.columns = self.value_columns
+        grids = frame[GRID_SLOTS].to_dict('records')
+        last_grids = frame[LAST_GRID_COLUMNS].set_axis(GRID_SLOTS, axis=1).to_dict('records')
+        summaries = frame[SUMMARY_FIELDS].to_dict('records')
+        plans = [{'grid': g, 'lastWeekGrid': l, **summary} for g, l, summary in zip(grids, last_grids, summaries)]
+        for i, extra_data in enumerate(frame['extra_data'].tolist()):
+            if extra_data: _apply_extra(plans[i], json.loads(extra_data))
+        return plans
+
+
+def _apply_extra(plan, extra):
+    """extra_data에 남겨 둔 정보로 열에서 읽은 계획을 원래 모양으로 되돌립니다."""
+    missing = set(extra.pop('_missing', ()))
+    for field in GRID_FIELDS:
+        if field in missing:
+            del plan[field]
+            continue
+        value = extra.pop(field, _MISSING)
+        if value is not _MISSING and not isinstance(value, dict):
+            plan[field] = value
+            continue
+        grid = plan[field]
+        for slot in GRID_SLOTS:
+            if f"{field}.{slot}" in missing: del grid[slot]
+        if value is not _MISSING: grid.update(value)
+    for field in SUMMARY_FIELDS:
+        if field in missing: del plan[field]
+    plan.update(extra)
+
+
+LEGACY_PLAN_SCHEMA = LegacyPlanSchema()
+COLUMNAR_PLAN_SCHEMA = ColumnarPlanSchema()
+
+
+def plan_schema_for(header):
+    """plans 시트 헤더 행을 보고 어떤 형식인지 판별합니다."""
+    header = [str(h) for h in header]
+    if 'plan_data' in header: return LEGACY_PLAN_SCHEMA
+    if header[:len(COLUMNAR_PLAN_SCHEMA.header)] == COLUMNAR_PLAN_SCHEMA.header: return COLUMNAR_PLAN_SCHEMA
+    raise ValueError(f"plans 시트의 헤더를 알 수 없습니다: {header}")
+
+
+# --- 6. 저장소 인터페이스 ---
+
+class StorageBackend(ABC):
+    """앱과 공유 캐시가 쓰는 저장소 인터페이스입니다.
+
+    data는 {"team_members": [{name, rank, team}], "plans": {week_id: {member_name: plan}}} 형태이고,
+    변경은 ChangeSet.ops 형식의 변경 기록으로 주고받습니다. 구현은 추상 메서드를 모두 채워야 하며,
+    하나라도 빠지면 저장 도중이 아니라 객체를 만들 때 TypeError가 납니다.
+    """
+
+    def connect(self):
+        """연결과 저장 공간(시트·테이블)을 준비합니다. 실패하면 예외를 냅니다."""
+        return self
+
+    @abstractmethod
+    def load_all(self):
+        """팀원 목록과 모든 주차의 계획을 불러옵니다."""
+
+    @abstractmethod
+    def load_members(self):
+        """팀원 목록만 불러옵니다."""
+
+    @abstractmethod
+    def list_week_ids(self):
+        """계획이 하나라도 저장된 주차 ID 목록입니다."""
+
+    @abstractmethod
+    def load_weeks(self, week_ids):
+        """지정한 주차들의 계획만 {week_id: {member_name: plan}} 형태로 불러옵니다."""
+
+    @abstractmethod
+    def save_all(self, data):
+        """팀원 목록과 계획 전체를 다시 씁니다."""
+
+    @abstractmethod
+    def apply_ops(self, ops):
+        """변경 기록에 해당하는 부분만 반영합니다."""
+
+    def apply_changes(self, changes):
+        """ChangeSet에 기록된 변경만 반영합니다."""
+        self.apply_ops(changes.ops)
+
+    def save_plan(self, week_id, member_name, member_plan):
+        """특정 팀원의 특정 주차 계획 하나를 저장합니다."""
+        self.apply_ops([('plan', week_id, member_name, member_plan)])
+
+
+# --- 7. Google Sheets 저장소 ---
+
+def _plan_key(week_id, member_name):
+    return (str(week_id), str(member_name))
+
+
+def _key_rows(rows, width=2):
+    return [tuple(str(v) for v in (list(r) + [''] * width)[:width]) for r in rows]
+
+
+def _records(rows):
+    """헤더 행을 포함한 값 목록을 get_all_records와 같은 dict 목록으로 바꿉니다."""
+    if not rows: return []
+    header = rows[0]
+    return [dict(zip(header, list(r) + [''] * (len(header) - len(r)))) for r in rows[1:]]
+
+
+def _column_letter(col):
+    return gspread.utils.rowcol_to_a1(1, col)[:-1]
+
+
+def _sheet_range(title, a1=None):
+    return gspread.utils.absolute_range_name(title, a1)
+
+
+class SheetsBackend(StorageBackend):
+    """팀원 목록과 주간 계획을 Google Sheets에 읽고 씁니다.
+
+    plans 시트의 (week_id, member_name) → 행 번호 인덱스와 팀원 이름 → 행 번호 인덱스를
+    프로세스 안에서 유지하므로 저장할 때 시트 전체를 내려받거나 다시 쓰지 않고,
+    바뀐 행의 키 확인 한 번과 쓰기 한 번으로 끝납니다. 열 단위 스키마에서는 마지막으로
+    읽거나 쓴 셀 값과 비교해 바뀐 셀만 씁니다.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._member_rows = RowIndex()
+        self._plan_rows = RowIndex(group_by={'week': lambda key: key[0], 'member': lambda key: key[1]})
+        self._plan_schema = None
+        self._plan_cells = {}
+        self._lock = threading.RLock()
+
+    @property
+    def plan_schema(self):
+        return self._plan_schema
+
+    def connect(self):
+        """인증하고 두 워크시트 핸들을 받아 둡니다. 핸들은 연결 객체가 프로세스 단위로 재사용합니다."""
+        for title in (MEMBERS_SHEET, PLANS_SHEET): self.connection.worksheet(title)
+        return self
+
+    # 인덱스
+    def _set_plan_header(self, conn, header_rows):
+        """plans 헤더로 스키마를 정합니다. 빈 시트면 열 단위 헤더를 새로 씁니다."""
+        header = list(header_rows[0]) if header_rows else []
+        if not header:
+            header = COLUMNAR_PLAN_SCHEMA.header
+            conn.worksheet(PLANS_SHEET).update(values=[header], range_name="A1")
+        self._plan_schema = plan_schema_for(header)
+
+    def _set_member_rows(self, conn, rows):
+        """헤더 포함 team_members 값으로 인덱스를 만듭니다. 빈 시트면 헤더를 새로 씁니다."""
+        if not rows or not rows[0]:
+            conn.worksheet(MEMBERS_SHEET).update(values=[MEMBER_HEADER], range_name="A1")
+            rows = [MEMBER_HEADER]
+        team_members = _records(rows)
+        self._member_rows.rebuild([(str(m.get('name', '')),) for m in team_members])
+        return team_members
+
+    def _rebuild_member_index(self, conn):
+        """team_members 시트의 이름 열만 읽어 인덱스를 다시 만듭니다."""
+        self._set_member_rows(conn, conn.worksheet(MEMBERS_SHEET).get("A:A"))
+
+    def _rebuild_plan_index(self, conn):
+        """plans 시트의 헤더와 키 두 열만 읽어 인덱스를 다시 만듭니다."""
+        value_ranges = conn.spreadsheet.values_batch_get([
+            _sheet_range(PLANS_SHEET, "1:1"), _sheet_range(PLANS_SHEET, f"A{FIRST_DATA_ROW}:B")]).get('valueRanges', [])
+        self._set_plan_header(conn, value_ranges[0].get('values'))
+        self._plan_rows.rebuild(_key_rows(value_ranges[1].get('values', [])))
+        self._plan_cells.clear()
+
+    def _decode_plan_rows(self, rows):
+        """키 열을 포함한 plans 행들을 {week_id: {member_name: plan}}로 바꾸고 셀 값을 기억해 둡니다."""
+        schema, width = self._plan_schema, len(self._plan_schema.value_columns)
+        keyed = [(key, (list(row[2:]) + [''] * width)[:width]) for key, row in zip(_key_rows(rows), rows) if all(key)]
+        plans_data = {}
+        for (key, cells), plan in zip(keyed, schema.decode_rows([cells for _, cells in keyed])):
+            plans_data.setdefault(key[0], {})[key[1]] = plan
+            self._plan_cells[key] = cells
+        return plans_data
+
+    # 읽기
+    # 인덱스와 셀 값을 바꾸는 읽기는 _lock 안에서 합니다. 밖에서 읽으면 그사이 끝난 쓰기보다 오래된 값으로
+    # 인덱스와 _plan_cells를 덮어써, 다음 저장이 실제로 바뀐 셀을 '그대로'로 보고 건너뜁니다.
+    def _read_all(self, conn):
+        with self._lock:
+            value_ranges = conn.spreadsheet.values_batch_get(
+                [_sheet_range(MEMBERS_SHEET), _sheet_range(PLANS_SHEET)]).get('valueRanges', [])
+            plan_rows = value_ranges[1].get('values', [])
+            team_members = self._set_member_rows(conn, value_ranges[0].get('values', []))
+            self._set_plan_header(conn, plan_rows[:1])
+            self._plan_rows.rebuild(_key_rows(plan_rows[1:]))
+            self._plan_cells.clear()
+            plans_data = self._decode_plan_rows(plan_rows[1:])
+        return {"team_members": team_members, "plans": plans_data}
+
+    def load_all(self):
+        """팀원 목록과 모든 주차의 계획을 불러옵니다."""
+        return self.connection.call(self._read_all)
+
+    # 주차 단위 읽기
+    def _read_members(self, conn):
+        """팀원 목록을 읽습니다. plans 인덱스가 아직 없으면 헤더와 키 열도 같은 요청으로 함께 읽습니다."""
+        with self._lock:
+            need_plan_keys = not self._plan_rows.built
+            ranges = [_sheet_range(MEMBERS_SHEET)]
+            if need_plan_keys:
+                ranges += [_sheet_range(PLANS_SHEET, "1:1"), _sheet_range(PLANS_SHEET, f"A{FIRST_DATA_ROW}:B")]
+            value_ranges = conn.spreadsheet.values_batch_get(ranges).get('valueRanges', [])
+            team_members = self._set_member_rows(conn, value_ranges[0].get('values', []))
+            if need_plan_keys:
+                self._set_plan_header(conn, value_ranges[1].get('values'))
+                self._plan_rows.rebuild(_key_rows(value_ranges[2].get('values', [])))
+                self._plan_cells.clear()
+        return team_members
+
+    def load_members(self):
+        """팀원 목록만 불러옵니다."""
+        return self.connection.call(self._read_members)
+
+    def list_week_ids(self):
+        """계획이 하나라도 저장된 주차 ID 목록입니다. 인덱스가 있으면 시트를 읽지 않습니다."""
+        def read(conn):
+            with self._lock:
+                if not self._plan_rows.built: self._rebuild_plan_index(conn)
+                return sorted(self._plan_rows.group_values('week'))
+        return self.connection.call(read)
+
+    def _read_weeks(self, conn, week_ids):
+        """인덱스로 해당 주차의 행 번호를 찾아 연속 구간만 한 번에 읽습니다. 인덱스가 어긋났으면 None."""
+        with self._lock:
+            if not self._plan_rows.built: self._rebuild_plan_index(conn)
+            expected = {self._plan_rows.get(key): key
+                        for week_id in set(map(str, week_ids)) for key in self._plan_rows.keys_in_group('week', week_id)}
+            last_col = _column_letter(len(self._plan_schema.header))
+            if not expected: return {}
+            runs = _contiguous_runs(sorted(expected))
+            ranges = [_sheet_range(PLANS_SHEET, f"A{first}:{last_col}{last}") for first, last in runs]
+            value_ranges = conn.spreadsheet.values_batch_get(ranges).get('valueRanges', [])
+            rows = []
+            for (first, last), value_range in zip(runs, value_ranges):
+                values = value_range.get('values', [])
+                rows += [list(values[offset]) if offset < len(values) else [] for offset in range(last - first + 1)]
+            if _key_rows(rows) != [expected[row] for first, last in runs for row in range(first, last + 1)]: return None
+            return self._decode_plan_rows(rows)
+
+    def load_weeks(self, week_ids):
+        """지정한 주차들의 계획만 {week_id: {member_name: plan}} 형태로 불러옵니다."""
+        def read(conn):
+            plans_data = self._read_weeks(conn, week_ids)
+            for _ in range(INDEX_REBUILD_RETRIES):
+                if plans_data is not None: return plans_data
+                with self._lock: self._rebuild_plan_index(conn)
+                plans_data = self._read_weeks(conn, week_ids)
+            if plans_data is None:
+                # 빈 결과로 돌려주면 캐시가 계획이 지워진 것으로 알고 모든 세션에 퍼뜨립니다.
+                raise RuntimeError("plans 시트가 읽는 동안 계속 바뀌어 주차 계획을 읽지 못했습니다. 잠시 후 다시 시도하세요.")
+            return plans_data
+        return self.connection.call(read)
+
+    # 전체 저장
+    def _write_all(self, conn, data):
+        members_sheet, plans_sheet = conn.worksheet(MEMBERS_SHEET), conn.worksheet(PLANS_SHEET)
+        members_df = pd.DataFrame(data['team_members'])
+        with self._lock:
+            if self._plan_schema is None: self._rebuild_plan_index(conn)
+            schema = self._plan_schema
+            self._member_rows.invalidate()
+            if not members_df.empty:
+                set_with_dataframe(members_sheet, members_df, include_index=False, resize=True)
+            else:
+                members_sheet.clear()
+                members_sheet.append_row(MEMBER_HEADER)
+            self._member_rows.rebuild([(str(m.get('name', '')),) for m in data['team_members']])
+
+            flat_plans = [[str(week_id), str(member_name), *schema.encode(plan_details)]
+                          for week_id, members_plans in data.get('plans', {}).items()
+                          for member_name, plan_details in members_plans.items()]
+            self._plan_rows.invalidate()
+            self._plan_cells.clear()
+            if flat_plans:
+                set_with_dataframe(plans_sheet, pd.DataFrame(flat_plans, columns=schema.header), include_index=False, resize=True)
+            else:
+                plans_sheet.clear()
+                plans_sheet.append_row(schema.header)
+            self._plan_rows.rebuild([(row[0], row[1]) for row in flat_plans])
+            self._plan_cells.update({(row[0], row[1]): row[2:] for row in flat_plans})
+
+    def save_all(self, data):
+        """팀원 목록과 계획 전체를 시트에 다시 씁니다."""
+        self.connection.call(self._write_all, data)
+
+    # 변경분 저장
+    def _plan_edits(self, ops):
+        """변경 기록을 시트별 셀 쓰기·행 삭제·행 추가와, 반영 뒤 셀 값 기억을 고칠 목록으로 바꿉니다."""
+        member_edit, plan_edit, cell_ops = _SheetEdit(self._member_rows), _SheetEdit(self._plan_rows), []
+        working = {}   # 이 묶음에서 앞선 변경을 반영한 셀 값 (None이면 지운 행). 같은 계획을 두 번 고쳐도 뒤의 것과 비교합니다.
+        for op in ops:
+            kind = op[0]
+            if kind == 'member':
+                _, name, member = op
+                if member is None:
+                    member_edit.delete((str(name),))
+                    continue
+                row_values = [member.get(col, '') for col in MEMBER_HEADER]
+                member_edit.write((str(name),), dict(enumerate(row_values)), new_row=row_values,
+                                  new_key=(str(member['name']),))
+            elif kind == 'rename_plans':
+                _, old_name, new_name = op
+                for key in plan_edit.keys_in_group('member', str(old_name)):
+                    new_key = _plan_key(key[0], new_name)
+                    plan_edit.write(key, {1: str(new_name)}, new_key=new_key)
+                    working[new_key], working[key] = working.get(key, self._plan_cells.get(key)), None
+                    cell_ops.append(('move', key, new_key))
+            elif kind == 'delete_plans':
+                for key in plan_edit.keys_in_group('member', str(op[1])):
+                    plan_edit.delete(key)
+                    working[key] = None
+                    cell_ops.append(('drop', key, None))
+            elif kind == 'plan':
+                _, week_id, member_name, plan = op
+                key = _plan_key(week_id, member_name)
+                if plan is None:
+                    plan_edit.delete(key)
+                    working[key] = None
+                    cell_ops.append(('drop', key, None))
+                    continue
+                cells = self._plan_schema.encode(plan)
+                known = working.get(key, self._plan_cells.get(key)) if plan_edit.row(key) is not None else None
+                changed = {len(PLAN_KEY_COLUMNS) + i: value for i, value in enumerate(cells)
+                           if known is None or known[i] != value}
+                if changed: plan_edit.write(key, changed, new_row=[key[0], key[1], *cells])
+                working[key] = cells
+                cell_ops.append(('set', key, cells))
+        return (member_edit, plan_edit), cell_ops
+
+    def _apply_cell_ops(self, cell_ops):
+        for kind, key, value in cell_ops:
+            if kind == 'set': self._plan_cells[key] = value
+            elif kind == 'drop': self._plan_cells.pop(key, None)
+            elif key in self._plan_cells: self._plan_cells[value] = self._plan_cells.pop(key)
+
+    def _edits_match_sheet(self, spreadsheet, sheet_edits):
+        """건드릴 행들의 키 셀과 추가될 자리만 한 번에 읽어 인덱스가 맞는지 확인합니다."""
+        ranges, expected = [], []
+        for ws, edit in sheet_edits:
+            width = 2 if edit.index is self._plan_rows else 1
+            last_col = _column_letter(width)
+            for row in edit.touched_rows():
+                ranges.append(_sheet_range(ws.title, f"A{row}:{last_col}{row}"))
+                expected.append(edit.index.key_at(row) or ('',) * width)
+            if edit.appends:
+                row = edit.index.next_row
+                ranges.append(_sheet_range(ws.title, f"A{row}:{last_col}{row}"))
+                expected.append(('',) * width)
+        if not ranges: return True
+        value_ranges = spreadsheet.values_batch_get(ranges).get('valueRanges', [])
+        current = _key_rows([(value_range.get('values') or [[]])[0] for value_range in value_ranges])
+        return all(tuple(c[:len(key)]) == key for c, key in zip(current, expected))
+
+    def _write_changes(self, conn, ops):
+        members_sheet, plans_sheet = conn.worksheet(MEMBERS_SHEET), conn.worksheet(PLANS_SHEET)
+        with self._lock:
+            if not self._member_rows.built: self._rebuild_member_index(conn)
+            if not self._plan_rows.built: self._rebuild_plan_index(conn)
+            edits, cell_ops = self._plan_edits(ops)
+            sheet_edits = list(zip((members_sheet, plans_sheet), edits))
+            if not self._edits_match_sheet(conn.spreadsheet, sheet_edits):
+                self._rebuild_member_index(conn)
+                self._rebuild_plan_index(conn)
+                edits, cell_ops = self._plan_edits(ops)
+                sheet_edits = list(zip((members_sheet, plans_sheet), edits))
+            requests = [request for ws, edit in sheet_edits for request in edit.requests(ws.id)]
+            if requests: conn.spreadsheet.batch_update({"requests": requests})
+            for _, edit in sheet_edits: edit.commit()
+            self._apply_cell_ops(cell_ops)
+
+    def apply_ops(self, ops):
+        """변경 기록(ChangeSet.ops 형식)에 해당하는 행만 한 번의 batchUpdate 요청으로 반영합니다.
+
+        계획 하나를 저장하면 그 행에서 바뀐 셀만 갱신하거나 새 행으로 추가합니다.
+        """
+        if ops: self.connection.call(self._write_changes, list(ops))
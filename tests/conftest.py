@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_sheets import FakeSheetsConnection, FakeSheetsServer  # noqa: E402
+from sqlite_backend import SqliteBackend  # noqa: E402
+from storage import SheetsBackend  # noqa: E402
+
+
+@pytest.fixture
+def sheets_server():
+    """요청 한도가 없는 가짜 스프레드시트입니다."""
+    return FakeSheetsServer(read_quota=None, write_quota=None)
+
+
+@pytest.fixture
+def sheets_backend(sheets_server):
+    """sheets_server에 새로 연결한 SheetsBackend를 만드는 함수입니다. data를 주면 먼저 통째로 저장합니다."""
+    def make(data=None):
+        backend = SheetsBackend(FakeSheetsConnection(sheets_server))
+        if data is not None: backend.save_all(data)
+        return backend
+    return make
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    """tmp_path/app.db의 SqliteBackend를 만드는 함수입니다. data를 주면 먼저 통째로 저장합니다."""
+    def make(data=None):
+        backend = SqliteBackend(str(tmp_path / "app.db"))
+        if data is not None: backend.save_all(data)
+        return backend
+    return make
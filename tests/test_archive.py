@@ -0,0 +1,84 @@
+"""보관한 주차에도 팀원 이름 변경·영구 삭제가 반영되는지 확인합니다."""
+import json
+import multiprocessing
+from datetime import date
+
+import pytest
+
+from archive import ArchivedStorage, PlanArchive, archive_cold_weeks, hot_window_start
+
+MEMBERS = [{'name': '홍길동', 'rank': '사원', 'team': 'BDR'}, {'name': '이영희', 'rank': '대리', 'team': 'GD'}]
+
+
+@pytest.fixture
+def storage(sqlite_backend, tmp_path):
+    live = sqlite_backend({"team_members": MEMBERS, "plans": {
+        '2024-W05': {'홍길동': {'selfReview': 'old-5'}, '이영희': {'selfReview': 'lee-5'}},
+        '2026-W40': {'홍길동': {'selfReview': 'hot'}}}})
+    archive = PlanArchive(str(tmp_path / "archive"))
+    archive_cold_weeks(live, archive, '2025-W01', log=lambda *args: None)
+    return ArchivedStorage(live, archive)
+
+
+def test_rename_reaches_archived_weeks(storage):
+    assert storage.is_archived('2024-W05')
+    storage.apply_ops([('rename_plans', '홍길동', '김철수')])
+    assert storage.load_weeks(['2024-W05', '2026-W40']) == {
+        '2024-W05': {'김철수': {'selfReview': 'old-5'}, '이영희': {'selfReview': 'lee-5'}},
+        '2026-W40': {'김철수': {'selfReview': 'hot'}}}
+    storage.apply_ops([('rename_plans', '홍길동', '김철수')])   # 다시 시도해도 같습니다.
+    assert '김철수' in PlanArchive(storage.archive.path).load_weeks(['2024-W05'])['2024-W05']
+
+
+def test_delete_reaches_archived_weeks_but_not_later_namesakes(storage):
+    storage.apply_ops([('delete_plans', '홍길동')])
+    assert storage.load_all()['plans'] == {'2024-W05': {'이영희': {'selfReview': 'lee-5'}}}
+    # 같은 이름의 새 팀원이 쓴 계획은 나중에 보관해도 삭제 기록의 영향을 받지 않습니다.
+    storage.apply_ops([('plan', '2026-W41', '홍길동', {'selfReview': 'new person'})])
+    archive_cold_weeks(storage.live, storage.archive, '2027-W01', log=lambda *args: None)
+    assert storage.load_weeks(['2026-W41']) == {'2026-W41': {'홍길동': {'selfReview': 'new person'}}}
+
+
+@pytest.mark.usefixtures('storage')
+def test_index_without_member_log_still_reads(tmp_path):
+    index_path = tmp_path / "archive" / "index.json"
+    index = json.loads(index_path.read_text(encoding='utf-8'))
+    legacy = {"weeks": {week_id: entry[:4] for week_id, entry in index['weeks'].items()}}
+    index_path.write_text(json.dumps(legacy, ensure_ascii=False), encoding='utf-8')
+    archive = PlanArchive(str(tmp_path / "archive"))
+    assert archive.load_weeks(['2024-W05'])['2024-W05']['홍길동'] == {'selfReview': 'old-5'}
+    archive.rename_member('홍길동', '김철수')
+    assert set(archive.load_weeks(['2024-W05'])['2024-W05']) == {'김철수', '이영희'}
+
+
+def test_rename_while_weeks_are_being_archived_is_kept(storage):
+    archiver, app = PlanArchive(storage.archive.path), storage.archive
+    read = archiver._read
+    def read_then_rename(index, week_ids):
+        app.rename_member('이영희', '박영희')   # 새 세그먼트를 쓰고 색인을 바꾸기 전에 앱이 이름을 바꿉니다.
+        return read(index, week_ids)
+    archiver._read = read_then_rename
+    archiver.add_weeks({'2024-W06': {'이영희': {'selfReview': 'lee-6'}}})
+    assert PlanArchive(app.path).load_weeks(['2024-W05', '2024-W06']) == {
+        '2024-W05': {'홍길동': {'selfReview': 'old-5'}, '박영희': {'selfReview': 'lee-5'}},
+        '2024-W06': {'박영희': {'selfReview': 'lee-6'}}}
+
+
+def _record_renames(path, worker):
+    archive = PlanArchive(path)
+    for i in range(20): archive.rename_member(f"w{worker}-{i}", f"w{worker}-{i}'")
+
+
+def test_member_log_survives_concurrent_processes(storage):
+    processes = [multiprocessing.Process(target=_record_renames, args=(storage.archive.path, worker)) for worker in range(4)]
+    for process in processes: process.start()
+    for process in processes: process.join(30)
+    assert all(process.exitcode == 0 for process in processes)
+    assert len(PlanArchive(storage.archive.path)._current_index()['members']) == 80
+
+
+def test_hot_window_keeps_previous_quarter():
+    assert hot_window_start(date(2025, 4, 2)) == '2025-W01'      # 2025-01-01(수)이 든 주
+    assert hot_window_start(date(2025, 6, 30)) == '2025-W01'
+    assert hot_window_start(date(2025, 4, 2), keep_quarters=1) == '2025-W10'   # 최근 4주는 남깁니다.
+    assert hot_window_start(date(2025, 5, 20), keep_quarters=1) == '2025-W14'
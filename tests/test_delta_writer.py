@@ -0,0 +1,67 @@
+"""SheetsBackend.apply_ops(변경분 저장)가 가짜 시트 서버에서 dict 모델과 같은 결과를 남기는지 확인합니다."""
+import copy
+import random
+
+EMPTY = {"team_members": [], "plans": {}}
+
+
+def reload(sheets_backend):
+    return sheets_backend().load_all()['plans']
+
+
+def test_same_plan_twice_in_one_batch_keeps_last_value(sheets_backend):
+    backend = sheets_backend({"team_members": [], "plans": {"2024-W01": {"A": {'grid': {'mon_am': 'old'}}}}})
+    backend.load_all()
+    backend.apply_ops([('plan', '2024-W01', 'A', {'grid': {'mon_am': 'new'}}),
+                       ('plan', '2024-W01', 'A', {'grid': {'mon_am': 'old'}})])
+    assert reload(sheets_backend)['2024-W01']['A']['grid']['mon_am'] == 'old'
+    backend.apply_ops([('plan', '2024-W01', 'A', {'grid': {'mon_am': 'new'}})])
+    assert reload(sheets_backend)['2024-W01']['A']['grid']['mon_am'] == 'new'
+
+
+def test_rename_then_save_in_one_batch(sheets_backend):
+    backend = sheets_backend({"team_members": [], "plans": {"2024-W01": {"A": {'grid': {'mon_am': 'x'}}}}})
+    backend.load_all()
+    backend.apply_ops([('rename_plans', 'A', 'B'), ('plan', '2024-W01', 'B', {'grid': {'mon_am': 'x'}}),
+                       ('plan', '2024-W01', 'B', {'grid': {'mon_am': 'y'}})])
+    assert reload(sheets_backend) == {'2024-W01': {'B': {'grid': {'mon_am': 'y'}}}}
+
+
+def apply_model(plans, op):
+    kind = op[0]
+    if kind == 'plan':
+        _, week_id, name, plan = op
+        if plan is None: plans.get(week_id, {}).pop(name, None)
+        else: plans.setdefault(week_id, {})[name] = copy.deepcopy(plan)
+    elif kind == 'rename_plans':
+        for week_plans in plans.values():
+            if op[1] in week_plans: week_plans[op[2]] = week_plans.pop(op[1])
+    elif kind == 'delete_plans':
+        for week_plans in plans.values(): week_plans.pop(op[1], None)
+    for week_id in [w for w, week_plans in plans.items() if not week_plans]: del plans[week_id]
+
+
+def test_random_batches_match_dict_model(sheets_backend):
+    rng = random.Random(7)
+    weeks, names, values = ['2024-W01', '2024-W02', '2024-W03'], ['A', 'B', 'C', 'D'], ['', 'a', 'b', 'c']
+    backend = sheets_backend(EMPTY)
+    backend.load_all()
+    model = {}
+    for _ in range(150):
+        batch = []
+        for _ in range(rng.randint(1, 4)):
+            r = rng.random()
+            if r < 0.75:
+                plan = None if rng.random() < 0.15 else {'grid': {'mon_am': rng.choice(values)}, 'selfReview': rng.choice(values)}
+                op = ('plan', rng.choice(weeks), rng.choice(names), plan)
+            elif r < 0.9:
+                present = {name for week_plans in model.values() for name in week_plans}
+                old, new = rng.choice(names), rng.choice(names)
+                if old == new or new in present: continue
+                op = ('rename_plans', old, new)
+            else:
+                op = ('delete_plans', rng.choice(names))
+            batch.append(op)
+            apply_model(model, op)
+        backend.apply_ops(batch)
+        assert reload(sheets_backend) == model
@@ -0,0 +1,28 @@
+"""SheetsBackend.load_weeks가 인덱스와 어긋난 시트를 '계획 없음'으로 돌려주지 않는지 확인합니다."""
+import pytest
+
+from shared_cache import SharedDataCache
+
+PLANS = {"2024-W01": {"A": {'grid': {'mon_am': 'x'}}}}
+DATA = {"team_members": [{'name': 'A', 'rank': '', 'team': ''}], "plans": PLANS}
+
+
+def test_mismatch_that_clears_after_rebuild_is_retried(sheets_backend):
+    backend = sheets_backend(DATA)
+    read_weeks, results = backend._read_weeks, [None]
+    backend._read_weeks = lambda conn, week_ids: results.pop() if results else read_weeks(conn, week_ids)
+    assert backend.load_weeks(['2024-W01']) == PLANS
+
+
+def test_persistent_mismatch_raises_and_cache_keeps_plans(sheets_backend):
+    backend = sheets_backend(DATA)
+    cache = SharedDataCache(backend, revalidate_interval=0)
+    cache.refresh(['2024-W01'])
+    version = cache.version
+    backend._read_weeks = lambda conn, week_ids: None
+    with pytest.raises(RuntimeError):
+        backend.load_weeks(['2024-W01'])
+    with pytest.raises(RuntimeError):
+        cache.refresh(['2024-W01'])
+    assert cache.version == version
+    assert cache.cached(['2024-W01'])[1]['plans'] == PLANS
@@ -0,0 +1,67 @@
+"""ReportIndex를 변경 기록으로 고친 결과가 같은 데이터로 새로 만든 색인과 같은지 확인합니다."""
+import copy
+import random
+
+from model import ReportIndex
+from shared_cache import replay_ops
+
+TEAMS, RANKS = ['BDR', 'GD', 'AE'], ['사원', '대리', '과장']
+WEEKS = ['2023-W52', '2024-W01', '2024-W02', '2025-W01']
+NAMES = ['A', 'B', 'C', 'D', 'E']
+
+
+def state(index):
+    """색인에서 화면이 쓰는 값을 모두 모읍니다. 같은 팀·직급 안의 순서도 포함합니다."""
+    names = set(NAMES) | {name for week_plans in index.data['plans'].values() for name in week_plans}
+    return {
+        'weeks': index.week_ids(), 'years': index.years(),
+        'weeks_of': {name: index.weeks_of(name) for name in sorted(names)},
+        'members': {name: index.member(name).to_dict() for name in sorted(names) if index.member(name)},
+        'groups': {week_id: [(team, [m.name for m in members]) for team, members in index.ordered_groups(week_id)]
+                   for week_id in WEEKS},
+    }
+
+
+def random_member(rng, name):
+    return {'name': name, 'rank': rng.choice(RANKS + ['인턴']), 'team': rng.choice(TEAMS + ['기타'])}
+
+
+def random_op(rng, data):
+    present = [m['name'] for m in data['team_members']]
+    r = rng.random()
+    if r < 0.5:
+        plan = None if rng.random() < 0.25 else {'selfReview': str(rng.random())}
+        return ('plan', rng.choice(WEEKS), rng.choice(NAMES), plan)
+    if r < 0.6:
+        old, new = rng.sample(NAMES, 2)
+        return ('rename_plans', old, new)
+    if r < 0.68:
+        return ('delete_plans', rng.choice(NAMES))
+    if r < 0.95:
+        name = rng.choice(NAMES)
+        if rng.random() < 0.2: return ('member', name, None)
+        # 이름을 바꿀 때는 아직 없는 이름으로만 바꿉니다(화면에서도 막습니다).
+        new_name = rng.choice([name] + [n for n in NAMES if n not in present])
+        return ('member', name, random_member(rng, new_name))
+    return ('members', [random_member(rng, name) for name in rng.sample(NAMES, rng.randint(0, len(NAMES)))])
+
+
+def test_apply_ops_matches_rebuild():
+    rng = random.Random(11)
+    data = {"team_members": [random_member(rng, name) for name in NAMES[:3]],
+            "plans": {'2024-W01': {'A': {'selfReview': 'a'}, 'B': {'selfReview': 'b'}}}}
+    index = ReportIndex(data, TEAMS, RANKS)
+    for step in range(600):
+        op = random_op(rng, data)
+        replay_ops(data, [op], index=index)
+        assert state(index) == state(ReportIndex(copy.deepcopy(data), TEAMS, RANKS)), (step, op)
+
+
+def test_ordered_groups_follow_team_and_rank_order():
+    data = {"team_members": [{'name': 'A', 'rank': '과장', 'team': 'GD'}, {'name': 'B', 'rank': '사원', 'team': 'GD'},
+                             {'name': 'C', 'rank': '대리', 'team': 'BDR'}, {'name': 'D', 'rank': '사원', 'team': '기타'}],
+            "plans": {'2024-W01': {name: {} for name in 'ABCD'}}}
+    index = ReportIndex(data, TEAMS, RANKS)
+    assert [(team, [m.name for m in members]) for team, members in index.ordered_groups('2024-W01')] == \
+        [('BDR', ['C']), ('GD', ['B', 'A'])]   # 팀 순서에 없는 팀은 나오지 않습니다.
+    assert index.years() == [2024] and index.plan('2024-W01', 'A').data == {}
@@ -0,0 +1,104 @@
+"""한글 폰트로 PDF를 그리고, 파싱한 폰트와 완성된 PDF를 캐시에서 다시 쓰는지 확인합니다.
+
+fpdf2 내부 구조(TTFFont, SubsetMap)를 나눠 쓰므로 fpdf2 버전을 올릴 때 이 테스트가 먼저 깨집니다.
+저장소에 NanumGothic.ttf가 없으면 한글 글리프를 가진 작은 TrueType 폰트를 만들어 씁니다.
+"""
+import logging
+import os
+
+import pytest
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+import pdf_export
+from pdf_export import FONT_FAMILY, export_weeks, generate_pdf, pdf_cache_key, week_report
+
+REPO_FONT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NanumGothic.ttf")
+CHAR_RANGES = [(0x20, 0x7E), (0xA0, 0xFF), (0x2010, 0x2026), (0x3131, 0x318E), (0xAC00, 0xD7A3)]
+
+
+def build_font(path):
+    """모든 글자를 네모 하나로 그리는 TrueType 폰트를 path에 씁니다."""
+    pen = TTGlyphPen(None)
+    pen.moveTo((100, 0)); pen.lineTo((100, 700)); pen.lineTo((800, 700)); pen.lineTo((800, 0)); pen.closePath()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(['.notdef', 'box'])
+    builder.setupCharacterMap({code: 'box' for first, last in CHAR_RANGES for code in range(first, last + 1)})
+    builder.setupGlyf({'.notdef': TTGlyphPen(None).glyph(), 'box': pen.glyph()})
+    builder.setupHorizontalMetrics({'.notdef': (500, 0), 'box': (900, 100)})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({'familyName': FONT_FAMILY, 'styleName': 'Regular', 'psName': FONT_FAMILY})
+    builder.setupOS2(sTypoAscender=800, sTypoDescender=-200, usWinAscent=800, usWinDescent=200)
+    builder.setupPost()
+    builder.save(path)
+
+
+@pytest.fixture(scope='module')
+def font_file(tmp_path_factory):
+    if os.path.exists(REPO_FONT): return REPO_FONT
+    path = str(tmp_path_factory.mktemp("font") / "NanumGothic.ttf")
+    build_font(path)
+    return path
+
+
+MEMBERS = [{'name': '홍길동', 'rank': '사원', 'team': 'BDR'}, {'name': '이영희', 'rank': '대리', 'team': 'GD'}]
+TEAM_ORDER, RANK_ORDER = ['BDR', 'GD'], ['사원', '대리']
+DATES = ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']
+
+
+def report(week, text):
+    plans = {'홍길동': {'grid': {'mon_am': text}, 'selfReview': "한글 리뷰"}, '이영희': {'nextWeekPlan': "차주 계획"}}
+    return week_report(2024, week, DATES, DATES, plans)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    pdf_export._pdf_cache.clear()
+    builds = []
+    build_pdf = pdf_export.build_pdf
+    monkeypatch.setattr(pdf_export, 'build_pdf', lambda reports, *args: builds.append(len(reports)) or build_pdf(reports, *args))
+    return builds
+
+
+def test_korean_pdf_reuses_parsed_font(font_file, caplog):
+    pdf_export._font_template.cache_clear()
+    with caplog.at_level(logging.WARNING):
+        first = generate_pdf(report(1, "고객사 미팅"), MEMBERS, font_file, TEAM_ORDER, RANK_ORDER)
+        second = generate_pdf(report(2, "제안서 작성"), MEMBERS, font_file, TEAM_ORDER, RANK_ORDER)
+    assert not [r for r in caplog.records if 'missing' in r.getMessage()]   # 한글 글자를 모두 이 폰트로 그렸습니다.
+    for pdf_bytes in (first, second):
+        assert pdf_bytes.startswith(b'%PDF') and FONT_FAMILY.encode() in pdf_bytes and b'/FontFile2' in pdf_bytes
+    assert first != second
+    info = pdf_export._font_template.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+
+def test_same_content_is_served_from_lru_cache(font_file, empty_cache, monkeypatch):
+    monkeypatch.setattr(pdf_export, 'PDF_CACHE_SIZE', 2)
+    reports = [report(week, f"{week}주차 업무") for week in (1, 2, 3)]
+    first = generate_pdf(reports[0], MEMBERS, font_file, TEAM_ORDER, RANK_ORDER)
+    assert generate_pdf(report(1, "1주차 업무"), MEMBERS, font_file, TEAM_ORDER, RANK_ORDER) is first
+    assert empty_cache == [1]
+    # 보고서에 없는 팀원 정보나 다른 주차 입력은 키에 들어가지 않습니다.
+    key = pdf_cache_key([reports[0]], MEMBERS, font_file, TEAM_ORDER, RANK_ORDER)
+    assert pdf_cache_key([reports[0]], MEMBERS + [{'name': '박철수', 'rank': '사원', 'team': 'BDR'}],
+                         font_file, TEAM_ORDER, RANK_ORDER) == key
+    assert pdf_cache_key([report(1, "다른 내용")], MEMBERS, font_file, TEAM_ORDER, RANK_ORDER) != key
+
+    generate_pdf(reports[1], MEMBERS, font_file, TEAM_ORDER, RANK_ORDER)
+    generate_pdf(reports[0], MEMBERS, font_file, TEAM_ORDER, RANK_ORDER)   # 최근에 쓴 것으로 올라갑니다.
+    generate_pdf(reports[2], MEMBERS, font_file, TEAM_ORDER, RANK_ORDER)   # 가장 오래된 2주차가 밀려납니다.
+    assert empty_cache == [1, 1, 1]
+    generate_pdf(reports[0], MEMBERS, font_file, TEAM_ORDER, RANK_ORDER)
+    generate_pdf(reports[1], MEMBERS, font_file, TEAM_ORDER, RANK_ORDER)
+    assert empty_cache == [1, 1, 1, 1]
+
+
+def test_zip_export_renders_only_missing_weeks(font_file, empty_cache):
+    reports = [report(week, f"{week}주차 업무") for week in (1, 2)]
+    generate_pdf(reports[0], MEMBERS, font_file, TEAM_ORDER, RANK_ORDER)
+    export_weeks(reports, MEMBERS, font_file, TEAM_ORDER, RANK_ORDER, as_zip=True, max_workers=1)
+    export_weeks(reports, MEMBERS, font_file, TEAM_ORDER, RANK_ORDER, as_zip=True, max_workers=1)
+    merged = export_weeks(reports, MEMBERS, font_file, TEAM_ORDER, RANK_ORDER)
+    assert export_weeks(reports, MEMBERS, font_file, TEAM_ORDER, RANK_ORDER) is merged
+    assert empty_cache == [1, 1, 2]
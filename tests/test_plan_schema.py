@@ -0,0 +1,68 @@
+"""예전 plan_data JSON 형식과 열 단위 형식이 서로 손실 없이 바뀌는지, 옮기는 도구가 그대로 옮기는지 확인합니다."""
+import json
+
+import pytest
+
+from fake_sheets import FakeSheetsConnection
+from migrate_plans import STAGING_SHEET, convert_rows, migrate
+from storage import COLUMNAR_PLAN_SCHEMA, GRID_SLOTS, LEGACY_PLAN_SCHEMA, PLANS_SHEET
+
+UI_PLAN = {'grid': {slot: f"고객사 미팅 {slot}" if slot.endswith('am') else '' for slot in GRID_SLOTS},
+           'lastWeekGrid': dict.fromkeys(GRID_SLOTS, ''), 'lastWeekReview': '',
+           'nextWeekPlan': "차주: 제안서 \"초안\" 작성\n- 항목 1", 'selfReview': "잘 됨 👍", 'managerReview': ''}
+PLANS = [
+    UI_PLAN,
+    {},
+    {'selfReview': "본인 리뷰만 있음"},
+    {'grid': {'mon_am': "월요일 오전"}, 'nextWeekPlan': None},
+    {'grid': {'mon_am': 3, 'sat_am': "토요일", 'tue_pm': ''}, 'lastWeekGrid': "칸이 아닌 값"},
+    {'grid': {}, 'lastWeekGrid': None, 'selfReview': ['목록'], 'managerReview': {'점수': 5},
+     'customField': "알 수 없는 키", 'tags': ["가", "나"]},
+]
+
+
+def legacy_rows(plans):
+    return [LEGACY_PLAN_SCHEMA.header] + [['2024-W01', f"팀원{i}", json.dumps(plan, ensure_ascii=False)]
+                                          for i, plan in enumerate(plans)]
+
+
+@pytest.mark.parametrize('plan', PLANS)
+def test_columnar_round_trip(plan):
+    cells = COLUMNAR_PLAN_SCHEMA.encode(plan)
+    assert len(cells) == len(COLUMNAR_PLAN_SCHEMA.value_columns)
+    assert COLUMNAR_PLAN_SCHEMA.decode_rows([cells]) == [plan]
+    assert COLUMNAR_PLAN_SCHEMA.decode_rows([[str(cell) for cell in cells]]) == [plan]
+
+
+def test_extra_data_holds_only_what_columns_cannot():
+    extra_column = COLUMNAR_PLAN_SCHEMA.value_columns.index('extra_data')
+    assert COLUMNAR_PLAN_SCHEMA.encode(UI_PLAN)[extra_column] == ''
+    extra = json.loads(COLUMNAR_PLAN_SCHEMA.encode(PLANS[5])[extra_column])
+    assert extra['customField'] == "알 수 없는 키" and extra['tags'] == ["가", "나"]
+    assert extra['managerReview'] == {'점수': 5} and 'grid.mon_am' in extra['_missing']
+    # 시트가 잘라 보낸 빈 칸(짧은 행)도 빈 문자열로 읽습니다.
+    assert COLUMNAR_PLAN_SCHEMA.decode_rows([["월요일"]])[0]['grid']['mon_am'] == "월요일"
+
+
+def test_convert_rows_keeps_every_plan():
+    rows = legacy_rows(PLANS) + [['2024-W02', '빈계획', ''], ['', '키없음', '{}'], ['2024-W02', '짧은행']]
+    converted, plans, skipped = convert_rows(rows)
+    assert converted[0] == COLUMNAR_PLAN_SCHEMA.header and skipped == 1
+    assert plans == PLANS + [{}, {}]
+    assert COLUMNAR_PLAN_SCHEMA.decode_rows([row[2:] for row in converted[1:]]) == plans
+    with pytest.raises(SystemExit):
+        convert_rows(converted)   # 이미 열 단위 형식이면 중단합니다.
+
+
+def test_migrate_on_fake_sheets(sheets_server, sheets_backend):
+    rows = legacy_rows(PLANS)
+    sheets_server.worksheet(PLANS_SHEET).update(values=rows, range_name="A1")
+    conn = FakeSheetsConnection(sheets_server)
+    migrate(conn, dry_run=True)
+    assert sheets_server.values(PLANS_SHEET) == rows
+    assert STAGING_SHEET not in [ws.title for ws in sheets_server.worksheets()]
+
+    migrate(conn)
+    assert sheets_server.values(PLANS_SHEET)[0] == COLUMNAR_PLAN_SCHEMA.header
+    assert any(ws.title.startswith(f"{PLANS_SHEET}_legacy_") for ws in sheets_server.worksheets())
+    assert sheets_backend().load_all()['plans'] == {'2024-W01': {f"팀원{i}": plan for i, plan in enumerate(PLANS)}}
@@ -0,0 +1,99 @@
+"""WriteBehindQueue가 다시 시도하는 중에도 같은 계획의 마지막 저장을 잃지 않는지 확인합니다."""
+import threading
+import time
+
+import pytest
+
+from fake_sheets import quota_error
+from save_queue import SAVED, RETRYING, WriteBehindQueue
+from shared_cache import SharedDataCache
+
+WEEK = '2024-W01'
+
+
+class FlakyBackend:
+    """apply_ops를 failures번 429로 실패시키고, gate가 있으면 열릴 때까지 쓰기를 붙잡아 둡니다."""
+
+    def __init__(self, backend):
+        self.backend, self.failures, self.gate, self.batches = backend, 0, None, []
+        self.writing = threading.Event()
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def apply_ops(self, ops):
+        self.writing.set()
+        if self.gate is not None: self.gate.wait(5)
+        self.batches.append(list(ops))
+        if self.failures:
+            self.failures -= 1
+            raise quota_error('write')
+        return self.backend.apply_ops(ops)
+
+
+@pytest.fixture
+def setup(sheets_backend):
+    backend = FlakyBackend(sheets_backend({"team_members": [], "plans": {}}))
+    cache = SharedDataCache(backend)
+    cache.refresh([WEEK])
+    sheet_value = lambda: sheets_backend().load_all()['plans'][WEEK]['A']['grid']['mon_am']
+    return backend, cache, WriteBehindQueue(cache, base_delay=0.5, max_delay=0.5), sheet_value
+
+
+def plan(value):
+    return {'grid': {'mon_am': value}}
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def assert_one_op_per_plan(batches):
+    for batch in batches:
+        keys = [(op[1], op[2]) for op in batch if op[0] == 'plan']
+        assert len(keys) == len(set(keys))
+
+
+def test_save_during_backoff_merges_into_retried_ticket(setup):
+    backend, cache, queue, sheet_value = setup
+    assert queue.submit_plan(WEEK, 'A', plan('old')).wait(5)
+    backend.failures = 1
+    first = queue.submit_plan(WEEK, 'A', plan('new'))
+    wait_for(lambda: first.state == RETRYING)
+    second = queue.submit_plan(WEEK, 'A', plan('old'))
+    assert second is first
+    assert second.wait(5) and second.state == SAVED
+    assert sheet_value() == 'old'
+    assert cache.cached([WEEK])[1]['plans'][WEEK]['A'] == plan('old')
+    assert_one_op_per_plan(backend.batches)
+
+
+def test_barrier_between_saves_keeps_order(setup):
+    backend, cache, queue, sheet_value = setup
+    assert queue.submit_plan(WEEK, 'A', plan('old')).wait(5)
+    backend.failures = 1
+    first = queue.submit_plan(WEEK, 'A', plan('new'))
+    wait_for(lambda: first.state == RETRYING)
+    barrier = queue.submit_ops([('member', 'B', {'name': 'B', 'rank': '사원', 'team': 'BDR'})])
+    last = queue.submit_plan(WEEK, 'A', plan('old'))
+    assert last is not first
+    assert all(t.wait(5) and t.state == SAVED for t in (first, barrier, last))
+    assert sheet_value() == 'old'
+    assert_one_op_per_plan(backend.batches)
+
+
+def test_newer_ticket_supersedes_failed_one(setup):
+    backend, cache, queue, sheet_value = setup
+    backend.failures, backend.gate = 1, threading.Event()
+    first = queue.submit_plan(WEEK, 'A', plan('new'))
+    backend.writing.wait(5)
+    second = queue.submit_plan(WEEK, 'A', plan('old'))   # 첫 요청을 쓰는 중이라 새 티켓이 됩니다.
+    assert second is not first
+    backend.gate.set()
+    assert first.wait(5) and second.wait(5)
+    assert first.state == second.state == SAVED
+    assert sheet_value() == 'old'
+    assert_one_op_per_plan(backend.batches)
@@ -0,0 +1,123 @@
+"""SearchIndex의 토큰 분리·BM25 순위·변경분 반영과, 전체 다시 읽기가 저장과 엇갈리지 않는지 확인합니다."""
+import random
+import threading
+
+from search import SearchIndex, field_label, query_words, terms_of
+from shared_cache import SharedDataCache
+
+WEEK = '2024-W01'
+
+
+def review(text):
+    return {'selfReview': text}
+
+
+def results(index, query, **kwargs):
+    total, hits = index.search(query, limit=1000, **kwargs)
+    assert total == len(hits)
+    return sorted((hit.week_id, hit.member_name, hit.field, round(hit.score, 9), hit.snippet) for hit in hits)
+
+
+def test_tokenizing():
+    assert query_words("Hello, 고객사와 미팅!  2차_보고") == ['hello', '고객사와', '미팅', '2차', '보고']
+    assert terms_of('고객사와') == ['고객', '객사', '사와']
+    assert terms_of('a') == ['a']
+    assert field_label('grid.mon_am') == "이번주 계획 · 월 오전"
+    assert field_label('selfReview') == "본인 리뷰"
+
+
+def test_word_inside_longer_word_matches_but_scattered_bigrams_do_not():
+    index = SearchIndex()
+    index.rebuild({WEEK: {'A': review("고객사와 미팅"), 'B': review("고객 객사 방문"), 'C': {'grid': {'tue_pm': "고객사 방문"}}}})
+    assert [(hit.member_name, hit.field) for hit in index.search("고객사")[1]] == [('C', 'grid.tue_pm'), ('A', 'selfReview')]
+    assert index.search("고객사 방문")[0] == 1
+    hit = index.search("미팅")[1][0]
+    assert (hit.member_name, hit.snippet) == ('A', ("고객사와 ", "미팅", ""))
+    assert index.search("없는말")[0] == 0 and index.search("  ")[0] == 0
+
+
+def test_bm25_ranking():
+    index = SearchIndex()
+    index.rebuild({WEEK: {'often': review("배포 배포 배포 준비"), 'once': review("배포 준비"),
+                          'long': review("배포 준비와 함께 다른 업무도 여러 가지 진행하고 회의록을 정리했습니다"),
+                          'other': review("회의 준비")},
+                   '2024-W02': {'once': review("배포 준비")}})
+    names = [(hit.week_id, hit.member_name) for hit in index.search("배포")[1]]
+    # 많이 나올수록, 같은 횟수면 짧을수록 앞이고, 점수가 같으면 최근 주차부터입니다.
+    assert names == [(WEEK, 'often'), ('2024-W02', 'once'), (WEEK, 'once'), (WEEK, 'long')]
+    # 드문 낱말이 흔한 낱말보다 점수에 크게 듭니다.
+    [rare], [common] = index.search("회의록")[1], [hit for hit in index.search("준비")[1] if hit.member_name == 'long']
+    assert rare.score > common.score
+    assert [hit.member_name for hit in index.search("배포", member_names={'once'}, start_week='2024-W02')[1]] == ['once']
+
+
+def test_apply_ops_matches_rebuild():
+    rng = random.Random(3)
+    weeks, names, words = ['2024-W01', '2024-W02', '2024-W03'], ['A', 'B', 'C', 'D'], ["고객사", "미팅", "배포", "보고서", "정리"]
+    plans, index = {}, SearchIndex()
+    index.rebuild(plans, version=0)
+    for version in range(1, 300):
+        r = rng.random()
+        if r < 0.8:
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+            plan = None if rng.random() < 0.2 else rng.choice([review(text), {'grid': {'wed_am': text}}])
+            op = ('plan', rng.choice(weeks), rng.choice(names), plan)
+            if plan is None: plans.get(op[1], {}).pop(op[2], None)
+            else: plans.setdefault(op[1], {})[op[2]] = plan
+        elif r < 0.9:
+            old, new = rng.sample(names, 2)
+            op = ('rename_plans', old, new)
+            for week_plans in plans.values():
+                if old in week_plans: week_plans[new] = week_plans.pop(old)
+        else:
+            op = ('delete_plans', rng.choice(names))
+            for week_plans in plans.values(): week_plans.pop(op[1], None)
+        index.apply_ops([op], version)
+        assert index.version == version
+    rebuilt = SearchIndex()
+    rebuilt.rebuild(plans)
+    assert len(index) == len(rebuilt) == sum(map(len, plans.values()))
+    for query in words + ["고객사 미팅", "보고"]:
+        assert results(index, query) == results(rebuilt, query)
+
+
+def test_sync_follows_cache_history(sqlite_backend):
+    cache = SharedDataCache(sqlite_backend({"team_members": [], "plans": {WEEK: {'A': review("주간 회의")}}}))
+    cache.refresh([WEEK])
+    index = SearchIndex()
+    index.sync(cache)
+    assert index.version == cache.version and index.search("회의")[0] == 1
+    cache.save([('plan', WEEK, 'B', review("회의 준비")), ('rename_plans', 'A', 'C')])
+    index.sync(cache)
+    assert index.version == cache.version
+    assert sorted(hit.member_name for hit in index.search("회의")[1]) == ['B', 'C']
+
+
+def test_full_reload_does_not_hide_a_concurrent_save(sheets_server, sheets_backend):
+    backend = sheets_backend({"team_members": [], "plans": {WEEK: {'A': {'grid': {'mon_am': 'old'}}}}})
+    cache = SharedDataCache(backend)
+    cache.refresh([WEEK])
+    # 전체 읽기(load_all)의 응답을 받은 뒤 잠시 붙잡아, 그사이에 저장이 끝날 수 있게 합니다.
+    values_batch_get, reading, gate = sheets_server.values_batch_get, threading.Event(), threading.Event()
+    def slow_values_batch_get(ranges, params=None):
+        result = values_batch_get(ranges, params)
+        if len(ranges) == 2 and '!' not in ranges[1]:
+            reading.set()
+            gate.wait(5)
+        return result
+    sheets_server.values_batch_get = slow_values_batch_get
+    index = SearchIndex()
+    sync = threading.Thread(target=index.sync, args=(cache,))
+    sync.start()
+    assert reading.wait(5)
+    save = threading.Thread(target=cache.save, args=([('plan', WEEK, 'A', {'grid': {'mon_am': 'new'}})],))
+    save.start()
+    save.join(0.3)
+    gate.set()
+    sync.join(5)
+    save.join(5)
+    cache.save([('plan', WEEK, 'A', {'grid': {'mon_am': 'old'}})])
+    assert sheets_backend().load_all()['plans'][WEEK]['A']['grid']['mon_am'] == 'old'
+    # 저장이 먼저 끝났든 나중에 끝났든, 색인 버전은 읽은 내용과 맞아 다음 sync에서 따라잡습니다.
+    index.sync(cache)
+    assert index.search("old")[0] == 1 and index.version == cache.version
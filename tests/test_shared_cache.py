@@ -0,0 +1,59 @@
+"""세션이 SharedDataCache의 변경 기록(changes_since)과 replay_ops로 최신 상태를 따라잡는지 확인합니다."""
+import copy
+
+import pytest
+
+from model import ReportIndex
+from shared_cache import SharedDataCache, replay_ops
+
+W1, W2, W3 = '2024-W01', '2024-W02', '2024-W03'
+MEMBERS = [{'name': 'A', 'rank': '사원', 'team': 'BDR'}, {'name': 'B', 'rank': '대리', 'team': 'GD'}]
+PLANS = {W1: {'A': {'selfReview': 'a1'}, 'B': {'selfReview': 'b1'}}, W2: {'A': {'selfReview': 'a2'}}}
+
+
+@pytest.fixture
+def cache(sqlite_backend):
+    cache = SharedDataCache(sqlite_backend({"team_members": MEMBERS, "plans": PLANS}), history_limit=3)
+    cache.refresh([W1, W2])
+    return cache
+
+
+def test_session_catches_up_with_changes_since(cache):
+    version, session = cache.snapshot([W1, W2])
+    assert cache.changes_since(version) == (version, [])
+    cache.save([('plan', W1, 'B', {'selfReview': 'b1+'})])
+    cache.save([('rename_plans', 'A', 'C'), ('member', 'A', {'name': 'C', 'rank': '사원', 'team': 'BDR'})])
+    new_version, ops = cache.changes_since(version)
+    assert new_version == version + 3 and [op[0] for op in ops] == ['plan', 'rename_plans', 'member']
+    replay_ops(session, ops, {W1, W2})
+    assert session == cache.cached([W1, W2])[1]
+    assert cache.changes_since(new_version - 1) == (new_version, ops[-1:])
+
+
+def test_truncated_history_returns_none(cache):
+    version = cache.version
+    for i in range(4): cache.save([('plan', W1, 'A', {'selfReview': f'v{i}'})])
+    assert cache.changes_since(version)[1] is None          # 가장 오래된 변경이 기록에서 밀려났습니다.
+    assert len(cache.changes_since(version + 1)[1]) == 3     # 남은 기록 세 개로는 따라잡을 수 있습니다.
+    assert cache.changes_since(cache.version) == (cache.version, [])
+
+
+def test_replay_skips_plans_of_weeks_the_session_has_not_loaded():
+    data = {"team_members": [], "plans": {W1: {}}}
+    replay_ops(data, [('plan', W1, 'A', {'selfReview': 'x'}), ('plan', W3, 'A', {'selfReview': 'y'})], loaded_weeks={W1})
+    assert data['plans'] == {W1: {'A': {'selfReview': 'x'}}}
+
+
+def test_replay_rename_and_delete_with_index():
+    data = copy.deepcopy({"team_members": MEMBERS, "plans": PLANS})
+    index = ReportIndex(data, ['BDR', 'GD'], ['사원', '대리'])
+    ops = [('rename_plans', 'A', 'C'), ('member', 'A', {'name': 'C', 'rank': '사원', 'team': 'BDR'})]
+    replay_ops(data, ops, index=index)
+    assert data['plans'] == {W1: {'C': {'selfReview': 'a1'}, 'B': {'selfReview': 'b1'}}, W2: {'C': {'selfReview': 'a2'}}}
+    assert index.weeks_of('C') == [W1, W2] and index.weeks_of('A') == []
+    replay_ops(data, ops, index=index)   # 다시 적용해도 같습니다.
+    assert index.weeks_of('C') == [W1, W2] and [m['name'] for m in data['team_members']] == ['C', 'B']
+
+    replay_ops(data, [('delete_plans', 'C'), ('member', 'C', None)], index=index)
+    assert data['plans'] == {W1: {'B': {'selfReview': 'b1'}}, W2: {}}
+    assert index.week_ids() == [W1] and index.member('C') is None
@@ -0,0 +1,52 @@
+"""SnapshotWriter가 저장 경로를 막지 않고 변경을 모아 쓰는지, 그 스냅샷으로 다시 시작할 수 있는지 확인합니다."""
+import time
+
+from shared_cache import SharedDataCache
+from snapshot import SnapshotStore, SnapshotWriter
+
+WEEK = '2024-W01'
+
+
+class CountingStore(SnapshotStore):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writes = 0
+
+    def save(self, data, week_ids):
+        self.writes += 1
+        return super().save(data, week_ids)
+
+
+def make_cache(sqlite_backend, tmp_path, delay):
+    backend = sqlite_backend({"team_members": [{'name': 'A', 'rank': '사원', 'team': 'BDR'}],
+                              "plans": {WEEK: {'A': {'selfReview': 'v0'}}}})
+    store = CountingStore(str(tmp_path / "snapshot.json.gz"), "sqlite:test")
+    cache = SharedDataCache(backend)
+    writer = SnapshotWriter(store, cache.export, delay=delay)
+    cache.on_sync = writer.notify
+    return backend, store, cache, writer
+
+
+def test_saves_do_not_write_and_writes_are_coalesced(sqlite_backend, tmp_path):
+    backend, store, cache, writer = make_cache(sqlite_backend, tmp_path, delay=0.3)
+    cache.refresh([WEEK])
+    for i in range(20): cache.save([('plan', WEEK, 'A', {'selfReview': f'v{i + 1}'})])
+    assert store.writes == 0
+    deadline = time.monotonic() + 5
+    while store.writes == 0 and time.monotonic() < deadline: time.sleep(0.05)
+    time.sleep(0.1)
+    assert store.writes == 1
+    assert store.load()['plans'][WEEK]['A']['selfReview'] == 'v20'
+
+
+def test_warm_start_from_snapshot(sqlite_backend, tmp_path):
+    backend, store, cache, writer = make_cache(sqlite_backend, tmp_path, delay=60)
+    cache.refresh([WEEK])
+    assert writer.flush()
+    assert not writer.flush()
+    saved = SnapshotStore(store.path, "sqlite:test").load()
+    assert SnapshotStore(store.path, "sheets:other").load() is None
+    restarted = SharedDataCache(backend)
+    assert restarted.warm_start(saved['team_members'], saved['plans'], saved['weeks'])
+    assert restarted.cached([WEEK])[1]['plans'] == {WEEK: {'A': {'selfReview': 'v0'}}}
+    assert not restarted.synced
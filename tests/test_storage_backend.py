@@ -0,0 +1,26 @@
+"""StorageBackend 구현이 인터페이스를 모두 채웠는지 만들 때 확인되는지 봅니다."""
+import pytest
+
+from archive import ArchivedStorage, PlanArchive
+from storage import StorageBackend
+
+
+def test_incomplete_backend_fails_when_constructed():
+    class ReadOnlyBackend(StorageBackend):
+        def load_all(self): return {"team_members": [], "plans": {}}
+        def load_members(self): return []
+        def list_week_ids(self): return []
+        def load_weeks(self, week_ids): return {}
+
+    with pytest.raises(TypeError, match="apply_ops"):
+        ReadOnlyBackend()
+
+
+def test_backends_implement_the_interface(sheets_backend, sqlite_backend, tmp_path):
+    data = {"team_members": [{'name': 'A', 'rank': '사원', 'team': 'BDR'}], "plans": {'2024-W01': {'A': {'selfReview': 'x'}}}}
+    live = sqlite_backend(data)
+    for backend in (sheets_backend(data), live, ArchivedStorage(live, PlanArchive(str(tmp_path / "archive")))):
+        assert isinstance(backend, StorageBackend)
+        backend.save_plan('2024-W02', 'A', {'selfReview': 'y'})
+        assert backend.load_weeks(['2024-W01', '2024-W02']) == {'2024-W01': {'A': {'selfReview': 'x'}},
+                                                                '2024-W02': {'A': {'selfReview': 'y'}}}
@@ -1,16 +1,25 @@
 import streamlit as st
-import json
 from datetime import datetime, timedelta
+import logging
 import os
-from fpdf import FPDF
-import gspread
-from google.oauth2.service_account import Credentials
-from gspread_dataframe import set_with_dataframe
-import pandas as pd
+import re
 import time
+import pandas as pd
+from storage import ChangeSet, SheetsBackend, SheetsConnection
+from sqlite_backend import SqliteBackend, DEFAULT_DB_PATH
+from fake_sheets import FakeSheetsConnection, get_server
+from shared_cache import REVALIDATE_INTERVAL, SharedDataCache, replay_ops
+from save_queue import WriteBehindQueue, PENDING, SAVING, RETRYING, SAVED, FAILED
+from pdf_export import export_weeks, generate_pdf, week_report
+from model import ReportIndex
+from metrics import Metrics
+from archive import ArchivedStorage, PlanArchive, DEFAULT_ARCHIVE_DIR
+from search import SearchIndex, field_label
+from snapshot import SnapshotStore, SnapshotWriter, DEFAULT_SNAPSHOT_PATH
 
 # --- 1. 초기 설정 및 페이지 구성 ---
 st.set_page_config(layout="wide", page_title="GS KR WEEKLY")
+script_started_at = time.perf_counter()
 
 # --- 2. CSS 스타일링 ---
 st.markdown("""
@@ -74,137 +83,416 @@ RANK_ORDER = ["수석","책임", "선임", "대리", "사원", "인턴", "기타
 FONT_FILE = "NanumGothic.ttf"
 DELETE_PASSWORD = "3002"
 GOOGLE_SHEET_NAME = "주간업무보고_DB"
+STORAGE_BACKENDS = ("sheets", "sqlite", "fake_sheets")   # secrets.toml의 storage_backend 값
+SAVE_WAIT_SECONDS = 10          # 팀원 추가·삭제처럼 화면이 결과를 바로 써야 하는 저장을 기다리는 최대 시간
+SAVE_STATUS_POLL_SECONDS = 1
+CARDS_PER_PAGE = 10             # 한 번에 그리는 보고서 카드 수
+SHEETS_REQUESTS_PER_MINUTE = 60 # Sheets API 사용자당 분당 읽기·쓰기 한도 (관리자 지표에서 비교용)
+SEARCH_RESULT_LIMIT = 30        # 검색 결과를 한 번에 보여 줄 개수
+MARKDOWN_SPECIAL = re.compile(r"([\\`*_{}\[\]()#+\-.!|~<>$])")
 
 # --- 4. 핵심 함수 정의 (데이터 처리) ---
 
-def connect_to_gsheet():
-    """Google Sheets에 연결하고 워크시트 객체를 반환합니다."""
+def get_setting(name, default=None):
+    """secrets.toml의 값을 먼저 쓰고, 없으면 같은 이름의 대문자 환경 변수를 씁니다."""
+    try:
+        if name in st.secrets: return st.secrets[name]
+    except Exception: pass
+    return os.environ.get(name.upper(), default)
+
+@st.cache_resource(show_spinner=False)
+def get_metrics():
+    """서버 프로세스 전체가 공유하는 성능 지표입니다. metrics_log 설정을 켜면 기록마다 JSON 한 줄을 로그로 남깁니다."""
+    logger = None
+    if str(get_setting("metrics_log", "")).lower() in ("1", "true", "yes"):
+        logger = logging.getLogger("weekly_auto.metrics")
+        if not logger.handlers:
+            logger.addHandler(logging.StreamHandler())
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+    return Metrics(logger)
+
+@st.cache_resource(show_spinner=False)
+def get_storage():
+    """서버 프로세스 전체가 공유하는 저장소를 반환합니다. storage_backend 설정으로 고릅니다.
+
+    sheets(기본값)는 Google Sheets, sqlite는 sqlite_path의 로컬 파일, fake_sheets는 인증 없이 도는
+    메모리 안의 가짜 시트(재시작하면 비워짐)입니다. archive.py로 옮겨 둔 오래된 주차는 archive_dir에서 읽습니다.
+    """
+    backend = get_setting("storage_backend", "sheets")
+    if backend == "sheets":
+        live = SheetsBackend(SheetsConnection(st.secrets["gcp_service_account"], GOOGLE_SHEET_NAME,
+                                              on_request=get_metrics().sheets_request))
+    elif backend == "sqlite":
+        live = SqliteBackend(get_setting("sqlite_path", DEFAULT_DB_PATH))
+    elif backend == "fake_sheets":
+        server = get_server(GOOGLE_SHEET_NAME, latency=float(get_setting("fake_sheets_latency", 0)))
+        live = SheetsBackend(FakeSheetsConnection(server, on_request=get_metrics().sheets_request))
+    else:
+        raise ValueError(f"storage_backend는 {', '.join(STORAGE_BACKENDS)} 중 하나여야 합니다: {backend}")
+    return ArchivedStorage(live, PlanArchive(get_setting("archive_dir", DEFAULT_ARCHIVE_DIR)))
+
+def connect_storage():
+    """공유 저장소를 준비해 반환합니다. 인증과 워크시트 조회는 프로세스당 한 번만 일어납니다."""
     try:
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        creds = Credentials.from_service_account_info(
-            st.secrets["gcp_service_account"], scopes=scopes
-        )
-        client = gspread.authorize(creds)
-        spreadsheet = client.open(GOOGLE_SHEET_NAME)
-        members_sheet = spreadsheet.worksheet("team_members")
-        plans_sheet = spreadsheet.worksheet("plans")
-        return members_sheet, plans_sheet
+        with get_metrics().timed("connect_storage"): return get_storage().connect()
     except Exception as e:
-        st.error(f"Google Sheets 연결 실패: {e}. secrets.toml 파일과 시트 공유 설정을 확인하세요.")
-        return None, None
+        st.error(f"저장소 연결 실패: {e}. secrets.toml 파일(storage_backend, gcp_service_account)과 시트 공유 설정을 확인하세요.")
+        return None
 
 def create_default_data():
     """데이터가 없을 때 사용할 기본 데이터 구조를 생성합니다."""
     return { "team_members": [], "plans": {} }
 
-def load_data():
-    """Google Sheets에서 모든 데이터를 불러옵니다."""
-    members_sheet, plans_sheet = connect_to_gsheet()
-    if not members_sheet or not plans_sheet:
-        st.warning("Google Sheets에 연결할 수 없어 빈 데이터로 시작합니다.")
-        return create_default_data()
+@st.cache_resource(show_spinner=False)
+def get_snapshot_store():
+    """공유 캐시를 남겨 두는 로컬 스냅샷입니다. snapshot_path를 빈 값으로 두면 쓰지 않습니다(None)."""
+    path = get_setting("snapshot_path", DEFAULT_SNAPSHOT_PATH)
+    if not path: return None
+    backend = get_setting("storage_backend", "sheets")
+    source = f"{backend}:{get_setting('sqlite_path', DEFAULT_DB_PATH) if backend == 'sqlite' else GOOGLE_SHEET_NAME}"
+    return SnapshotStore(path, source)
+
+@st.cache_resource(show_spinner=False)
+def get_data_cache():
+    """서버 프로세스 전체가 공유하는 팀원·계획 캐시를 반환합니다. 로컬 스냅샷이 있으면 그 내용으로 미리 채웁니다."""
+    store = get_snapshot_store()
+    cache = SharedDataCache(get_storage())
+    if store is not None:
+        cache.on_sync = SnapshotWriter(store, cache.export).notify
+        with get_metrics().timed("warm_start"): saved = store.load()
+        if saved: cache.warm_start(saved['team_members'], saved['plans'], saved['weeks'])
+    return cache
+
+def snapshot_time():
+    store = get_snapshot_store()
+    return datetime.fromtimestamp(store.saved_at).strftime("%m/%d %H:%M") if store and store.saved_at else "마지막"
+
+def load_data(week_ids):
+    """공유 캐시에서 (버전, 팀원 목록과 지정한 주차 계획의 복사본)을 받아 옵니다. 캐시에 없으면 시트에서 불러옵니다.
+
+    로컬 스냅샷으로 채운 캐시는 시트를 기다리지 않고 바로 돌려주고 시트와는 뒤에서 맞춥니다. 시트에 닿지 않으면
+    스냅샷에 있는 만큼만 읽기 전용으로 보여 줍니다.
+    """
+    try: cache = get_data_cache()
+    except Exception: cache = None
+    if cache is None or (not cache.loaded_weeks and not connect_storage()):
+        if cache is None: connect_storage()   # 연결 실패 이유를 알립니다.
+        st.warning("저장소에 연결할 수 없어 빈 데이터로 시작합니다.")
+        return 0, create_default_data()
     try:
-        members_records = members_sheet.get_all_records()
-        team_members = [{k: (v if v is not None else '') for k, v in record.items()} for record in members_records]
-        
-        plans_records = plans_sheet.get_all_records()
-        plans_data = {}
-        if plans_records:
-            plans_df = pd.DataFrame(plans_records)
-            if not plans_df.empty and 'week_id' in plans_df.columns:
-                for _, row in plans_df.iterrows():
-                    week_id, member_name = str(row.get('week_id', '')), row.get('member_name', '')
-                    if not week_id or not member_name: continue
-                    plan_json_str = row.get('plan_data', '{}')
-                    plan_details = json.loads(plan_json_str if isinstance(plan_json_str, str) and plan_json_str.strip() else '{}')
-                    if week_id not in plans_data: plans_data[week_id] = {}
-                    plans_data[week_id][member_name] = plan_details
-        return {"team_members": team_members, "plans": plans_data}
+        with get_metrics().timed("load_data", weeks=len(week_ids)): return cache.snapshot(week_ids, background=True)
     except Exception as e:
+        if cache.loaded_weeks:
+            st.warning(f"저장소에 연결할 수 없어 {snapshot_time()} 스냅샷을 보여 줍니다. 연결되기 전까지는 저장할 수 없습니다. ({e})")
+            return cache.cached(week_ids)
         st.warning(f"데이터 로딩 중 오류 발생({e}). 시트의 헤더(name, rank, team 등)를 확인하세요.")
-        return create_default_data()
-
-def save_all_data(data):
-    """팀원 목록과 계획 전체를 구글 시트에 저장합니다."""
-    members_sheet, plans_sheet = connect_to_gsheet()
-    if not members_sheet or not plans_sheet: return
+        return 0, create_default_data()
 
+def refresh_shared_cache(cache, week_ids):
+    """공유 캐시에 없는 주차는 시트에서 읽고, 오래된 주차는 뒤에서 다시 맞춥니다. 실패하면 False를 반환합니다."""
     try:
-        members_df = pd.DataFrame(data['team_members'])
-        if not members_df.empty:
-            set_with_dataframe(members_sheet, members_df, include_index=False, resize=True)
-        else:
-            members_sheet.clear()
-            members_sheet.append_row(['name', 'rank', 'team'])
-
-        plans_data, flat_plans = data.get('plans', {}), []
-        for week_id, members_plans in plans_data.items():
-            for member_name, plan_details in members_plans.items():
-                flat_plans.append({
-                    "week_id": week_id, "member_name": member_name,
-                    "plan_data": json.dumps(plan_details, ensure_ascii=False)
-                })
-        
-        plans_df = pd.DataFrame(flat_plans)
-        if not plans_df.empty:
-            set_with_dataframe(plans_sheet, plans_df, include_index=False, resize=True)
-        else:
-            plans_sheet.clear()
-            plans_sheet.append_row(['week_id', 'member_name', 'plan_data'])
+        with get_metrics().timed("refresh_cache"): cache.refresh(week_ids, background=True)
+        return True
     except Exception as e:
-        st.error(f"전체 데이터 저장 중 오류 발생: {e}")
+        st.warning(f"주차 데이터 로딩 중 오류 발생: {e}")
+        return False
+
+def sync_session_data(cache):
+    """다른 세션이 저장한 변경 중 이 세션이 아직 못 본 것만 받아 세션 데이터에 적용합니다."""
+    version, ops = cache.changes_since(st.session_state.data_version)
+    if ops is None:
+        version, st.session_state.all_data = cache.snapshot(sorted(st.session_state.loaded_weeks))
+        st.session_state.report_index.rebuild(st.session_state.all_data)
+    else: replay_ops(st.session_state.all_data, ops, st.session_state.loaded_weeks, st.session_state.report_index)
+    st.session_state.data_version = version
+
+@st.cache_data(ttl=REVALIDATE_INTERVAL, show_spinner=False)
+def stored_plan_years():
+    """저장소에 계획이 있는 연도 목록입니다. 다시 그릴 때마다 모든 주차 ID를 나누지 않도록 잠시 캐시합니다."""
+    return sorted({int(week_id.split('-W')[0]) for week_id in get_storage().list_week_ids()})
+
+def is_archived_week(week_id):
+    """archive.py로 보관소에 옮긴(읽기 전용) 주차인지 확인합니다."""
+    try: return get_storage().is_archived(week_id)
+    except Exception: return False
+
+def list_plan_years():
+    """계획이 있는 연도 목록입니다. 저장소에 연결할 수 없거나 아직 스냅샷만 있으면 세션에 불러온 주차의 연도만 돌려줍니다."""
+    years = set(st.session_state.report_index.years())
+    try:
+        cache = get_data_cache()
+        if cache.synced and cache.last_error is None: years.update(stored_plan_years())
+    except Exception: pass
+    return sorted(years)
+
+@st.cache_resource(show_spinner=False)
+def get_save_queue():
+    """서버 프로세스 전체가 공유하는 백그라운드 저장 큐를 반환합니다. 실제로 시트에 쓰는 시간도 지표에 남깁니다."""
+    metrics = get_metrics()
+    def on_flush(seconds, op_count, error):
+        metrics.observe("save_flush", seconds, ops=op_count, error=None if error is None else str(error))
+        metrics.count("save_flush_errors" if error else "saved_ops", 1 if error else op_count)
+    return WriteBehindQueue(get_data_cache(), on_flush=on_flush)
+
+def save_changes(changes):
+    """ChangeSet에 기록된 팀원·계획 행을 저장 큐에 넣고, 앞선 저장과 순서를 지켜 반영될 때까지 잠시 기다립니다."""
+    if not connect_storage(): return
+    with get_metrics().timed("save_changes", ops=len(changes.ops)):
+        ticket = get_save_queue().submit_ops(changes.ops)
+        ticket.wait(SAVE_WAIT_SECONDS)
+    if not ticket.done: st.info("저장 요청을 접수했습니다. 잠시 후 반영됩니다.")
+    elif ticket.state == FAILED: st.error(f"데이터 저장 중 오류 발생: {ticket.error}")
 
 def save_member_plan(week_id, member_name, member_plan):
-    """특정 팀원의 특정 주차 계획만 업데이트하거나 새로 추가합니다."""
-    _, plans_sheet = connect_to_gsheet()
-    if not plans_sheet: return False
+    """특정 팀원의 특정 주차 계획 저장을 예약합니다. 실제 쓰기는 백그라운드에서 일어나며 SaveTicket을 반환합니다."""
+    if not connect_storage(): return None
+    with get_metrics().timed("save_member_plan"): return get_save_queue().submit_plan(week_id, member_name, member_plan)
+
+SAVE_STATUS_MESSAGES = {
+    PENDING: ("info", "⏳ 저장 대기 중"), SAVING: ("info", "⏳ 저장 중"),
+    RETRYING: ("warning", "⚠️ 일시적인 오류로 다시 시도하는 중"), SAVED: ("success", "✅ 저장 완료"),
+    FAILED: ("error", "❌ 저장 실패"),
+}
+
+def get_save_ticket(week_id, member_name):
+    try: return get_save_queue().status(week_id, member_name)
+    except Exception: return None
+
+def render_save_status(week_id, member_name):
+    """해당 계획의 가장 최근 저장 상태를 보여 줍니다."""
+    ticket = get_save_ticket(week_id, member_name)
+    if ticket is None: return
+    kind, message = SAVE_STATUS_MESSAGES[ticket.state]
+    if ticket.state == SAVED: message += f" ({datetime.fromtimestamp(ticket.updated_at):%H:%M:%S})"
+    if ticket.state in (RETRYING, FAILED): message += f": {ticket.error} (시도 {ticket.attempts}회)"
+    getattr(st, kind)(message)
+
+@st.fragment(run_every=SAVE_STATUS_POLL_SECONDS)
+def render_save_status_live(week_id, member_name):
+    """저장이 끝날 때까지 상태 표시만 주기적으로 다시 그립니다."""
+    render_save_status(week_id, member_name)
+
+@st.fragment(run_every=SAVE_STATUS_POLL_SECONDS)
+def wait_for_revalidation():
+    """스냅샷으로 그린 화면을 뒤에서 시트와 맞추는 동안 기다렸다가, 끝나면 바뀐 내용을 받도록 화면 전체를 다시 그립니다."""
+    if get_data_cache().revalidating: st.caption("🔄 저장소와 맞추는 중...")
+    else: st.rerun()
+
+def render_sync_status():
+    """시트와 맞추는 중이거나 시트에 닿지 않아 스냅샷을 보여 주는 중이면 알립니다."""
+    try: cache = get_data_cache()
+    except Exception: return
+    if cache.last_error is not None:
+        st.warning(f"저장소에 연결할 수 없어 {snapshot_time()} 스냅샷을 보여 줍니다. 연결되면 자동으로 최신 내용을 받아 옵니다. ({cache.last_error})")
+    elif cache.revalidating and not cache.synced: wait_for_revalidation()
+
+def render_grid(member_name, title, grid_data, key_prefix, header_class, dates, is_editable=True):
+    st.markdown(f"<h6>{title}</h6>", unsafe_allow_html=True)
+    day_cols = st.columns(5)
+    days, day_names = ['mon', 'tue', 'wed', 'thu', 'fri'], ['월', '화', '수', '목', '금']
+    for i, day in enumerate(days):
+        with day_cols[i]:
+            st.markdown(f"<div class='header-base {header_class} header-day'><b>{day_names[i]}({dates[i]})</b></div>", unsafe_allow_html=True)
+            st.markdown("<p class='mobile-label'>오전</p>", unsafe_allow_html=True)
+            grid_data[f'{day}_am'] = st.text_area(f"{key_prefix}_{member_name}_{day}_am", value=grid_data.get(f'{day}_am', ''), height=120, disabled=not is_editable)
+            st.markdown("<p class='mobile-label'>오후</p>", unsafe_allow_html=True)
+            grid_data[f'{day}_pm'] = st.text_area(f"{key_prefix}_{member_name}_{day}_pm", value=grid_data.get(f'{day}_pm', ''), height=120, disabled=not is_editable)
+
+def render_summary_row(member_name, member_plan, label, key, placeholder, is_auto, height=140, is_editable=True):
+    header_class = "header-automated" if is_auto else "header-default"
+    cols = st.columns([0.2, 0.8])
+    cols[0].markdown(f"<div class='header-base {header_class} header-summary'><b>{label}</b></div>", unsafe_allow_html=True)
+    member_plan[key] = cols[1].text_area(f"{key}_{member_name}", value=member_plan.get(key, ""), placeholder=placeholder, height=height, disabled=not is_editable)
+
+@st.fragment
+def render_member_card(week_id, member):
+    """팀원 한 명의 보고서 카드입니다. 카드 안에서 입력·저장·접기를 하면 이 카드만 다시 그립니다.
+
+    접힌 카드는 입력창을 만들지 않습니다. 입력한 내용은 세션의 계획 dict에 남아 있으므로 다시 펼쳐도 그대로입니다.
+    보관된 주차는 읽기 전용이라 삭제·저장 버튼을 그리지 않습니다.
+    """
+    member_name = member.name
+    is_editable = not is_archived_week(week_id)
+    plan = st.session_state.report_index.plan(week_id, member_name)
+    if plan is None: return  # 다른 세션에서 보고서를 삭제했습니다.
+    member_plan = plan.data
+    member_info_cols = st.columns([4, 1, 1])
+    with member_info_cols[0]:
+        member_info = f"[{member.team}] {member_name} {member.rank}"
+        st.subheader(member_info)
+    is_open = member_info_cols[1].toggle("펼치기", value=True, key=f"card_open_{member_name}")
+    with member_info_cols[2]:
+        if is_editable and st.button("보고서 삭제", key=f"delete_btn_{member_name}", type="secondary"):
+            st.session_state.requesting_password_for_report_delete = member_name; st.rerun()
+    if not is_open:
+        render_save_status(week_id, member_name)
+        st.markdown("---")
+        return
+    if 'grid' not in member_plan: member_plan['grid'] = {}
+    if 'lastWeekGrid' not in member_plan or 'lastWeekReview' not in member_plan:
+        prev_date = st.session_state.selected_date - timedelta(weeks=1)
+        prev_week_id = get_week_id(prev_date.year, prev_date.isocalendar().week)
+        prev_plan = st.session_state.report_index.plan(prev_week_id, member_name)
+        member_plan['lastWeekGrid'] = prev_plan.grid if prev_plan else {}
+        member_plan['lastWeekReview'] = prev_plan.next_week_plan if prev_plan else ""
+    week_dates = get_week_dates(st.session_state.selected_date)
+    render_grid(member_name, "이번주 계획", member_plan['grid'], "grid", "header-default", week_dates, is_editable)
+    st.markdown("<div style='margin-top: 16px;'></div>", unsafe_allow_html=True)
+    last_week_dates = get_week_dates(st.session_state.selected_date - timedelta(weeks=1))
+    if 'lastWeekGrid' not in member_plan: member_plan['lastWeekGrid'] = {}
+    render_grid(member_name, "지난주 업무 내역 (수정 가능)", member_plan['lastWeekGrid'], "last_grid", "header-automated", last_week_dates, is_editable)
+    st.markdown("<div style='margin-top: -8px;'></div>", unsafe_allow_html=True)
+    render_summary_row(member_name, member_plan, "지난주 리뷰 (수정 가능)", "lastWeekReview", "지난주 차주 계획을 작성하지 않아 연동되지 않았습니다.", True, is_editable=is_editable)
+    render_summary_row(member_name, member_plan, "차주 계획", "nextWeekPlan", "다음 주 계획을 구체적으로 작성해주세요.", False, is_editable=is_editable)
+    render_summary_row(member_name, member_plan, "본인 리뷰", "selfReview", "스스로에 대한 리뷰 및 이슈, 건의사항을 편하게 작성해주세요.", False, is_editable=is_editable)
+    render_summary_row(member_name, member_plan, "부서장 리뷰", "managerReview", "이번 한 주도 고생 많으셨습니다.🚀", False, is_editable=is_editable)
+
+    if not is_editable:
+        st.markdown("---")
+        return
+    # 개인별 저장 버튼
+    if st.button(f"💾 {member_name}님 계획 저장", key=f"save_btn_{member_name}", use_container_width=True, type="primary"):
+        save_member_plan(week_id, member_name, member_plan)
+    save_ticket = get_save_ticket(week_id, member_name)
+    if save_ticket is not None and not save_ticket.done: render_save_status_live(week_id, member_name)
+    else: render_save_status(week_id, member_name)
+    st.markdown("---")
+
+def build_week_report(date_obj, plans):
+    """date_obj가 속한 주의 PDF 입력을 만듭니다. plans는 {week_id: {member_name: plan}}입니다."""
+    prev_date = date_obj - timedelta(weeks=1)
+    return week_report(date_obj.isocalendar().year, date_obj.isocalendar().week, get_week_dates(date_obj),
+                       get_week_dates(prev_date), plans.get(week_id_of(date_obj), {}), plans.get(week_id_of(prev_date), {}))
+
+def load_plans_for_export(week_ids):
+    """PDF로 내보낼 주차의 계획을 모읍니다. 세션에 없는 주차는 공유 캐시에서 받아 오되 세션에는 넣지 않습니다."""
+    session_plans, loaded_weeks = st.session_state.all_data['plans'], st.session_state.loaded_weeks
+    plans = {week_id: session_plans[week_id] for week_id in week_ids if week_id in loaded_weeks and week_id in session_plans}
+    missing = [week_id for week_id in week_ids if week_id not in loaded_weeks]
+    if missing and connect_storage():
+        try: plans.update(get_data_cache().snapshot(missing)[1]['plans'])
+        except Exception as e: st.warning(f"일부 주차를 불러오지 못했습니다: {e}")
+    return plans
+
+def export_pdf(reports, as_zip=False):
+    """주차별 보고서를 PDF(여러 주면 한 파일로 합침) 또는 ZIP 바이트로 만듭니다. 실패하면 None을 반환합니다."""
+    if not os.path.exists(FONT_FILE):
+        st.error(f"PDF 생성에 필요한 폰트 파일({FONT_FILE})이 없습니다.")
+        return None
+    members = st.session_state.all_data.get('team_members', [])
     try:
-        all_records = plans_sheet.get_all_records()
-        plan_json_str = json.dumps(member_plan, ensure_ascii=False)
-        
-        found = False
-        for i, record in enumerate(all_records):
-            if str(record.get('week_id')) == str(week_id) and record.get('member_name') == member_name:
-                plans_sheet.update_cell(i + 2, 3, plan_json_str)
-                found = True
-                break
-        
-        if not found:
-            plans_sheet.append_row([week_id, member_name, plan_json_str])
-        return True
+        if len(reports) == 1 and not as_zip:
+            with get_metrics().timed("generate_pdf"): return generate_pdf(reports[0], members, FONT_FILE, TEAM_ORDER, RANK_ORDER)
+        with get_metrics().timed("export_pdf", weeks=len(reports), as_zip=as_zip):
+            return export_weeks(reports, members, FONT_FILE, TEAM_ORDER, RANK_ORDER, as_zip=as_zip)
     except Exception as e:
-        st.error(f"'{member_name}'님의 데이터 저장 중 오류 발생: {e}")
-        return False
-
-def generate_pdf(plans_data, members_data, year, week, week_dates, prev_week_dates, day_names, team_order):
-    pdf = FPDF()
-    pdf.add_font('NanumGothic', '', FONT_FILE, uni=True)
-    pdf.add_page()
-    pdf.set_font('NanumGothic', '', 20)
-    pdf.cell(0, 12, f'주간 계획서 - {year}년 {week}주차', ln=True, align='C')
-    pdf.ln(10)
-    # ... (이하 PDF 생성 로직 동일) ...
-    return pdf.output(dest='S').encode('latin-1')
+        st.error(f"PDF 생성 중 오류 발생: {e}")
+        return None
+
+def render_metrics_panel():
+    """관리자용 성능 지표입니다. 최근 1분 할당량 사용량, 분당 요청 수, 작업별 소요 시간과 내보내기를 보여 줍니다."""
+    metrics = get_metrics()
+    snapshot = metrics.snapshot()
+    quota = snapshot['quota_last_minute']
+    for kind, label in (('read', '읽기'), ('write', '쓰기')):
+        st.progress(min(1.0, quota[kind] / SHEETS_REQUESTS_PER_MINUTE), text=f"최근 1분 {label} 요청 {quota[kind]}/{SHEETS_REQUESTS_PER_MINUTE}")
+    per_minute = pd.DataFrame([(datetime.fromtimestamp(minute).strftime("%H:%M"), reads, writes)
+                               for minute, reads, writes in metrics.requests_per_minute()], columns=["분", "읽기", "쓰기"])
+    st.bar_chart(per_minute.set_index("분"), height=160)
+    try: st.caption(f"저장 대기 {get_save_queue().backlog}건 · 받은 바이트 {snapshot['sheets_bytes'].get('received', 0):,} · 보낸 바이트 {snapshot['sheets_bytes'].get('sent', 0):,}")
+    except Exception: pass
+    if snapshot['timings']:
+        st.dataframe(pd.DataFrame([{"작업": name, "횟수": t['count'], "평균(ms)": t['mean'] * 1000, "p95(ms)": t['p95'] * 1000,
+                                    "최대(ms)": t['max'] * 1000} for name, t in snapshot['timings'].items()]).round(1),
+                     hide_index=True, use_container_width=True)
+    if snapshot['sheets_requests']:
+        st.dataframe(pd.DataFrame(snapshot['sheets_requests']).rename(columns={"kind": "종류", "method": "요청", "count": "횟수"}),
+                     hide_index=True, use_container_width=True)
+    export_cols = st.columns(2)
+    export_cols[0].download_button("Prometheus", metrics.to_prometheus(), "weekly_auto_metrics.prom", "text/plain", use_container_width=True)
+    export_cols[1].download_button("JSON", metrics.to_json(), "weekly_auto_metrics.json", "application/json", use_container_width=True)
+
+@st.cache_resource(show_spinner=False)
+def get_search_index():
+    """서버 프로세스 전체가 공유하는 보고서 검색 색인입니다. 공유 캐시의 변경 기록을 따라 바뀐 계획만 다시 색인합니다."""
+    return SearchIndex()
+
+def search_reports(query, member_names=None, start_week=None, end_week=None):
+    """모든 주차(보관한 주차 포함)의 보고서를 검색해 (전체 일치 수, 결과 목록)을 반환합니다. 실패하면 None입니다."""
+    if not connect_storage(): return None
+    try:
+        with get_metrics().timed("search"):
+            index = get_search_index()
+            index.sync(get_data_cache())
+            return index.search(query, member_names, start_week, end_week, limit=SEARCH_RESULT_LIMIT)
+    except Exception as e:
+        st.warning(f"검색 중 오류 발생: {e}")
+        return None
+
+def escape_markdown(text):
+    """검색 결과의 사용자 글이 마크다운 서식으로 해석되지 않도록 특수 문자를 이스케이프합니다."""
+    return MARKDOWN_SPECIAL.sub(r"\\\1", str(text)).replace("\n", " ")
+
+def render_search_hit(i, hit):
+    """검색 결과 하나를 보여 주고, 이동을 누르면 그 주차로 갑니다."""
+    year, week = (int(part) for part in hit.week_id.split('-W'))
+    before, match, after = hit.snippet
+    st.markdown(f"**{year}년 {week}주차 · {escape_markdown(hit.member_name)}**  \n"
+                f"<small>{escape_markdown(field_label(hit.field))}</small>", unsafe_allow_html=True)
+    st.caption(f"{escape_markdown(before)}**{escape_markdown(match)}**{escape_markdown(after)}")
+    if st.button("이동", key=f"search_go_{i}", use_container_width=True):
+        st.session_state.selected_date = datetime.fromisocalendar(year, week, 1)
+        st.rerun()
+
+def weeks_of_quarter(year, quarter):
+    """ISO 주차 중 목요일이 해당 분기에 속하는 주차 번호 목록입니다."""
+    last_week = datetime(year, 12, 28).isocalendar()[1]
+    return [week for week in range(1, last_week + 1) if (datetime.fromisocalendar(year, week, 4).month - 1) // 3 + 1 == quarter]
 
 
 # --- 5. 세션 상태 초기화 및 유틸리티 함수 ---
-if 'all_data' not in st.session_state: st.session_state.all_data = load_data()
-if 'selected_date' not in st.session_state: st.session_state.selected_date = datetime.now() + timedelta(weeks=1)
-
 def get_week_id(year, week): return f"{year}-W{str(week).zfill(2)}"
+def week_id_of(date_obj): return get_week_id(date_obj.year, date_obj.isocalendar().week)
 def get_week_dates(date_obj):
     start_of_week = date_obj - timedelta(days=date_obj.weekday())
     return [(start_of_week + timedelta(days=i)).strftime("%m/%d") for i in range(5)]
 
+def week_window(date_obj):
+    """화면에 필요한 주차(선택 주, 지난주)와 미리 받아 둘 이웃 주차(다음 주, 지지난주)를 반환합니다."""
+    needed = [week_id_of(date_obj), week_id_of(date_obj - timedelta(weeks=1))]
+    prefetch = [week_id_of(date_obj + timedelta(weeks=1)), week_id_of(date_obj - timedelta(weeks=2))]
+    return needed, prefetch
+
+def ensure_weeks_loaded(date_obj):
+    """다른 세션의 변경을 받아 오고, 선택한 주와 지난주(및 미리 받아 둘 이웃 주차)가 세션에 없으면 공유 캐시에서 복사해 옵니다."""
+    try: cache = get_data_cache()
+    except Exception: return  # 연결 실패는 load_data에서 이미 알렸습니다.
+    needed, prefetch = week_window(date_obj)
+    if not refresh_shared_cache(cache, needed + prefetch): return
+    sync_session_data(cache)
+    loaded_weeks = st.session_state.loaded_weeks
+    to_fetch = [week_id for week_id in needed + prefetch if week_id not in loaded_weeks]
+    if not to_fetch: return
+    _, fetched = cache.cached(to_fetch)
+    st.session_state.all_data['plans'].update(fetched['plans'])
+    st.session_state.report_index.add_weeks(fetched['plans'])
+    loaded_weeks.update(to_fetch)
+
+if 'selected_date' not in st.session_state: st.session_state.selected_date = datetime.now() + timedelta(weeks=1)
+if 'all_data' not in st.session_state:
+    initial_weeks = sum(week_window(st.session_state.selected_date), [])
+    st.session_state.data_version, st.session_state.all_data = load_data(initial_weeks)
+    st.session_state.report_index = ReportIndex(st.session_state.all_data, TEAM_ORDER, RANK_ORDER)
+    st.session_state.loaded_weeks = set(initial_weeks)
+ensure_weeks_loaded(st.session_state.selected_date)
+
 # --- 6. 사이드바 UI ---
 with st.sidebar:
     st.title("메뉴")
     st.markdown("---")
     with st.expander("과거 기록 조회", expanded=False):
-        plan_years = [int(week_id.split('-W')[0]) for week_id in st.session_state.all_data['plans'].keys()]
+        plan_years = list_plan_years()
         current_year = datetime.now().year
         all_years = list(range(current_year - 3, current_year + 4))
         if plan_years: all_years = list(range(min(plan_years) - 3, max(plan_years) + 4))
@@ -221,6 +509,52 @@ with st.sidebar:
             st.session_state.selected_date = datetime.fromisocalendar(sidebar_year, sidebar_week, 1)
             st.rerun()
 
+    st.markdown("---")
+    with st.expander("🔎 보고서 검색", expanded=False):
+        search_members = st.session_state.all_data.get('team_members', [])
+        search_query = st.text_input("검색어", placeholder="예: 고객사 미팅", key="search_query")
+        search_teams = st.multiselect("팀", TEAM_ORDER, key="search_teams")
+        search_names = st.multiselect("팀원", [m.get('name') for m in search_members], key="search_names")
+        search_start_week = search_end_week = None
+        if st.checkbox("기간 지정", key="search_use_range"):
+            search_range = st.date_input("기간", value=(st.session_state.selected_date - timedelta(weeks=12), st.session_state.selected_date), key="search_range")
+            if len(search_range) == 2: search_start_week, search_end_week = week_id_of(search_range[0]), week_id_of(search_range[1])
+        if search_query.strip():
+            allowed_names = None
+            if search_teams or search_names:
+                allowed_names = set(search_names) | {m.get('name') for m in search_members if m.get('team') in search_teams}
+            search_started_at = time.perf_counter()
+            search_result = search_reports(search_query, allowed_names, search_start_week, search_end_week)
+            if search_result is not None:
+                search_total, search_hits = search_result
+                st.caption(f"{search_total}건 · {(time.perf_counter() - search_started_at) * 1000:.0f}ms"
+                           + (f" (상위 {len(search_hits)}건 표시)" if search_total > len(search_hits) else ""))
+                if not search_hits: st.info("검색 결과가 없습니다.")
+                for i, hit in enumerate(search_hits):
+                    if i > 0: st.divider()
+                    render_search_hit(i, hit)
+
+    st.markdown("---")
+    with st.expander("여러 주 PDF 내보내기", expanded=False):
+        export_year = st.selectbox("내보낼 연도", all_years, index=default_year_index, key="export_year")
+        if st.radio("범위", ["분기", "주차 범위"], horizontal=True, key="export_range") == "분기":
+            export_quarter = st.selectbox("분기", [1, 2, 3, 4], format_func=lambda q: f"{q}분기", key="export_quarter")
+            export_week_numbers = weeks_of_quarter(export_year, export_quarter)
+        else:
+            export_weeks_in_year = list(range(1, datetime(export_year, 12, 28).isocalendar()[1] + 1))
+            first_week, last_week = st.select_slider("주차", export_weeks_in_year, value=(1, export_weeks_in_year[-1]), key="export_week_range")
+            export_week_numbers = list(range(first_week, last_week + 1))
+        export_as_zip = st.radio("형식", ["PDF 하나로 합치기", "주차별 PDF(ZIP)"], key="export_format") == "주차별 PDF(ZIP)"
+        if st.button("내보내기", use_container_width=True):
+            export_dates = [datetime.fromisocalendar(export_year, week, 1) for week in export_week_numbers]
+            with st.spinner(f"{len(export_dates)}개 주차 보고서를 만드는 중..."):
+                export_plans = load_plans_for_export(sorted({week_id_of(d - timedelta(weeks=n)) for d in export_dates for n in (0, 1)}))
+                export_bytes = export_pdf([build_week_report(d, export_plans) for d in export_dates], as_zip=export_as_zip)
+            if export_bytes:
+                export_name = f"weekly_plan_{export_year}-W{export_week_numbers[0]:02d}_W{export_week_numbers[-1]:02d}"
+                st.download_button("✅ 다운로드 준비 완료", export_bytes, f"{export_name}.{'zip' if export_as_zip else 'pdf'}",
+                                   "application/zip" if export_as_zip else "application/pdf", use_container_width=True)
+
     st.markdown("---")
     with st.expander("팀원 목록 관리", expanded=True):
         team_members_list = st.session_state.all_data.get('team_members', [])
@@ -231,8 +565,9 @@ with st.sidebar:
                 if not new_name or not new_rank or not new_team: st.warning("이름, 직급, 팀을 모두 선택해주세요.")
                 elif any(m.get('name') == new_name for m in team_members_list): st.warning("이미 존재하는 팀원입니다.")
                 else:
-                    team_members_list.append({"name": new_name, "rank": new_rank, "team": new_team})
-                    save_all_data(st.session_state.all_data)
+                    changes = ChangeSet(st.session_state.all_data, st.session_state.report_index)
+                    changes.add_member({"name": new_name, "rank": new_rank, "team": new_team})
+                    save_changes(changes)
                     st.success(f"'{new_name}' 님을 팀원 목록에 추가했습니다."); st.rerun()
         
         st.write("---"); st.write("**팀원 정보 수정**")
@@ -251,11 +586,9 @@ with st.sidebar:
                         is_name_duplicated = any(m['name'] == edited_name for m in team_members_list if m['name'] != member_to_edit_name)
                         if is_name_changed and is_name_duplicated: st.error("이미 존재하는 이름입니다.")
                         else:
-                            if is_name_changed:
-                                for week_data in st.session_state.all_data['plans'].values():
-                                    if member_to_edit_name in week_data: week_data[edited_name] = week_data.pop(member_to_edit_name)
-                            team_members_list[member_to_edit_index] = {"name": edited_name, "rank": edited_rank, "team": edited_team}
-                            save_all_data(st.session_state.all_data)
+                            changes = ChangeSet(st.session_state.all_data, st.session_state.report_index)
+                            changes.update_member(member_to_edit_name, {"name": edited_name, "rank": edited_rank, "team": edited_team})
+                            save_changes(changes)
                             st.success(f"'{edited_name}' 님의 정보가 수정되었습니다."); st.rerun()
 
         st.write("---"); st.write("**기존 팀원 영구 삭제**")
@@ -265,15 +598,28 @@ with st.sidebar:
                 if member_to_delete_perm: st.session_state.requesting_password_for_permanent_delete = member_to_delete_perm; st.rerun()
                 else: st.warning("삭제할 팀원을 선택해주세요.")
 
+    # 관리자 비밀번호(admin_password)를 따로 설정한 경우에만 지표 패널을 보여 줍니다.
+    admin_password_setting = get_setting("admin_password")
+    if admin_password_setting:
+        st.markdown("---")
+        with st.expander("🛠️ 성능 지표 (관리자)", expanded=False):
+            if st.session_state.get('metrics_admin'): render_metrics_panel()
+            else:
+                with st.form("admin_password_form"):
+                    admin_password = st.text_input("관리자 비밀번호", type="password")
+                    if st.form_submit_button("확인"):
+                        if admin_password == str(admin_password_setting): st.session_state.metrics_admin = True; st.rerun()
+                        else: st.error("비밀번호가 올바르지 않습니다.")
+
 # --- 7. 메인 페이지 UI 및 로직 ---
 title_cols = st.columns([3, 1])
 with title_cols[0]: st.title("Weekly Sync-Up🪄")
+render_sync_status()
 with title_cols[1]:
     if st.button("📄 현재 뷰 PDF로 저장", type="primary", use_container_width=True):
         year, week = st.session_state.selected_date.isocalendar().year, st.session_state.selected_date.isocalendar().week
         week_id_pdf = get_week_id(year, week)
-        prev_date_pdf, week_dates_pdf = st.session_state.selected_date - timedelta(weeks=1), get_week_dates(st.session_state.selected_date)
-        pdf_bytes = generate_pdf(st.session_state.all_data['plans'].get(week_id_pdf, {}), st.session_state.all_data.get('team_members', []), year, week, week_dates_pdf, get_week_dates(prev_date_pdf), ['월', '화', '수', '목', '금'], TEAM_ORDER)
+        pdf_bytes = export_pdf([build_week_report(st.session_state.selected_date, st.session_state.all_data['plans'])])
         if pdf_bytes: st.download_button("✅ PDF 다운로드 준비 완료", pdf_bytes, f"weekly_plan_{week_id_pdf}.pdf", "application/pdf")
 
 st.markdown("---")
@@ -291,13 +637,14 @@ with top_cols[1]:
         team_members = st.session_state.all_data.get('team_members', [])
         reports_this_week = st.session_state.all_data['plans'].get(current_week_id, {}).keys()
         members_to_add = [m for m in team_members if m.get('name') not in reports_this_week]
-        if members_to_add:
+        if is_archived_week(current_week_id): st.info("보관된 주차라 읽기 전용입니다.")
+        elif members_to_add:
             member_to_add_name = st.selectbox("보고서를 추가할 팀원 선택", [m['name'] for m in members_to_add], index=None)
             if st.button("선택한 팀원 보고서 생성", use_container_width=True):
                 if member_to_add_name:
-                    if current_week_id not in st.session_state.all_data['plans']: st.session_state.all_data['plans'][current_week_id] = {}
-                    st.session_state.all_data['plans'][current_week_id][member_to_add_name] = {}
-                    save_all_data(st.session_state.all_data); st.rerun()
+                    changes = ChangeSet(st.session_state.all_data, st.session_state.report_index)
+                    changes.set_plan(current_week_id, member_to_add_name, {})
+                    save_changes(changes); st.rerun()
                 else: st.warning("보고서를 추가할 팀원을 선택해주세요.")
         else: st.info("모든 팀원이 이번 주 보고서를 추가했습니다.")
 st.markdown("---")
@@ -332,8 +679,9 @@ elif 'confirming_delete' in st.session_state:
     confirm_cols = st.columns(8)
     if confirm_cols[0].button("예, 삭제합니다.", type="primary"):
         if current_week_id in st.session_state.all_data['plans'] and member_to_delete in st.session_state.all_data['plans'][current_week_id]:
-            del st.session_state.all_data['plans'][current_week_id][member_to_delete]
-            save_all_data(st.session_state.all_data)
+            changes = ChangeSet(st.session_state.all_data, st.session_state.report_index)
+            changes.delete_plan(current_week_id, member_to_delete)
+            save_changes(changes)
         del st.session_state.confirming_delete; st.rerun()
     if confirm_cols[1].button("아니오"): del st.session_state.confirming_delete; st.rerun()
 elif 'confirming_permanent_delete' in st.session_state:
@@ -341,80 +689,29 @@ elif 'confirming_permanent_delete' in st.session_state:
     st.error(f"**🚨 최종 확인: '{member_to_delete}' 님을 팀원 목록과 모든 계획에서 영구적으로 삭제합니다. 계속하시겠습니까?**")
     confirm_cols = st.columns(8)
     if confirm_cols[0].button("예, 영구 삭제합니다.", type="primary"):
-        st.session_state.all_data['team_members'] = [m for m in st.session_state.all_data.get('team_members', []) if m.get('name') != member_to_delete]
-        for week_data in st.session_state.all_data['plans'].values():
-            if member_to_delete in week_data: del week_data[member_to_delete]
-        save_all_data(st.session_state.all_data)
+        changes = ChangeSet(st.session_state.all_data, st.session_state.report_index)
+        changes.delete_member(member_to_delete)
+        save_changes(changes)
         del st.session_state.confirming_permanent_delete; st.rerun()
     if confirm_cols[1].button("취소"): del st.session_state.confirming_permanent_delete; st.rerun()
 
 # --- 9. 메인 계획표 렌더링 ---
 else:
-    members_with_reports_this_week = st.session_state.all_data['plans'].get(current_week_id, {}).keys()
-    for team_name in TEAM_ORDER:
-        all_team_members = st.session_state.all_data.get('team_members', [])
-        team_members_in_group = [m for m in all_team_members if isinstance(m, dict) and m.get('team') == team_name and m.get('name') in members_with_reports_this_week]
-        team_members_in_group.sort(key=lambda m: RANK_ORDER.index(m.get('rank', '기타')) if m.get('rank') in RANK_ORDER else len(RANK_ORDER))
-        if not team_members_in_group: continue
-        st.title(f"<{team_name}>")
-        for member_data in team_members_in_group:
-            member_name = member_data.get('name')
-            if not member_name: continue
-            member_info_cols = st.columns([4, 1])
-            with member_info_cols[0]:
-                member_info = f"[{member_data.get('team', '')}] {member_name} {member_data.get('rank', '')}"
-                st.subheader(member_info)
-            with member_info_cols[1]:
-                if st.button("보고서 삭제", key=f"delete_btn_{member_name}", type="secondary"):
-                    st.session_state.requesting_password_for_report_delete = member_name; st.rerun()
-            member_plan = st.session_state.all_data['plans'][current_week_id][member_name]
-            if 'grid' not in member_plan: member_plan['grid'] = {}
-            if 'lastWeekGrid' not in member_plan or 'lastWeekReview' not in member_plan:
-                prev_date = st.session_state.selected_date - timedelta(weeks=1)
-                prev_week_id = get_week_id(prev_date.year, prev_date.isocalendar().week)
-                prev_member_plan = st.session_state.all_data['plans'].get(prev_week_id, {}).get(member_name, {})
-                member_plan['lastWeekGrid'] = prev_member_plan.get('grid', {})
-                member_plan['lastWeekReview'] = prev_member_plan.get('nextWeekPlan', "")
-            def render_grid(title, grid_data, key_prefix, header_class, dates, is_editable=True):
-                st.markdown(f"<h6>{title}</h6>", unsafe_allow_html=True)
-                day_cols = st.columns(5)
-                days, day_names = ['mon', 'tue', 'wed', 'thu', 'fri'], ['월', '화', '수', '목', '금']
-                for i, day in enumerate(days):
-                    with day_cols[i]:
-                        st.markdown(f"<div class='header-base {header_class} header-day'><b>{day_names[i]}({dates[i]})</b></div>", unsafe_allow_html=True)
-                        st.markdown("<p class='mobile-label'>오전</p>", unsafe_allow_html=True)
-                        grid_data[f'{day}_am'] = st.text_area(f"{key_prefix}_{member_name}_{day}_am", value=grid_data.get(f'{day}_am', ''), height=120, disabled=not is_editable)
-                        st.markdown("<p class='mobile-label'>오후</p>", unsafe_allow_html=True)
-                        grid_data[f'{day}_pm'] = st.text_area(f"{key_prefix}_{member_name}_{day}_pm", value=grid_data.get(f'{day}_pm', ''), height=120, disabled=not is_editable)
-            week_dates = get_week_dates(st.session_state.selected_date)
-            render_grid("이번주 계획", member_plan['grid'], "grid", "header-default", week_dates)
-            st.markdown("<div style='margin-top: 16px;'></div>", unsafe_allow_html=True)
-            prev_date, last_week_dates = st.session_state.selected_date - timedelta(weeks=1), get_week_dates(st.session_state.selected_date - timedelta(weeks=1))
-            if 'lastWeekGrid' not in member_plan: member_plan['lastWeekGrid'] = {}
-            render_grid("지난주 업무 내역 (수정 가능)", member_plan['lastWeekGrid'], "last_grid", "header-automated", last_week_dates)
-            def render_summary_row(label, key, placeholder, is_auto, height=140):
-                header_class = "header-automated" if is_auto else "header-default"
-                cols = st.columns([0.2, 0.8])
-                cols[0].markdown(f"<div class='header-base {header_class} header-summary'><b>{label}</b></div>", unsafe_allow_html=True)
-                member_plan[key] = cols[1].text_area(f"{key}_{member_name}", value=member_plan.get(key, ""), placeholder=placeholder, height=height)
-            st.markdown("<div style='margin-top: -8px;'></div>", unsafe_allow_html=True)
-            render_summary_row("지난주 리뷰 (수정 가능)", "lastWeekReview", "지난주 차주 계획을 작성하지 않아 연동되지 않았습니다.", True)
-            render_summary_row("차주 계획", "nextWeekPlan", "다음 주 계획을 구체적으로 작성해주세요.", False)
-            render_summary_row("본인 리뷰", "selfReview", "스스로에 대한 리뷰 및 이슈, 건의사항을 편하게 작성해주세요.", False)
-            render_summary_row("부서장 리뷰", "managerReview", "이번 한 주도 고생 많으셨습니다.🚀", False)
-            
-            # 개인별 저장 버튼
-            save_button_placeholder = st.empty()
-            if save_button_placeholder.button(f"💾 {member_name}님 계획 저장", key=f"save_btn_{member_name}", use_container_width=True, type="primary"):
-                if save_member_plan(current_week_id, member_name, member_plan):
-                    save_button_placeholder.success("✅ 저장 완료!")
-                    time.sleep(1)
-                    st.rerun()
-
-            st.markdown("---")
-        st.markdown("<br>", unsafe_allow_html=True)
-
-
-
-
-
+    report_groups = st.session_state.report_index.ordered_groups(current_week_id)
+    teams_with_reports = [team_name for team_name, _ in report_groups]
+    view_cols = st.columns([3, 2])
+    view_team = view_cols[0].radio("팀 보기", ["전체", *teams_with_reports], horizontal=True, key="view_team")
+    cards = [(team_name, member) for team_name, team_members_in_group in report_groups
+             if view_team in ("전체", team_name) for member in team_members_in_group]
+    page_count = max(1, -(-len(cards) // CARDS_PER_PAGE))
+    view_page = view_cols[1].radio("페이지", list(range(1, page_count + 1)), horizontal=True, key="view_page") if page_count > 1 else 1
+    page_cards = cards[(view_page - 1) * CARDS_PER_PAGE:view_page * CARDS_PER_PAGE]
+    with get_metrics().timed("render_cards", cards=len(page_cards)):
+        for i, (team_name, member) in enumerate(page_cards):
+            if i == 0 or page_cards[i - 1][0] != team_name:
+                if i > 0: st.markdown("<br>", unsafe_allow_html=True)
+                st.title(f"<{team_name}>")
+            render_member_card(current_week_id, member)
+
+# st.rerun()으로 중간에 다시 시작한 실행은 여기까지 오지 않아 기록되지 않습니다.
+get_metrics().observe("script_run", time.perf_counter() - script_started_at)